@@ -0,0 +1,135 @@
+"""WebDriver falso, em processo, para benchmarks e testes offline.
+
+Simula apenas a interface usada pelo REFramework (navegação, elementos, cookies,
+screenshots, scripts) com latência, falhas e crescimento de memória configuráveis.
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class FakeWebDriverError(Exception):
+    """Falha simulada de navegação (equivalente a uma WebDriverException)."""
+
+
+class FakeElement:
+    def __init__(self, driver: "FakeWebDriver", selector: str) -> None:
+        self._driver = driver
+        self.selector = selector
+        self.text = ""
+
+    def clear(self) -> None:
+        self._driver._roundtrip()
+        self.text = ""
+
+    def send_keys(self, value: str) -> None:
+        self._driver._roundtrip()
+        self.text += value
+
+    def click(self) -> None:
+        self._driver._roundtrip()
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+
+class FakeWebDriver:
+    """Substituto do Selenium WebDriver.
+
+    - page_latency_ms / jitter_ms: tempo de cada `get()` (carregamento de página)
+    - roundtrip_ms: tempo de cada comando simples (find_element, click, ...)
+    - failure_rate: probabilidade de `get()` falhar
+    - memory_growth_kb: memória retida a cada navegação (simula o navegador inchando)
+    - startup_ms: tempo de criação do driver
+    """
+
+    def __init__(
+        self,
+        page_latency_ms: float = 50,
+        jitter_ms: float = 10,
+        roundtrip_ms: float = 1,
+        failure_rate: float = 0.0,
+        memory_growth_kb: int = 0,
+        startup_ms: float = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.page_latency_ms = page_latency_ms
+        self.jitter_ms = jitter_ms
+        self.roundtrip_ms = roundtrip_ms
+        self.failure_rate = failure_rate
+        self.memory_growth_kb = memory_growth_kb
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ballast: List[bytearray] = []
+        self._cookies: List[Dict[str, Any]] = []
+        self.current_url = "about:blank"
+        self.page_source = "<html><body></body></html>"
+        self.commands = 0
+        self.closed = False
+        if startup_ms:
+            time.sleep(startup_ms / 1000)
+
+    def _roundtrip(self) -> None:
+        if self.closed:
+            raise FakeWebDriverError("driver fechado")
+        with self._lock:
+            self.commands += 1
+        if self.roundtrip_ms:
+            time.sleep(self.roundtrip_ms / 1000)
+
+    def get(self, url: str) -> None:
+        self._roundtrip()
+        delay = self.page_latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, delay) / 1000)
+        if self.memory_growth_kb:
+            self._ballast.append(bytearray(self.memory_growth_kb * 1024))
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise FakeWebDriverError(f"falha simulada ao abrir {url}")
+        self.current_url = url
+        self.page_source = f"<html><body data-url='{url}'></body></html>"
+
+    def find_element(self, by: str, selector: str) -> FakeElement:
+        self._roundtrip()
+        return FakeElement(self, selector)
+
+    def find_elements(self, by: str, selector: str) -> List[FakeElement]:
+        self._roundtrip()
+        return []
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self._roundtrip()
+        return None
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        """Simula a espera em lote de selenium_utils.wait_for_all: todos os seletores prontos."""
+        self._roundtrip()
+        selectors = args[0] if args and isinstance(args[0], list) else []
+        return {"ok": True, "elements": [FakeElement(self, s) for s in selectors], "missing": []}
+
+    def set_script_timeout(self, seconds: float) -> None:
+        self._roundtrip()
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        self._roundtrip()
+        return list(self._cookies)
+
+    def add_cookie(self, cookie: Dict[str, Any]) -> None:
+        self._roundtrip()
+        self._cookies.append(dict(cookie))
+
+    def get_screenshot_as_png(self) -> bytes:
+        self._roundtrip()
+        return b"\x89PNG\r\n\x1a\n" + bytes(1024)
+
+    def save_screenshot(self, path: str) -> bool:
+        with open(path, "wb") as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    def quit(self) -> None:
+        self.closed = True
+        self._ballast.clear()
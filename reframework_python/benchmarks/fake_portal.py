@@ -0,0 +1,164 @@
+"""Portal HTTP falso, em processo, para benchmarks e testes offline do cliente HTTP.
+
+Servidor local (porta livre, thread própria) que imita o que o robô usa do portal:
+- POST /login: grava o cookie de sessão `SESSION`
+- GET/POST /api/items/<id>: exige o cookie (401 sem ele); responde JSON
+- GET /flaky: responde 503 (com Retry-After: 0) nas primeiras `flaky_failures` chamadas
+
+Também mede o ganho do pool (services/http_client.py) contra uma conexão nova por
+requisição:
+
+    python benchmarks/fake_portal.py --requests 500
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SESSION_COOKIE = "SESSION"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Cabeçalho e corpo saem em writes separados: sem TCP_NODELAY, o atraso de ACK
+    # (~40 ms) distorceria a medição com conexões reaproveitadas
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authenticated(self) -> bool:
+        cookies = self.headers.get("Cookie", "")
+        return f"{SESSION_COOKIE}={self.server.session_token}" in cookies  # type: ignore[attr-defined]
+
+    def _route(self) -> None:
+        portal: FakePortal = self.server.portal  # type: ignore[attr-defined]
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with portal.lock:
+            portal.requests += 1
+            portal.connections.add(self.client_address)
+        path = self.path.split("?", 1)[0]
+        if path == "/login" and self.command == "POST":
+            token = self.server.session_token  # type: ignore[attr-defined]
+            self._reply(200, {"ok": True}, {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+        elif path == "/flaky":
+            with portal.lock:
+                portal.flaky_calls += 1
+                failing = portal.flaky_calls <= portal.flaky_failures
+            if failing:
+                self._reply(503, {"error": "indisponível"}, {"Retry-After": "0"})
+            else:
+                self._reply(200, {"ok": True, "calls": portal.flaky_calls})
+        elif path.startswith("/api/items/"):
+            if not self._authenticated():
+                self._reply(401, {"error": "não autenticado"})
+                return
+            item_id = path.rsplit("/", 1)[-1]
+            self._reply(200, {"id": item_id, "method": self.command, "received": body.decode("utf-8")})
+        else:
+            self._reply(404, {"error": "não encontrado"})
+
+    do_GET = _route
+    do_POST = _route
+
+
+class FakePortal:
+    """Servidor do portal falso; use como context manager (`with FakePortal() as portal`)."""
+
+    def __init__(self, flaky_failures: int = 2, session_token: str = "abc123") -> None:
+        self.flaky_failures = flaky_failures
+        self.flaky_calls = 0
+        self.requests = 0
+        self.connections: set = set()
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.portal = self  # type: ignore[attr-defined]
+        self._server.session_token = session_token  # type: ignore[attr-defined]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-portal", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def session_token(self) -> str:
+        return self._server.session_token  # type: ignore[attr-defined]
+
+    def session_cookie(self) -> Dict[str, Any]:
+        """Cookie de sessão no formato de `driver.get_cookies()` (para o FakeWebDriver)."""
+        return {"name": SESSION_COOKIE, "value": self.session_token, "domain": "127.0.0.1", "path": "/"}
+
+    def start(self) -> "FakePortal":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakePortal":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main_cli(argv: list) -> int:
+    import requests
+
+    from benchmarks.fake_driver import FakeWebDriver
+    from components.services.http_client import PortalHttpClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with FakePortal() as portal:
+        driver = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+        driver.add_cookie(portal.session_cookie())
+        cookies = {SESSION_COOKIE: portal.session_token}
+
+        portal.connections.clear()
+        start = time.perf_counter()
+        for i in range(args.requests):
+            requests.get(f"{portal.url}api/items/{i}", cookies=cookies, timeout=10).raise_for_status()
+        plain = time.perf_counter() - start
+        plain_connections = len(portal.connections)
+
+        client = PortalHttpClient(portal.url)
+        client.sync_from_driver(driver)
+        portal.connections.clear()
+        start = time.perf_counter()
+        for i in range(args.requests):
+            client.get(f"api/items/{i}").raise_for_status()
+        pooled = time.perf_counter() - start
+        pooled_connections = len(portal.connections)
+        client.close()
+
+    n = max(1, args.requests)
+    print(f"requests.get (conexão nova): {plain / n * 1000:.3f} ms/req, {plain_connections} conexão(ões)")
+    print(f"Session com pool:            {pooled / n * 1000:.3f} ms/req, {pooled_connections} conexão(ões)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli(sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Benchmark da fila CSV em streaming (components/actions/queue.py).
+
+Gera CSVs sintéticos de tamanhos crescentes e mede, para cada um:
+- custo médio por item retirado da fila (µs/item)
+- pico de memória alocada em Python durante o consumo (tracemalloc)
+
+Uso (a partir da pasta reframework_python):
+    python benchmarks/queue_stream.py                 # 10k, 100k, 1M linhas
+    python benchmarks/queue_stream.py 10000 10000000  # tamanhos customizados
+
+O esperado é memória estável e custo por item constante entre os tamanhos.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.actions.queue import _CsvQueueSource  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _write_csv(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("id,nome,valor\n")
+        for i in range(rows):
+            f.write(f"{i},nome_{i},{i % 1000}\n")
+
+
+def run(rows: int, folder: str) -> dict:
+    path = os.path.join(folder, f"queue_{rows}.csv")
+    _write_csv(path, rows)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    source = _CsvQueueSource(path)
+    count = 0
+    while source.pop() is not None:
+        count += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(path)
+
+    assert count == rows, f"esperado {rows} itens, obtido {count}"
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "us_per_item": round(elapsed / rows * 1e6, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main(argv: list) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'linhas':>12} {'segundos':>10} {'µs/item':>10} {'pico KiB':>10}")
+        for rows in sizes:
+            r = run(rows, folder)
+            print(f"{r['rows']:>12} {r['seconds']:>10} {r['us_per_item']:>10} {r['peak_kib']:>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
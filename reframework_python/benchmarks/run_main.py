@@ -0,0 +1,222 @@
+"""Benchmark do loop principal (main.py) com WebDriver falso, totalmente offline.
+
+Para cada tamanho de fila, gera um CSV sintético, troca `hooks.open_driver` por um
+FakeWebDriver (latência, falhas e crescimento de memória configuráveis) e roda o
+`main.main()` real até a fila esvaziar. Reporta:
+- itens/s e tempo total até todos os itens chegarem a um estado final (concluído ou
+  dead-letter; falhas com retentativa pendente não contam)
+- latência por etapa (p50/p95/p99, vindas de utils/metrics.py)
+- pico de RSS do processo
+- tempo de inicialização (import do main) e tempo até o primeiro item
+
+Uso (a partir da pasta reframework_python):
+    python benchmarks/run_main.py --items 100 1000 --workers 4 --latency-ms 50
+    python benchmarks/run_main.py --output benchmarks/results/base.json
+    python benchmarks/run_main.py --items 1000 --batch-size 25   # uma navegação por lote
+
+O JSON salvo pode ser comparado entre execuções (mesmos parâmetros).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+_T0 = time.perf_counter()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from components import hooks  # noqa: E402
+from benchmarks.fake_driver import FakeWebDriver  # noqa: E402
+
+IMPORT_SECONDS = time.perf_counter() - _T0
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KiB; macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _write_queue(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("id,nome,valor\n")
+        for i in range(rows):
+            f.write(f"{i},nome_{i},{i % 1000}\n")
+
+
+def _bench_config(rows: int, args: argparse.Namespace, folder: str) -> dict:
+    """Config da rodada: todo arquivo gravado pelo robô fica em `folder` (pasta temporária).
+
+    - Nada vai para logs/ do projeto (ex.: itens sintéticos na dead-letter real).
+    """
+    return {
+        "csv_queue_path": os.path.join(folder, f"queue_{rows}.csv"),
+        "queue_backend": args.backend,
+        "queue_db_path": os.path.join(folder, f"queue_{rows}.db"),
+        "state_path": os.path.join(folder, f"state_{rows}.json"),
+        "metrics_path": os.path.join(folder, f"metrics_{rows}.json"),
+        "health_path": os.path.join(folder, f"health_{rows}.json"),
+        "dead_letter_path": os.path.join(folder, f"dead_letter_{rows}.csv"),
+        "dedup_index_path": os.path.join(folder, f"processed_{rows}.db"),
+        "session_cache_path": os.path.join(folder, "session.json"),
+        "driver_cache_path": os.path.join(folder, "driver_paths.json"),
+        "trace_dir": os.path.join(folder, "traces"),
+        "log_path": os.path.join(folder, "robo.log"),
+        "screenshot_folder": os.path.join(folder, "evidence"),
+        "download_dir": os.path.join(folder, "downloads"),
+        "download_items_dir": os.path.join(folder, "downloads", "items"),
+        "browser_cache_dir": "",
+        "shard_lease_dir": os.path.join(folder, "shards"),
+        "workers": args.workers,
+        "batch_size": args.batch_size,
+        "wait_time_in_minutes": 0.01,
+        "session_cache_enabled": False,
+        # Retentativas rápidas: a execução só termina com todos os itens em estado final
+        "retry_backoff_seconds": 0.05,
+        "retry_backoff_max_seconds": 0.5,
+        "metrics_flush_items": 1000,
+        "ativar_log": False,
+        "nivel_log": "INFO" if args.verbose else "CRITICAL",
+    }
+
+
+async def _run_once(rows: int, args: argparse.Namespace, folder: str) -> dict:
+    config = _bench_config(rows, args, folder)
+    _write_queue(config["csv_queue_path"], rows)
+
+    done = {"first": None}
+    stats = hooks.metrics(config)
+
+    def finished() -> int:
+        # processed_total só conta itens em estado final (concluído ou dead-letter)
+        return stats.snapshot().get("processed_total", 0)
+
+    original_complete, original_fail = hooks.complete_item, hooks.fail_item
+    original_open, original_process = hooks.open_driver, hooks.process_item
+    original_batch = hooks.process_batch
+
+    def open_driver(cfg):
+        return FakeWebDriver(
+            page_latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            failure_rate=args.failure_rate,
+            memory_growth_kb=args.memory_growth_kb,
+            startup_ms=args.startup_ms,
+        )
+
+    def process_item(item, driver, cfg):
+        # Simula a navegação de cada item antes da lógica padrão
+        driver.get(f"https://portal.invalid/item/{item.get('id')}")
+        original_process(item, driver, cfg)
+
+    def process_batch(items, driver, cfg):
+        # Simula uma busca que traz todos os itens do lote em uma única navegação
+        driver.get(f"https://portal.invalid/busca?ids={len(items)}")
+        results = []
+        for item in items:
+            try:
+                original_process(item, driver, cfg)
+                results.append(None)
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def counted(func):
+        def wrapper(*a, **kw):
+            try:
+                return func(*a, **kw)
+            finally:
+                if done["first"] is None:
+                    done["first"] = time.perf_counter()
+        return wrapper
+
+    hooks.open_driver, hooks.process_item = open_driver, process_item
+    hooks.process_batch = process_batch
+    hooks.complete_item, hooks.fail_item = counted(original_complete), counted(original_fail)
+    start = time.perf_counter()
+    task = asyncio.create_task(main.main(config))
+    try:
+        while finished() < rows and not task.done():
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        hooks.open_driver, hooks.process_item = original_open, original_process
+        hooks.process_batch = original_batch
+        hooks.complete_item, hooks.fail_item = original_complete, original_fail
+
+    snapshot = stats.snapshot()
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(finished() / elapsed, 2) if elapsed else 0.0,
+        "first_item_seconds": round(done["first"] - start, 4) if done["first"] else None,
+        "processed_success": snapshot.get("processed_success", 0),
+        "processed_error": snapshot.get("processed_error", 0),
+        "attempts_failed": snapshot.get("attempts_failed", 0),
+        "retry_scheduled": snapshot.get("retry_scheduled", 0),
+        "dead_letter": snapshot.get("dead_letter", 0),
+        "latency_ms": snapshot.get("latency_ms", {}),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--batch-size", type=int, default=1, help="itens por lote (1 = item a item)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--memory-growth-kb", type=int, default=0)
+    parser.add_argument("--startup-ms", type=float, default=0)
+    parser.add_argument("--verbose", action="store_true", help="mantém os logs do robô (por padrão silenciados)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/<data>.json)")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: list) -> None:
+    args = _parse_args(argv)
+    if not args.verbose:
+        # main() reaplica o nível a partir do config (nivel_log) ao iniciar
+        logging.getLogger().setLevel(logging.CRITICAL)
+    results = []
+    for rows in args.items:
+        # Pasta nova por rodada: métricas e fila não vazam entre tamanhos
+        with tempfile.TemporaryDirectory() as folder:
+            results.append(asyncio.run(_run_once(rows, args, folder)))
+        r = results[-1]
+        print(
+            f"{r['rows']:>8} itens  {r['items_per_sec']:>9} itens/s  "
+            f"process p95={r['latency_ms'].get('process', {}).get('p95')} ms  "
+            f"pico RSS={r['peak_rss_mb']} MB"
+        )
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "verbose")},
+        "import_seconds": round(IMPORT_SECONDS, 4),
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results", f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados salvos em {output} (import: {report['import_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main_cli(sys.argv[1:])
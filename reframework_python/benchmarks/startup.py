@@ -0,0 +1,120 @@
+"""Relatório de tempo de inicialização (import do main.py), com detalhamento por módulo.
+
+Roda `python -X importtime -c "import main"` em subprocessos e reporta:
+- tempo total de import com bytecode em cache (quente) e sem cache (frio, usando um
+  `pycache_prefix` temporário, sem apagar o __pycache__ do projeto)
+- os módulos mais caros (tempo acumulado e tempo próprio)
+- se Selenium/webdriver-manager foram carregados já no import (não deveriam)
+
+Uso (a partir da pasta reframework_python):
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --top 15 --max-ms 300
+
+Com `--max-ms`, sai com código 1 se o import quente passar do limite (útil em CI).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LAZY_MODULES = ("selenium", "webdriver_manager")
+
+
+def _import_profile(pycache_prefix: Optional[str] = None) -> List[Dict[str, object]]:
+    """Executa um import do main e devolve as linhas do -X importtime (em ms)."""
+    cmd = [sys.executable, "-X", "importtime"]
+    if pycache_prefix:
+        cmd += ["-X", f"pycache_prefix={pycache_prefix}"]
+    cmd += ["-c", "import main"]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar main:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(own) / 1000,
+            "cumulative_ms": int(cumulative) / 1000,
+        })
+    return rows
+
+
+def _summary(runs: List[List[Dict[str, object]]], top: int) -> Dict[str, object]:
+    totals = [next(r["cumulative_ms"] for r in rows if r["module"] == "main") for rows in runs]
+    last = runs[-1]
+    modules = {str(r["module"]) for r in last}
+    return {
+        "total_ms": round(statistics.median(totals), 2),
+        "runs_ms": [round(t, 2) for t in totals],
+        "modules": len(last),
+        "top_cumulative": [
+            {"module": r["module"], "ms": round(float(r["cumulative_ms"]), 2)}
+            for r in sorted(last, key=lambda r: r["cumulative_ms"], reverse=True)[:top]
+        ],
+        "top_self": [
+            {"module": r["module"], "ms": round(float(r["self_ms"]), 2)}
+            for r in sorted(last, key=lambda r: r["self_ms"], reverse=True)[:top]
+        ],
+        "lazy_modules_loaded": sorted(m for m in modules if m.split(".")[0] in _LAZY_MODULES),
+    }
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="execuções por cenário (usa a mediana)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="limite para o import quente (falha se ultrapassar)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/startup_<data>.json)")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: list) -> int:
+    args = _parse_args(argv)
+    runs = max(1, args.runs)
+    # Uma execução prévia garante o bytecode do projeto em cache para o cenário quente
+    _import_profile()
+    warm = _summary([_import_profile() for _ in range(runs)], args.top)
+    cold_runs = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as prefix:
+            cold_runs.append(_import_profile(prefix))
+    cold = _summary(cold_runs, args.top)
+
+    print(f"Import quente: {warm['total_ms']} ms  |  frio (sem bytecode): {cold['total_ms']} ms")
+    print("Módulos mais caros (acumulado, quente):")
+    for row in warm["top_cumulative"]:
+        print(f"  {row['ms']:>9.2f} ms  {row['module']}")
+    if warm["lazy_modules_loaded"]:
+        print(f"ATENÇÃO: carregados no import: {', '.join(warm['lazy_modules_loaded'][:5])}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "warm": warm,
+        "cold": cold,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"startup_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados salvos em {output}")
+
+    if args.max_ms is not None and warm["total_ms"] > args.max_ms:
+        print(f"Import quente acima do limite: {warm['total_ms']} ms > {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli(sys.argv[1:]))
@@ -1,15 +1,60 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
+import os
 
-# Importações específicas do Selenium para localizar elementos e aguardar condições
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from components.services.selenium_utils import fill_fields, wait_for_all
+from components.services.session_cache import SessionCache, get_session_cache
 
 # Funções de log centralizadas
 from utils.config import log_error, log_info
 
 
-def perform_login(driver: Any, config: Dict[str, str]) -> bool:
+def _session_cache(config: Dict[str, Any]) -> SessionCache:
+    """Cache de sessão configurado em data/config.json.
+
+    - session_cache_path: arquivo da sessão (padrão: logs/session.json)
+    - session_max_age_minutes: idade máxima antes de renovar o login (padrão: 60; 0 = sem limite)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    path = config.get("session_cache_path") or os.path.join(root, "logs", "session.json")
+    return get_session_cache(path, float(config.get("session_max_age_minutes", 60)) * 60)
+
+
+def _session_valid(driver: Any, config: Dict[str, Any], username_selector: str) -> bool:
+    """Verificação barata de sessão na página atual.
+
+    - Com `success_check_selector`: aguarda o elemento por até `session_probe_timeout` s (padrão: 5).
+    - Sem ele: considera autenticado se o campo de usuário não estiver na página.
+    """
+    success_check_selector = config.get("success_check_selector")
+    if success_check_selector:
+        try:
+            wait_for_all(
+                driver,
+                [success_check_selector],
+                timeout=float(config.get("session_probe_timeout", 5)),
+                poll_interval=float(config.get("wait_poll_interval", 0.1)),
+            )
+            return True
+        except Exception:
+            return False
+    from selenium.webdriver.common.by import By
+
+    return not driver.find_elements(By.CSS_SELECTOR, username_selector)  # type: ignore[attr-defined]
+
+
+def invalidate_session(driver: Any, config: Dict[str, Any]) -> None:
+    """Esquece que o driver está autenticado: o próximo login verifica a sessão de novo.
+
+    - Chamado quando um item falha, já que logout/expiração no servidor aparecem como
+      falhas de item; sem isso o driver seguiria "autenticado" até `session_max_age_minutes`.
+    """
+    if config.get("session_cache_enabled", True):
+        _session_cache(config).forget(driver)
+
+
+def perform_login(
+    driver: Any, config: Dict[str, str], on_login: Optional[Callable[[Any], None]] = None
+) -> bool:
     """Realiza login utilizando Selenium de forma genérica.
 
     Espera as seguintes chaves em data/config.json:
@@ -22,6 +67,18 @@ def perform_login(driver: Any, config: Dict[str, str]) -> bool:
     - password_selector: seletor do campo de senha. Padrão: input[type="password"]
     - submit_selector: seletor do botão de envio. Padrão: button[type="submit"]
     - success_check_selector: seletor de um elemento que confirma login com sucesso (opcional)
+    - login_timeout / wait_poll_interval: espera máxima e intervalo de polling (padrão: 30 / 0.1 s)
+    - login_fill_mode: "keys" digita nos campos (padrão); "script" preenche os dois em uma
+      chamada (mais rápido, mas não dispara eventos de teclado: use só se o portal aceitar)
+
+    Com `session_cache_enabled` (padrão: True), a sessão é salva após o login e
+    restaurada em drivers novos; o formulário só é preenchido quando a sessão
+    restaurada não passa na verificação ou está mais velha que `session_max_age_minutes`.
+    Drivers já autenticados retornam imediatamente, sem ida ao navegador; após a falha
+    de um item (`invalidate_session`), a sessão volta a ser verificada no próximo login.
+
+    `on_login(driver)`, se informado, é chamado apenas quando a sessão do navegador
+    mudou (sessão restaurada ou formulário enviado), não nos retornos imediatos.
     """
     url = config.get("url")
     user = config.get("username")
@@ -37,30 +94,60 @@ def perform_login(driver: Any, config: Dict[str, str]) -> bool:
     submit_selector = config.get("submit_selector", 'button[type="submit"]')
     success_check_selector = config.get("success_check_selector")
 
+    cache = _session_cache(config) if config.get("session_cache_enabled", True) else None
+    if cache is not None:
+        if cache.is_authenticated(driver):
+            return True
+        cache.forget(driver)
+        try:
+            if cache.restore(driver, url) and _session_valid(driver, config, username_selector):
+                cache.mark_authenticated(driver)
+                log_info(f"Sessão restaurada do cache (idade: {cache.age_seconds() / 60:.0f} min).")
+                if on_login is not None:
+                    on_login(driver)
+                return True
+        except Exception as exc:
+            log_error(f"Falha ao restaurar sessão: {exc}")
+
     try:
         # Acessa a página de login
         driver.get(url)  # type: ignore[attr-defined]
 
-        # Aguarda o carregamento e a presença dos campos de usuário e senha
-        wait = WebDriverWait(driver, 30)
-        user_el = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, username_selector)))
-        pass_el = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, password_selector)))
-
-        # Preenche credenciais
-        user_el.clear()
-        user_el.send_keys(user)
-        pass_el.clear()
-        pass_el.send_keys(pwd)
-
-        # Clica no botão de login
-        submit_el = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, submit_selector)))
+        # Aguarda usuário e senha em uma única chamada ao navegador
+        timeout = float(config.get("login_timeout", 30))
+        poll = float(config.get("wait_poll_interval", 0.1))
+        user_el, pass_el = wait_for_all(
+            driver, [username_selector, password_selector], timeout=timeout, poll_interval=poll
+        )
+
+        # Preenche credenciais: digitando (padrão) ou por script (login_fill_mode = "script")
+        if str(config.get("login_fill_mode", "keys")).lower() == "keys":
+            user_el.clear()
+            user_el.send_keys(user)
+            pass_el.clear()
+            pass_el.send_keys(pwd)
+        else:
+            fill_fields(driver, {username_selector: user, password_selector: pwd})
+
+        # Só depois de preenchidos: portais mantêm o botão desabilitado até os campos mudarem
+        (submit_el,) = wait_for_all(
+            driver, [submit_selector], timeout=timeout, condition="clickable", poll_interval=poll
+        )
         submit_el.click()
 
         # Caso um seletor de sucesso seja informado, aguardamos sua presença
         if success_check_selector:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, success_check_selector)))
+            wait_for_all(driver, [success_check_selector], timeout=timeout, poll_interval=poll)
+
+        if cache is not None:
+            try:
+                cache.save(driver)
+            except Exception as exc:
+                log_error(f"Falha ao salvar sessão: {exc}")
 
         log_info("Login realizado com sucesso.")
+        if on_login is not None:
+            on_login(driver)
         return True
     except Exception as exc:
         log_error(f"Falha no login: {exc}")
@@ -1,13 +1,35 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 import csv
+import hashlib
+import heapq
+import io
+import itertools
 import json
 import os
+import threading
+import time
+from collections import deque
 from datetime import datetime
+from components.services.processed_index import ProcessedIndex, get_processed_index
+from components.services.queue_store import SqliteQueueStore
 from utils.config import log_info, log_error
+from utils.metrics import MetricsAggregator, get_metrics
+from utils.sharding import merge_shard_files, shard_count, shard_index, shard_of, shard_path
 
 # Estados mantidos em memória simples
-_queue_items: List[Dict[str, Any]] = []
+_queue_source: Optional["_CsvQueueSource"] = None
 _queue_loaded: bool = False
+_queue_signature: Optional[tuple] = None
+_last_fetch: Optional[str] = None
+# Fila persistente (queue_backend = "sqlite"): a do config atual e todas as já abertas
+_store: Optional[SqliteQueueStore] = None
+_stores: Dict[str, SqliteQueueStore] = {}
+# Retentativas agendadas: heap de (pronto_em, seq, item); tentativas por chave de item
+_retry_heap: List[Tuple[float, int, Dict[str, Any]]] = []
+_retry_seq = itertools.count()
+_attempts: Dict[str, int] = {}
+# A fila é compartilhada entre os workers (threads) de main.py
+_queue_lock = threading.Lock()
 
 
 def _project_root() -> str:
@@ -23,98 +45,622 @@ def _queue_path(config: Dict[str, Any]) -> str:
 
 
 def _state_path(config: Dict[str, Any]) -> str:
-    return config.get("state_path") or os.path.join(_project_root(), "logs", "state.json")
+    return shard_path(config.get("state_path") or os.path.join(_project_root(), "logs", "state.json"), config)
+
+
+def _db_path(config: Dict[str, Any]) -> str:
+    return shard_path(config.get("queue_db_path") or os.path.join(_project_root(), "logs", "queue.db"), config)
+
+
+def _dead_letter_path(config: Dict[str, Any]) -> str:
+    path = config.get("dead_letter_path") or os.path.join(_project_root(), "logs", "dead_letter.csv")
+    return shard_path(path, config)
+
+
+def _dedup_path(config: Dict[str, Any]) -> str:
+    return shard_path(config.get("dedup_index_path") or os.path.join(_project_root(), "logs", "processed.db"), config)
+
+
+def _backend(config: Dict[str, Any]) -> str:
+    """Backend da fila: "csv" (em memória, padrão) ou "sqlite" (durável, retomável).
+
+    - Com "sqlite", ids já concluídos não voltam a ser processados quando o CSV é
+      reenviado com eles (só itens novos ou que foram para a dead-letter).
+    """
+    return str(config.get("queue_backend", "csv")).lower()
 
 
 def _metrics_path(config: Dict[str, Any]) -> str:
-    return config.get("metrics_path") or os.path.join(_project_root(), "logs", "metrics.json")
+    return shard_path(config.get("metrics_path") or os.path.join(_project_root(), "logs", "metrics.json"), config)
 
 
 def _health_path(config: Dict[str, Any]) -> str:
-    return config.get("health_path") or os.path.join(_project_root(), "logs", "health.json")
+    return shard_path(config.get("health_path") or os.path.join(_project_root(), "logs", "health.json"), config)
 
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
 
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Grava JSON em arquivo temporário e renomeia (nunca deixa arquivo pela metade)."""
+    _ensure_dir(path)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _item_key(item: Any) -> str:
+    """Chave estável do item: coluna `id` ou, na falta dela, hash do conteúdo da linha."""
+    if isinstance(item, dict):
+        item_id = item.get("id")
+        if item_id not in (None, ""):
+            return str(item_id)
+        raw = json.dumps(item, sort_keys=True, ensure_ascii=False)
+    else:
+        raw = str(item)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _dedup_key(item: Any, config: Dict[str, Any]) -> str:
+    """Chave de deduplicação: a mesma de `_item_key` ou, com `dedup_key` = "row",
+    hash da linha inteira (sem as colunas dl_* acrescentadas pela dead-letter)."""
+    if config.get("dedup_key", "id") == "row" and isinstance(item, dict):
+        row = {k: v for k, v in item.items() if not str(k).startswith("dl_")}
+        return hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return _item_key(item)
+
+
+def _processed_index(config: Dict[str, Any]) -> Optional[ProcessedIndex]:
+    """Índice de itens já processados em execuções anteriores (None se desativado).
+
+    Config (data/config.json):
+    - dedup_enabled: pula itens já concluídos com sucesso (padrão: False)
+    - dedup_key: "id" (coluna id / hash da linha sem id) ou "row" (hash da linha inteira)
+    - dedup_index_path: arquivo do índice (padrão: logs/processed.db)
+    - dedup_capacity / dedup_error_rate: dimensionamento do filtro de Bloom em memória
+      (padrão: 10 milhões de ids com 1% de falso positivo, ~12 MB)
+    """
+    if not config.get("dedup_enabled", False):
+        return None
+    return get_processed_index(
+        _dedup_path(config),
+        capacity=int(config.get("dedup_capacity", 10_000_000)),
+        error_rate=float(config.get("dedup_error_rate", 0.01)),
+    )
+
+
+def _is_duplicate(item: Any, config: Dict[str, Any], index: Optional[ProcessedIndex]) -> bool:
+    if index is None or not index.contains(_dedup_key(item, config)):
+        return False
+    queue_metrics(config).incr("duplicates_skipped")
+    return True
+
+
+def _source_filter(config: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Filtro das linhas lidas da fonte: partição do shard e itens já processados."""
+    shard = _shard_filter(config)
+    index = _processed_index(config)
+    if index is None:
+        return shard
+    return lambda row: (shard is None or shard(row)) and not _is_duplicate(row, config, index)
+
+
+def _shard_filter(config: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Filtro das linhas deste shard (None quando a execução não é particionada)."""
+    index = shard_index(config)
+    if index is None:
+        return None
+    count = shard_count(config)
+    return lambda row: shard_of(_item_key(row), count) == index
+
+
+def _count_rows(path: str, start: int = 0, chunk_size: int = 1 << 20) -> int:
+    """Conta as linhas de dados do CSV sem carregá-lo em memória.
+
+    - Varre o arquivo em blocos binários contando quebras de linha (memória constante).
+    - Desconta o cabeçalho (apenas quando `start` = 0; com `start`, conta a partir
+      desse byte). Campos com quebra de linha entre aspas tornam a contagem
+      aproximada; ela é usada apenas para reportar `remaining_items`.
+    """
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        f.seek(start)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(0, lines - 1) if start == 0 else lines
+
+
+def _complete_end(f: Any, start: int = 0, chunk_size: int = 1 << 16) -> int:
+    """Posição logo após a última quebra de linha do arquivo (ou `start`, se não houver).
+
+    - Lê de trás para frente em blocos; a última linha sem quebra (exportador ainda
+      escrevendo) fica para a próxima leitura.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    while pos > start:
+        begin = max(start, pos - chunk_size)
+        f.seek(begin)
+        newline = f.read(pos - begin).rfind(b"\n")
+        if newline >= 0:
+            return begin + newline + 1
+        pos = begin
+    return start
+
+
+class _BoundedReader(io.RawIOBase):
+    """Leitura de um arquivo binário já posicionado, apenas até o byte `end`."""
+
+    def __init__(self, raw: Any, end: int) -> None:
+        self._raw = raw
+        self._left = end - raw.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        read = self._raw.readinto(memoryview(buffer)[:size]) or 0
+        self._left -= read
+        return read
+
+
+class _CsvQueueSource:
+    """Fila sobre um CSV lido sob demanda (streaming).
+
+    - As linhas são lidas por um gerador com um pequeno buffer de leitura antecipada,
+      então a memória não cresce com o tamanho do arquivo.
+    - Retirar um item é O(1) (deque), ao contrário de `list.pop(0)`.
+    - `remaining()` vem da contagem inicial de linhas menos os itens já entregues.
+    - Com `accept`, apenas as linhas aceitas entram na fila (ex.: partição do shard);
+      `share` é a fração esperada de linhas aceitas, usada na estimativa de `remaining()`.
+    - Guarda o byte onde a leitura parou: se o arquivo apenas cresceu (linhas
+      acrescentadas ao final), `resume()` continua dali sem reentregar as já lidas.
+    - Lê só até a última quebra de linha: uma linha final incompleta (arquivo ainda
+      sendo gravado) é entregue inteira na retomada, depois de completada.
+    """
+
+    # Bytes comparados (início do arquivo e trecho antes do ponto de parada) para
+    # distinguir "arquivo cresceu" de "arquivo substituído"
+    _FINGERPRINT_BYTES = 4096
+
+    def __init__(
+        self,
+        path: str,
+        read_ahead: int = 256,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        share: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.read_ahead = max(1, read_ahead)
+        self.accept = accept
+        self.share = share
+        self.offset = 0
+        self.fieldnames: Optional[List[str]] = None
+        self._seen: Optional[Tuple[bytes, bytes]] = None
+        self._open(_count_rows(path))
+
+    def _open(self, rows: int) -> None:
+        self.total = int(rows * self.share)
+        self.consumed = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._rows = self._iter_rows()
+        self._exhausted = False
+        self._fill()
+
+    def _iter_rows(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "rb") as raw:
+            end = _complete_end(raw, self.offset)
+            raw.seek(self.offset)
+            f = io.TextIOWrapper(io.BufferedReader(_BoundedReader(raw, end)), encoding="utf-8", newline="")
+            # Ao retomar, o cabeçalho já foi lido: as colunas vêm da leitura anterior
+            reader = csv.DictReader(f, fieldnames=self.fieldnames)
+            for row in reader:
+                if self.accept is None or self.accept(row):
+                    yield row
+            # Fim das linhas completas: guarda onde parou e o conteúdo lido (ver `resume()`)
+            self.fieldnames = reader.fieldnames
+            self.offset = end
+            self._seen = self._fingerprint(raw)
+            f.detach()
+
+    def _fill(self) -> None:
+        while not self._exhausted and len(self._buffer) < self.read_ahead:
+            try:
+                self._buffer.append(next(self._rows))
+            except StopIteration:
+                self._exhausted = True
+
+    def has_items(self) -> bool:
+        return bool(self._buffer)
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        if not self._buffer:
+            self._fill()
+            if not self._buffer:
+                return None
+        item = self._buffer.popleft()
+        self.consumed += 1
+        if not self._buffer:
+            self._fill()
+        return item
+
+    def remaining(self) -> int:
+        if self._exhausted:
+            return len(self._buffer)
+        return max(len(self._buffer), self.total - self.consumed)
+
+    def _fingerprint(self, f: Any) -> Tuple[bytes, bytes]:
+        n = self._FINGERPRINT_BYTES
+        f.seek(0)
+        head = f.read(min(n, self.offset))
+        tail_start = max(0, self.offset - n)
+        f.seek(tail_start)
+        return head, f.read(self.offset - tail_start)
+
+    def resume(self) -> bool:
+        """Continua a leitura do ponto de parada se o arquivo apenas cresceu.
+
+        - Retorna False (o chamador reabre do início) se o arquivo encolheu ou se o
+          conteúdo já lido mudou (arquivo substituído por outro).
+        - Só vale com a fila esgotada (todas as linhas lidas já entregues).
+        """
+        if not self._exhausted or self._buffer or self._seen is None:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self.offset or self._fingerprint(f) != self._seen:
+                    return False
+        except OSError:
+            return False
+        self._open(_count_rows(self.path, self.offset))
+        return True
+
+    def close(self) -> None:
+        self._rows.close()
+        self._buffer.clear()
+        self._exhausted = True
+
+
+def queue_metrics(config: Dict[str, Any]) -> MetricsAggregator:
+    """Agregador de métricas associado a `metrics_path` (ver utils/metrics.py)."""
+    return get_metrics(_metrics_path(config), config)
+
+
+def queue_source_path(config: Dict[str, Any]) -> Optional[str]:
+    """Arquivo observado pelo agendador para acordar quando chegam novos itens."""
+    return _queue_path(config)
+
+
+def queue_health_path(config: Dict[str, Any]) -> str:
+    return _health_path(config)
+
+
+def queue_status(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumo da fila para o health: último fetch e itens restantes."""
+    if _store is not None and _backend(config) == "sqlite":
+        remaining = _store.pending()
+    elif _queue_source is not None:
+        remaining = _queue_source.remaining()
+    else:
+        remaining = 0
+    status = {"last_fetch": _last_fetch, "remaining_items": remaining, "retry_pending": len(_retry_heap)}
+    index = _processed_index(config)
+    if index is not None:
+        status["dedup"] = index.status()
+    if shard_index(config) is not None:
+        status["shard"] = f"{shard_index(config)}/{shard_count(config)}"
+    return status
+
+
+def merge_shard_reports(config: Dict[str, Any]) -> None:
+    """Consolida metrics/health dos shards em `metrics_path`/`health_path` (visão global)."""
+    base = {k: v for k, v in config.items() if k != "shard_index"}
+    merge_shard_files(base, _metrics_path(base), _health_path(base))
+
+
+def next_retry_in() -> Optional[float]:
+    """Segundos até a próxima retentativa agendada (None se não houver)."""
+    with _queue_lock:
+        if not _retry_heap:
+            return None
+        return max(0.0, _retry_heap[0][0] - time.monotonic())
+
+
 def initialize_queue(driver: Any, config: Dict[str, Any]) -> bool:
-    """Carrega itens de uma fila CSV simples (se existir) e indica se há itens.
+    """Abre uma fila CSV simples (se existir) e indica se há itens.
 
     - O CSV deve ter cabeçalho. Cada linha vira um dicionário.
+    - As linhas são lidas sob demanda (ver `_CsvQueueSource`); `queue_read_ahead`
+      em data/config.json define o tamanho do buffer (padrão: 256).
     - Esta implementação é intencionalmente simples para ser trocada por fonte real (API/DB).
     """
-    global _queue_loaded, _queue_items
+    with _queue_lock:
+        if _backend(config) == "sqlite":
+            has_items = _load_sqlite_queue(config)
+        else:
+            has_items = _load_queue(config)
+        return has_items or _retry_ready()
 
-    if _queue_loaded:
-        return len(_queue_items) > 0
+
+def _retry_ready() -> bool:
+    return bool(_retry_heap) and _retry_heap[0][0] <= time.monotonic()
+
+
+def _load_sqlite_queue(config: Dict[str, Any]) -> bool:
+    """Inicializa a fila persistente e importa o CSV quando ele mudou.
+
+    - Uma fila por arquivo (`queue_db_path`): na primeira abertura de cada arquivo no
+      processo, itens que ficaram in_progress (queda) voltam a pending.
+    - O checkpoint da última importação (tamanho/mtime do CSV) fica em `state_path`;
+      se o arquivo não mudou, a importação é pulada.
+    """
+    global _store
+
+    db_path = _db_path(config)
+    store = _stores.get(db_path)
+    if store is None:
+        store = _stores[db_path] = SqliteQueueStore(db_path)
+        recovered = store.recover()
+        if recovered:
+            log_info(f"Retomando {recovered} item(ns) interrompido(s) na execução anterior.")
+    _store = store
 
     path = _queue_path(config)
-    if not os.path.exists(path):
-        _queue_loaded = True
-        _queue_items = []
+    if os.path.exists(path):
+        stat = os.stat(path)
+        source = {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+        state = _read_json(_state_path(config))
+        if state.get("source") != source:
+            inserted = _store.import_csv(path, _item_key, accept=_source_filter(config))
+            log_info(f"Fila importada de {path}: {inserted} item(ns) novo(s) ou reativado(s).")
+            state["source"] = source
+            state["imported_at"] = datetime.utcnow().isoformat() + "Z"
+            _write_json_atomic(_state_path(config), state)
+
+    return _store.pending() > 0
+
+
+def _file_signature(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime)
+    except OSError:
+        return None
+
+
+def _load_queue(config: Dict[str, Any]) -> bool:
+    """Abre o CSV uma vez por processo e volta a lê-lo quando a fila esgota e o arquivo muda.
+
+    - Arquivo que apenas cresceu: continua da última linha lida (sem reentregar itens).
+    - Arquivo substituído ou truncado: reabre do início.
+    """
+    global _queue_loaded, _queue_source, _queue_signature
+
+    if _queue_loaded and _queue_source is not None and _queue_source.has_items():
+        return True
+
+    path = _queue_path(config)
+    signature = _file_signature(path)
+    if _queue_loaded and signature == _queue_signature:
         return False
 
-    with open(path, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        _queue_items = [row for row in reader]
     _queue_loaded = True
+    _queue_signature = signature
+    if signature is None:
+        _queue_source = None
+        return False
+
+    if _queue_source is not None and os.path.abspath(_queue_source.path) == os.path.abspath(path):
+        if _queue_source.resume():
+            return _queue_source.has_items()
+        log_info(f"Fila {path} substituída: relendo desde o início.")
 
-    return len(_queue_items) > 0
+    _queue_source = _CsvQueueSource(
+        path,
+        int(config.get("queue_read_ahead", 256)),
+        accept=_source_filter(config),
+        share=1.0 / shard_count(config) if shard_index(config) is not None else 1.0,
+    )
+    return _queue_source.has_items()
 
 
 def fetch_next_item(driver: Any, config: Dict[str, Any]) -> Optional[object]:
-    """Retorna o próximo item e registra estado/health se necessário."""
-    if not _queue_items:
-        return None
-    item = _queue_items.pop(0)
+    """Retorna o próximo item e registra estado/health se necessário.
 
-    # Atualiza health
-    _ensure_dir(_health_path(config))
-    with open(_health_path(config), 'w', encoding='utf-8') as f:
-        json.dump({
-            "last_fetch": datetime.utcnow().isoformat() + "Z",
-            "remaining_items": len(_queue_items),
-        }, f, ensure_ascii=False, indent=2)
+    - Retentativas cujo atraso já venceu têm prioridade; as demais ficam no heap
+      sem bloquear itens novos.
+    """
+    global _last_fetch
+
+    index = _processed_index(config)
+    with _queue_lock:
+        if _retry_ready():
+            item = heapq.heappop(_retry_heap)[2]
+        else:
+            # Confere de novo na entrega: o item pode ter sido concluído depois de lido
+            # (ex.: linha repetida no mesmo CSV)
+            while True:
+                if _store is not None and _backend(config) == "sqlite":
+                    item = _store.claim()
+                    if item is not None and _is_duplicate(item, config, index):
+                        _store.mark_done(_item_key(item))
+                        continue
+                else:
+                    item = _queue_source.pop() if _queue_source is not None else None
+                    if item is not None and _is_duplicate(item, config, index):
+                        continue
+                if item is None:
+                    return None
+                break
+
+    # Atualiza health apenas em memória; a gravação é feita em segundo plano (utils/health.py)
+    _last_fetch = datetime.utcnow().isoformat() + "Z"
 
     return item
 
 
+def fetch_next_batch(driver: Any, config: Dict[str, Any], size: int, max_wait: float = 0.0) -> List[Any]:
+    """Retorna até `size` itens (lista vazia se a fila estiver vazia).
+
+    - Sai assim que o lote enche; com o lote incompleto, espera até `max_wait` segundos
+      por mais itens (ex.: retentativas vencendo, itens importados por outro processo).
+    - Sem nenhum item, retorna na hora: a espera ociosa fica com o agendador de main.py.
+    """
+    items: List[Any] = []
+    deadline = time.monotonic() + max(0.0, max_wait)
+    interval = 0.05
+    while len(items) < size:
+        item = fetch_next_item(driver, config)
+        if item is not None:
+            items.append(item)
+            continue
+        remaining = deadline - time.monotonic()
+        if not items or remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+        interval = min(1.0, interval * 2)
+    return items
+
+
 def process_item(item: Any, driver: Any, config: Dict[str, Any]) -> None:
-    """Processa um item e registra métricas simples.
+    """Processa um item.
 
-    - Substitua esta função pela lógica do seu projeto.
-    - Esta função apenas registra métrica de sucesso por padrão.
+    - Substitua esta função pela lógica do seu projeto; para indicar falha, lance uma
+      exceção (o item vai para retentativa/dead-letter).
+    - As métricas processed_* são registradas pelo framework, na conclusão
+      (`mark_item_done`) ou na falha (`mark_item_failed`) do item.
     """
     # Exemplo básico: loga o ID do item (se existir) e considera sucesso
     item_id = item.get("id") if isinstance(item, dict) else None
     log_info(f"Processando item{f' id={item_id}' if item_id else ''}...")
-    success = True
-
-    # Atualiza métricas
-    _ensure_dir(_metrics_path(config))
-    metrics = {"processed_total": 0, "processed_success": 0, "processed_error": 0}
-    if os.path.exists(_metrics_path(config)):
+    log_info(f"Item{f' id={item_id}' if item_id else ''} processado com sucesso.")
+
+
+def process_batch(
+    items: List[Any],
+    driver: Any,
+    config: Dict[str, Any],
+    process: Optional[Callable[[Any, Any, Dict[str, Any]], None]] = None,
+) -> List[Optional[Exception]]:
+    """Processa um lote de itens e informa o resultado de cada um.
+
+    - Retorna uma lista alinhada com `items`: None para sucesso ou a exceção do item;
+      assim main.py conclui, reagenda ou envia à dead-letter cada item individualmente.
+    - Substitua pela lógica do seu projeto quando uma única navegação atende vários itens
+      (ex.: uma busca e ações em cada resultado da página). Uma exceção lançada aqui
+      falha o lote inteiro.
+    - Esta implementação de exemplo apenas processa os itens um a um com `process`
+      (components/hooks.py passa o hook `process_item`, com a lógica do projeto).
+    """
+    process = process or process_item
+    results: List[Optional[Exception]] = []
+    for item in items:
         try:
-            with open(_metrics_path(config), 'r', encoding='utf-8') as f:
-                metrics = json.load(f)
-        except Exception:
-            pass
-
-    metrics["processed_total"] = int(metrics.get("processed_total", 0)) + 1
-    if success:
-        metrics["processed_success"] = int(metrics.get("processed_success", 0)) + 1
-    else:
-        metrics["processed_error"] = int(metrics.get("processed_error", 0)) + 1
-
-    with open(_metrics_path(config), 'w', encoding='utf-8') as f:
-        json.dump(metrics, f, ensure_ascii=False, indent=2)
-
-    # Log final do item
-    if success:
-        log_info(f"Item{f' id={item_id}' if item_id else ''} processado com sucesso.")
-    else:
-        log_error(f"Falha ao processar item{f' id={item_id}' if item_id else ''}.")
-
-
-
+            process(item, driver, config)
+            results.append(None)
+        except TimeoutError:
+            raise
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+def mark_item_done(item: Any, config: Dict[str, Any]) -> None:
+    """Marca o item como concluído (métricas, fila persistente e índice de processados)."""
+    key = _item_key(item)
+    # Métricas em memória (gravadas em lote em metrics_path)
+    metrics = queue_metrics(config)
+    metrics.incr("processed_total")
+    metrics.incr("processed_success")
+    with _queue_lock:
+        _attempts.pop(key, None)
+    if _store is not None and _backend(config) == "sqlite":
+        _store.mark_done(key)
+    index = _processed_index(config)
+    if index is not None:
+        index.add(_dedup_key(item, config))
+
+
+def mark_item_failed(item: Any, config: Dict[str, Any], error: Optional[str] = None) -> None:
+    """Registra a falha do item: agenda retentativa com backoff ou envia à dead-letter.
+
+    Config (data/config.json):
+    - retry_max_attempts: tentativas totais por item (padrão: 3)
+    - retry_backoff_seconds / retry_backoff_max_seconds: atraso base (dobra a cada
+      tentativa) e teto (padrão: 5 / 300)
+    - dead_letter_path: CSV com os itens esgotados (padrão: logs/dead_letter.csv);
+      pode ser reimportado apontando `csv_queue_path` para ele
+
+    Métricas: `attempts_failed` conta cada tentativa com falha; processed_total e
+    processed_error contam o item uma única vez, quando ele vai para a dead-letter.
+    """
+    key = _item_key(item)
+    max_attempts = max(1, int(config.get("retry_max_attempts", 3)))
+    metrics = queue_metrics(config)
+    metrics.incr("attempts_failed")
+
+    with _queue_lock:
+        attempts = _attempts.get(key, 0) + 1
+        if attempts < max_attempts:
+            _attempts[key] = attempts
+            base = float(config.get("retry_backoff_seconds", 5))
+            delay = min(float(config.get("retry_backoff_max_seconds", 300)), base * 2 ** (attempts - 1))
+            heapq.heappush(_retry_heap, (time.monotonic() + delay, next(_retry_seq), item))
+        else:
+            _attempts.pop(key, None)
+
+    if attempts < max_attempts:
+        metrics.incr("retry_scheduled")
+        log_info(f"Item {key} agendado para nova tentativa ({attempts + 1}/{max_attempts}) em {delay:.0f}s.")
+        return
+
+    metrics.incr("processed_total")
+    metrics.incr("processed_error")
+    metrics.incr("dead_letter")
+    log_error(f"Item {key} enviado para dead-letter após {attempts} tentativa(s): {error}")
+    if _store is not None and _backend(config) == "sqlite":
+        _store.mark_failed(key, error)
+    _write_dead_letter(item, config, attempts, error)
+
+
+def _write_dead_letter(item: Any, config: Dict[str, Any], attempts: int, error: Optional[str]) -> None:
+    """Acrescenta o item ao CSV de dead-letter (colunas originais + dl_*)."""
+    row = dict(item) if isinstance(item, dict) else {"item": str(item)}
+    row.update({
+        "dl_error": (error or "")[:500],
+        "dl_attempts": attempts,
+        "dl_failed_at": datetime.utcnow().isoformat() + "Z",
+    })
+    path = _dead_letter_path(config)
+    _ensure_dir(path)
+    with _queue_lock:
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), list(row.keys()))
+        else:
+            header = list(row.keys())
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=header, extrasaction='ignore')
+            if not exists:
+                writer.writeheader()
+            writer.writerow(row)
@@ -1,15 +1,37 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import contextvars
+import functools
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Importações dos módulos que implementam a lógica específica de cada projeto.
 # Mantemos este arquivo como a “fachada” (pontos de extensão) para o REFramework.
-from components.actions.login import perform_login
+from components.actions.login import invalidate_session, perform_login
 from components.actions.queue import (
     initialize_queue,
     fetch_next_item,
+    fetch_next_batch,
     process_item as process_queue_item,
+    process_batch as process_queue_batch,
+    mark_item_done,
+    mark_item_failed,
+    queue_metrics,
+    queue_status,
+    queue_health_path,
+    queue_source_path,
+    next_retry_in,
+    merge_shard_reports,
 )
 from components.services.browser import create_driver, is_alive, close
-from components.services.selenium_utils import take_screenshot
+from components.services.downloads import get_download_watcher
+from components.services.driver_manager import DriverLifecycle
+from components.services.http_client import close_http_client, get_http_client, refresh_http_client
+from components.services.evidence import get_evidence_collector, shutdown_collectors
+from components.services.processed_index import close_processed_indexes
+from utils.config import log_info
+from utils.log import log_context
+from utils.tracing import get_tracer, shutdown_tracer
 
 
 def open_driver(config: Dict[str, Any]):
@@ -22,6 +44,23 @@ def open_driver(config: Dict[str, Any]):
     return create_driver(config)
 
 
+def driver_lifecycle(config: Dict[str, Any]) -> DriverLifecycle:
+    """Gerenciador de ciclo de vida (reciclagem/pré-aquecimento) para o driver de um worker.
+
+    - O substituto é aberto e autenticado em segundo plano (`open_driver` + `login`):
+      na troca, o worker já recebe um driver pronto, sem pausa de restauração/login.
+    """
+    return DriverLifecycle(lambda: _open_logged_in(config), close_driver, config)
+
+
+def _open_logged_in(config: Dict[str, Any]) -> Any:
+    driver = open_driver(config)
+    if driver and not login(driver, config):
+        close_driver(driver)
+        raise RuntimeError("login do driver pré-aquecido falhou")
+    return driver
+
+
 def is_platform_available(driver: Any, config: Dict[str, Any]) -> bool:
     """Valida se o driver/sessão está saudável e pronto para uso."""
     return is_alive(driver)
@@ -32,8 +71,10 @@ def login(driver: Any, config: Dict[str, Any]) -> bool:
 
     - Implementação em actions/login.py
     - Deve ser idempotente (não falhar se já estiver logado)
+    - Após restaurar a sessão ou enviar o formulário, o cliente HTTP do driver (se já
+      criado) recebe os novos cookies; drivers já autenticados não vão ao navegador.
     """
-    return perform_login(driver, config)
+    return perform_login(driver, config, on_login=refresh_http_client)
 
 
 def init_queue(driver: Any, config: Dict[str, Any]) -> Optional[object]:
@@ -51,22 +92,242 @@ def process_item(item: Any, driver: Any, config: Dict[str, Any]) -> None:
     process_queue_item(item, driver, config)
 
 
+def batch_size(config: Dict[str, Any]) -> int:
+    """Itens por lote (`batch_size`, padrão: 1). Com 1, main.py usa o modo item a item."""
+    return max(1, int(config.get("batch_size", 1) or 1))
+
+
+def get_next_batch(driver: Any, config: Dict[str, Any]) -> List[Any]:
+    """Obtém até `batch_size` itens (lista vazia se não houver).
+
+    - Com o lote incompleto, espera até `batch_max_wait_seconds` (padrão: 0) por mais itens.
+    """
+    return fetch_next_batch(
+        driver, config, batch_size(config), float(config.get("batch_max_wait_seconds", 0))
+    )
+
+
+def process_batch(items: List[Any], driver: Any, config: Dict[str, Any]) -> List[Optional[Exception]]:
+    """Processa um lote e retorna, alinhado com `items`, None (sucesso) ou a exceção de cada item.
+
+    - Usado quando `batch_size` > 1; implementação em actions/queue.py, que chama o hook
+      `process_item` para cada item (substitua quando uma navegação atende o lote todo).
+    - Para voltar ao modo item a item, lance NotImplementedError: main.py passa a usar
+      `process_item` para cada item.
+    - Uma exceção lançada aqui falha todos os itens do lote (cada um com sua retentativa).
+    - Sem limite próprio em `hook_timeouts`, o timeout é o de `process_item` vezes o
+      tamanho do lote.
+    """
+    return process_queue_batch(items, driver, config, process_item)
+
+
+def complete_item(item: Any, driver: Any, config: Dict[str, Any]) -> None:
+    """Registra que o item foi processado com sucesso (ex.: fila persistente)."""
+    mark_item_done(item, config)
+
+
+def fail_item(item: Any, driver: Any, config: Dict[str, Any], error: Exception) -> None:
+    """Registra que o processamento do item falhou: retentativa com backoff ou dead-letter.
+
+    - A sessão do driver volta a ser verificada no próximo login (pode ter expirado).
+    """
+    mark_item_failed(item, config, str(error))
+    if driver is not None:
+        invalidate_session(driver, config)
+
+
+def metrics(config: Dict[str, Any]):
+    """Agregador de métricas (contadores e latências por etapa) do projeto."""
+    return queue_metrics(config)
+
+
+def health_status(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Dados da fila publicados no health (último fetch, itens restantes).
+
+    - Inclui as chaves do config alteradas que só valem após reiniciar, se houver.
+    """
+    status = queue_status(config)
+    restart_required = getattr(config, "restart_required", None)
+    if restart_required:
+        status["config_restart_required"] = sorted(restart_required)
+    return status
+
+
+def health_path(config: Dict[str, Any]) -> str:
+    """Arquivo onde o heartbeat de health é gravado."""
+    return queue_health_path(config)
+
+
+def queue_watch_path(config: Dict[str, Any]) -> Optional[str]:
+    """Arquivo cuja alteração indica novos itens (acorda a espera entre ciclos)."""
+    return queue_source_path(config)
+
+
+def merge_shards(config: Dict[str, Any]) -> None:
+    """Gera a visão global (metrics/health) a partir dos arquivos de cada shard."""
+    merge_shard_reports(config)
+
+
+def next_wakeup(config: Dict[str, Any]) -> Optional[float]:
+    """Segundos até haver trabalho agendado (ex.: retentativa), limitando a espera ociosa."""
+    return next_retry_in()
+
+
 def cleanup_before_cycle(config: Dict[str, Any]) -> None:
     """Limpeza opcional antes do próximo ciclo (ex.: pastas temporárias)."""
     return None
 
 
 def close_driver(driver: Any) -> None:
-    """Fecha o driver de automação com segurança."""
+    """Fecha o driver de automação com segurança (e o pool HTTP associado a ele)."""
+    close_http_client(driver)
     close(driver)
 
 
+def http_client(driver: Any, config: Dict[str, Any]):
+    """Cliente HTTP (requests.Session com pool) autenticado com os cookies do driver.
+
+    - Use para passos que só leem/enviam dados (APIs, downloads diretos, formulários
+      simples) e deixe o Selenium para o que precisa de navegador:
+
+          resp = hooks.http_client(driver, config).get(f"/api/items/{item['id']}")
+          resp.raise_for_status()
+
+    - Um cliente por driver, reaproveitado entre itens; ver services/http_client.py.
+    """
+    return get_http_client(driver, config)
+
+
+def wait_for_download(
+    driver: Any,
+    config: Dict[str, Any],
+    item: Any,
+    trigger: Callable[[], Any],
+    timeout: Optional[float] = None,
+    count: int = 1,
+) -> List[str]:
+    """Executa `trigger()` (ex.: clique em "Baixar") e aguarda o(s) arquivo(s) do item.
+
+    - Retorna os caminhos finais em `<download_items_dir>/<id do item>/`.
+    - Sem esperas fixas: conclui assim que o navegador termina de gravar o arquivo.
+    - Lança DownloadTimeoutError após `timeout` (padrão: download_timeout_seconds).
+    """
+    item_id = item.get("id") if isinstance(item, dict) else item
+    with get_download_watcher(config).expect(driver, item_id) as download:
+        trigger()
+        return download.wait(timeout=timeout, count=count)
+
+
 def capture_error_evidence(driver: Any, config: Dict[str, Any], prefix: str = "erro") -> None:
-    """Captura evidência (screenshot) para auxiliar investigação de falhas."""
-    folder = config.get("screenshot_folder") or "logs/screenshots/"
+    """Captura evidência (screenshot, HTML e URL) para auxiliar investigação de falhas.
+
+    - Apenas a leitura do driver acontece aqui; compactação, gravação e retenção
+      rodam em segundo plano (ver services/evidence.py).
+    """
     try:
-        take_screenshot(driver, folder, prefix=prefix)
+        get_evidence_collector(config).capture(driver, prefix=prefix)
     except Exception:
         pass
 
 
+def shutdown(config: Dict[str, Any]) -> None:
+    """Libera recursos compartilhados ao encerrar (evidências pendentes, trace, índices)."""
+    shutdown_collectors()
+    shutdown_tracer()
+    close_processed_indexes()
+
+
+class HookRunner:
+    """Executa hooks a partir do loop asyncio sem bloqueá-lo.
+
+    - Hooks síncronos (Selenium) rodam em um executor dedicado de uma única thread:
+      todas as chamadas a um mesmo driver ficam serializadas nessa thread, enquanto
+      o loop de eventos segue livre para heartbeat, timers e outros workers.
+    - Hooks declarados com `async def` (ou que retornam um awaitable) são aguardados
+      diretamente no loop.
+    - Timeouts por hook vêm de `hook_timeouts` (ex.: {"login": 120}) ou, na falta,
+      de `hook_timeout_seconds` (padrão: 0 = sem limite). Em caso de timeout a thread
+      presa é abandonada e um novo executor assume as próximas chamadas; se era um
+      `open_driver`, o driver que ela ainda abrir é fechado assim que ficar pronto.
+    - `process_batch` sem limite próprio herda o de `process_item`, multiplicado pelo
+      número de itens do lote.
+    - Com `trace_enabled`, cada chamada vira um span (ver utils/tracing.py); desligado,
+      o custo é apenas um teste de None.
+    """
+
+    def __init__(self, config: Dict[str, Any], name: str = "hooks") -> None:
+        self._config = config
+        self._name = name
+        self._executor = self._new_executor()
+        self._tracer = get_tracer(config)
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix=self._name)
+
+    def timeout_for(self, hook_name: str, args: tuple = ()) -> Optional[float]:
+        timeouts = self._config.get("hook_timeouts") or {}
+        if hook_name == "process_batch" and hook_name not in timeouts and args:
+            per_item = self.timeout_for("process_item")
+            return per_item * max(1, len(args[0])) if per_item else None
+        value = timeouts.get(hook_name, self._config.get("hook_timeout_seconds", 0))
+        return float(value) if value else None
+
+    async def run(self, hook_name: str, *args: Any, **kwargs: Any) -> Any:
+        """Executa o hook `hook_name` deste módulo com os argumentos informados."""
+        # Busca pelo nome a cada chamada: substituições em tempo de execução (ex.: testes) valem
+        func = globals()[hook_name]
+        item_args = _span_args(args)
+        # Logs emitidos pelo hook levam worker, etapa e item (formato JSON, ver utils/log.py)
+        with log_context(worker=self._name, stage=hook_name, **item_args):
+            if self._tracer is None:
+                return await self._call(hook_name, func, args, kwargs)
+            with self._tracer.span(hook_name, self._name, item_args) as span_args:
+                if not inspect.iscoroutinefunction(func) and self._tracer.should_profile(hook_name):
+                    func = self._tracer.profiled(func, span_args)
+                return await self._call(hook_name, func, args, kwargs)
+
+    async def _call(self, hook_name: str, func: Any, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        timeout = self.timeout_for(hook_name, args)
+        if inspect.iscoroutinefunction(func):
+            awaitable = func(*args, **kwargs)
+        else:
+            # Leva o contexto de log da tarefa para a thread do executor
+            call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+            future = self._executor.submit(call)
+            awaitable = asyncio.wrap_future(future)
+        try:
+            result = await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            # A thread continua presa na chamada bloqueante; as próximas usam outro executor
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            if hook_name == "open_driver" and not inspect.iscoroutinefunction(func):
+                # Ninguém mais usará o navegador que a thread abandonada ainda pode abrir
+                future.add_done_callback(_close_abandoned_driver)
+            raise TimeoutError(f"Hook '{hook_name}' excedeu {timeout}s")
+        if inspect.isawaitable(result):
+            result = await asyncio.wait_for(result, timeout)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _close_abandoned_driver(future: Future) -> None:
+    """Fecha o driver aberto por um `open_driver` que já tinha excedido o timeout."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    driver = future.result()
+    if driver:
+        log_info("Driver aberto após o timeout de open_driver: fechando.")
+        close_driver(driver)
+
+
+def _span_args(args: tuple) -> Dict[str, Any]:
+    """Identifica o item (coluna `id`) ou os itens de um lote entre os argumentos do hook."""
+    for arg in args:
+        if isinstance(arg, dict) and "id" in arg:
+            return {"item_id": arg.get("id")}
+        if isinstance(arg, list) and arg and isinstance(arg[0], dict):
+            return {"item_ids": [item.get("id") for item in arg]}
+    return {}
@@ -1,5 +1,14 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
+import json
 import os
+import threading
+
+from components.services.downloads import download_dir as downloads_folder
+from utils.sharding import shard_path
+
+# Caminhos dos binários de driver já resolvidos neste processo (por navegador)
+_driver_paths: Dict[str, str] = {}
+_driver_paths_lock = threading.Lock()
 
 
 def _ensure_dir(path: str) -> None:
@@ -7,68 +16,234 @@ def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def _chrome_driver(config: Dict[str, Any]):
-    """Cria um WebDriver do Chrome configurado conforme o config."""
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
+def _driver_cache_file(config: Dict[str, Any]) -> str:
+    """Cache em disco dos binários (padrão: logs/ na raiz do projeto, como os demais estados).
+
+    - Independe da pasta de onde o robô é iniciado, então vale também offline.
+    """
+    # browser.py -> services -> components -> raiz do projeto
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return config.get("driver_cache_path") or os.path.join(root, "logs", "driver_paths.json")
+
+
+def _read_driver_cache(path: str) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _driver_binary(browser: str, config: Dict[str, Any], install: Callable[[], str]) -> str:
+    """Resolve o caminho do binário do driver uma única vez e o reaproveita.
+
+    - Ordem: cache em memória -> cache em disco (`driver_cache_path`) -> webdriver-manager.
+    - Com o caminho em cache e o arquivo presente, nenhum acesso à rede é feito (funciona offline).
+    """
+    with _driver_paths_lock:
+        path = _driver_paths.get(browser)
+        if path and os.path.exists(path):
+            return path
+
+        cache_file = _driver_cache_file(config)
+        cached = _read_driver_cache(cache_file)
+        path = cached.get(browser)
+        if not path or not os.path.exists(path):
+            path = install()
+            cached[browser] = path
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+                tmp = f"{cache_file}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(cached, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, cache_file)
+            except Exception:
+                pass
+        _driver_paths[browser] = path
+        return path
+
+
+# Padrões de URL bloqueados (via CDP) para cada tipo de recurso em `block_resource_types`
+_RESOURCE_URL_PATTERNS: Dict[str, List[str]] = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.m4a", "*.avi"],
+    "stylesheet": ["*.css"],
+}
+
+# Perfis de driver: "default" mantém o comportamento original; "lean" corta o que não
+# é necessário para automação (imagens, fontes, mídia, rede em segundo plano).
+_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "page_load_strategy": "normal",
+        "block_resource_types": [],
+        "block_url_patterns": [],
+        "disable_background": False,
+    },
+    "lean": {
+        "page_load_strategy": "eager",
+        "block_resource_types": ["image", "font", "media"],
+        "block_url_patterns": [],
+        "disable_background": True,
+    },
+}
+
+_LEAN_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# Pastas de cache em uso neste processo (cada navegador aberto precisa da sua)
+_cache_slots_in_use: Set[str] = set()
+_cache_slots_lock = threading.Lock()
 
-    download_dir = config.get("download_dir") or os.path.join(os.getcwd(), "downloads")
+
+def driver_profile(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta o perfil efetivo: base de `driver_profile` + chaves explícitas do config.
+
+    Chaves aceitas (todas opcionais):
+    - driver_profile: "default" | "lean" (padrão: default)
+    - page_load_strategy: "normal" | "eager" | "none"
+    - block_resource_types: lista entre image, font, media, stylesheet
+    - block_url_patterns: padrões extras (ex.: "*google-analytics.com*")
+    - browser_cache_dir: pasta de cache em disco reaproveitada entre execuções
+      (uma por shard: processos diferentes não compartilham slots)
+    """
+    name = str(config.get("driver_profile", "default")).lower()
+    profile = dict(_PROFILES.get(name, _PROFILES["default"]))
+    for key in ("page_load_strategy", "block_resource_types", "block_url_patterns"):
+        if config.get(key) is not None:
+            profile[key] = config[key]
+    profile["browser_cache_dir"] = config.get("browser_cache_dir")
+    return profile
+
+
+def _blocked_url_patterns(profile: Dict[str, Any]) -> List[str]:
+    patterns: List[str] = []
+    for kind in profile.get("block_resource_types") or []:
+        patterns.extend(_RESOURCE_URL_PATTERNS.get(str(kind).lower(), []))
+    patterns.extend(profile.get("block_url_patterns") or [])
+    return patterns
+
+
+def _acquire_cache_slot(base_dir: str) -> str:
+    """Reserva uma subpasta de cache livre (slot-0, slot-1, ...) para um novo navegador.
+
+    - Os nomes são estáveis, então o cache é reaproveitado entre reinícios.
+    """
+    with _cache_slots_lock:
+        index = 0
+        while os.path.join(base_dir, f"slot-{index}") in _cache_slots_in_use:
+            index += 1
+        slot = os.path.join(base_dir, f"slot-{index}")
+        _cache_slots_in_use.add(slot)
+    _ensure_dir(slot)
+    return slot
+
+
+def _reserve_cache_slot(profile: Dict[str, Any], config: Dict[str, Any]) -> Optional[str]:
+    """Slot de cache do novo navegador (None sem `browser_cache_dir`).
+
+    - Os slots são controlados por processo; cada shard usa a própria pasta base
+      (`<browser_cache_dir>.shard<i>`), então dois Chromes nunca dividem um slot.
+    """
+    cache_dir = profile.get("browser_cache_dir")
+    return _acquire_cache_slot(shard_path(cache_dir, config)) if cache_dir else None
+
+
+def _release_cache_slot(driver: Any) -> None:
+    slot = getattr(driver, "_reframework_cache_slot", None)
+    if slot:
+        with _cache_slots_lock:
+            _cache_slots_in_use.discard(slot)
+
+
+def _build_options(options: Any, config: Dict[str, Any], profile: Dict[str, Any], cache_slot: Optional[str]) -> Any:
+    """Aplica as opções comuns a Chrome e Edge (ambos Chromium) conforme o perfil."""
+    download_dir = downloads_folder(config)
     _ensure_dir(download_dir)
 
-    options = Options()
-    if str(config.get("headless", True)).lower() in ("1", "true", "yes"):  # tolera string/bool
+    if config.get("headless", True):  # já convertido para bool na leitura do config
         options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-dev-shm-usage")
-    prefs = {
+    options.page_load_strategy = profile.get("page_load_strategy") or "normal"
+
+    if profile.get("disable_background"):
+        for arg in _LEAN_ARGS:
+            options.add_argument(arg)
+    if cache_slot:
+        options.add_argument(f"--disk-cache-dir={os.path.abspath(cache_slot)}")
+
+    prefs: Dict[str, Any] = {
         "download.default_directory": download_dir,
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
     }
+    if "image" in (profile.get("block_resource_types") or []):
+        # Bloqueio nativo de imagens (mais barato que interceptar por URL)
+        prefs["profile.managed_default_content_settings.images"] = 2
     options.add_experimental_option("prefs", prefs)
+    return options
 
-    # webdriver-manager baixa e gerencia o binário do driver automaticamente
-    service = ChromeService(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
 
-
-def _edge_driver(config: Dict[str, Any]):
-    """Cria um WebDriver do Edge configurado conforme o config."""
+def _chromium_driver(browser: str, config: Dict[str, Any]):
+    """Cria um WebDriver Chromium (Chrome ou Edge) configurado conforme o perfil."""
     from selenium import webdriver
-    from selenium.webdriver.edge.options import Options
-    from selenium.webdriver.edge.service import Service as EdgeService
-    from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
-    download_dir = config.get("download_dir") or os.path.join(os.getcwd(), "downloads")
-    _ensure_dir(download_dir)
+    if browser == "edge":
+        from selenium.webdriver.edge.options import Options
+        from selenium.webdriver.edge.service import Service
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager as Manager
+        driver_cls = webdriver.Edge
+    else:
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager as Manager
+        driver_cls = webdriver.Chrome
 
-    options = Options()
-    if str(config.get("headless", True)).lower() in ("1", "true", "yes"):
-        options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_experimental_option(
-        "prefs",
-        {
-            "download.default_directory": download_dir,
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "safebrowsing.enabled": True,
-        },
-    )
-
-    # webdriver-manager baixa e gerencia o binário do driver automaticamente
-    service = EdgeService(EdgeChromiumDriverManager().install())
-    driver = webdriver.Edge(service=service, options=options)
+    profile = driver_profile(config)
+    cache_slot = _reserve_cache_slot(profile, config)
+    try:
+        options = _build_options(Options(), config, profile, cache_slot)
+        # webdriver-manager baixa o binário do driver apenas na primeira vez (depois usa o cache)
+        service = Service(_driver_binary(browser, config, lambda: Manager().install()))
+        driver = driver_cls(service=service, options=options)
+    except Exception:
+        if cache_slot:
+            with _cache_slots_lock:
+                _cache_slots_in_use.discard(cache_slot)
+        raise
+    driver._reframework_cache_slot = cache_slot
+
+    patterns = _blocked_url_patterns(profile)
+    if patterns:
+        # Bloqueio por URL via Chrome DevTools Protocol (fontes, mídia, padrões extras)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception:
+            pass
     return driver
 
 
+def _chrome_driver(config: Dict[str, Any]):
+    """Cria um WebDriver do Chrome configurado conforme o config."""
+    return _chromium_driver("chrome", config)
+
+
+def _edge_driver(config: Dict[str, Any]):
+    """Cria um WebDriver do Edge configurado conforme o config."""
+    return _chromium_driver("edge", config)
+
+
 def create_driver(config: Dict[str, Any]) -> Optional[Any]:
     """Cria e retorna um WebDriver do Selenium baseado em config.
 
@@ -76,6 +251,7 @@ def create_driver(config: Dict[str, Any]) -> Optional[Any]:
     - browser: "chrome" | "edge" (padrão: chrome)
     - headless: bool (padrão: True)
     - download_dir: str (pasta para downloads)
+    - driver_profile e demais chaves de carregamento: ver driver_profile()
     """
     browser = str(config.get("browser", "chrome")).lower()
     try:
@@ -99,5 +275,62 @@ def close(driver: Any) -> None:
         driver.quit()  # type: ignore[attr-defined]
     except Exception:
         pass
+    _release_cache_slot(driver)
+
+
+def _children(pid: int) -> list:
+    """PIDs filhos diretos (Linux, via /proc)."""
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", "r") as f:
+                children.extend(int(c) for c in f.read().split())
+    except Exception:
+        pass
+    return children
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except Exception:
+        pass
+    return 0
+
 
+def driver_rss_mb(driver: Any) -> Optional[float]:
+    """Memória (RSS, MB) da árvore de processos do driver: chromedriver + navegador.
 
+    - Usa psutil se estiver instalado; senão lê /proc (Linux).
+    - Retorna None quando não é possível medir (ex.: driver remoto, outro SO).
+    """
+    try:
+        pid = driver.service.process.pid  # type: ignore[attr-defined]
+    except Exception:
+        return None
+    try:
+        import psutil  # type: ignore
+
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    if not os.path.isdir("/proc"):
+        return None
+    total_kb = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        total_kb += _rss_kb(current)
+        pending.extend(_children(current))
+    return total_kb / 1024
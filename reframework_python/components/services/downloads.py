@@ -0,0 +1,188 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+from utils.config import log_error, log_info
+
+# Extensões/prefixos de arquivos ainda em download (Chrome/Edge, Firefox, temporários)
+_PARTIAL_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".tmp")
+_PARTIAL_PREFIXES = (".com.google.Chrome", ".org.chromium.Chromium", "~")
+
+
+class DownloadTimeoutError(RuntimeError):
+    """Download não concluído no prazo.
+
+    - Não é um TimeoutError: o worker trata como falha do item, sem descartar o driver.
+    """
+
+
+def download_dir(config: Dict[str, Any]) -> str:
+    """Pasta de downloads configurada nos drivers (mesma regra de services/browser.py)."""
+    return os.path.abspath(config.get("download_dir") or os.path.join(os.getcwd(), "downloads"))
+
+
+def _is_partial(name: str) -> bool:
+    return name.endswith(_PARTIAL_SUFFIXES) or name.startswith(_PARTIAL_PREFIXES)
+
+
+def _scan(folder: str) -> Dict[str, Tuple[int, float]]:
+    """Arquivos da pasta (nome -> tamanho, mtime) em uma única varredura com os.scandir."""
+    files: Dict[str, Tuple[int, float]] = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime)
+    except FileNotFoundError:
+        pass
+    return files
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", value).strip("._") or "item"
+
+
+def _move(src: str, folder: str) -> str:
+    """Move para `folder` sem copiar quando possível (rename); evita sobrescrever nomes."""
+    os.makedirs(folder, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(src))
+    dest = os.path.join(folder, base + ext)
+    n = 1
+    while os.path.exists(dest):
+        dest = os.path.join(folder, f"{base} ({n}){ext}")
+        n += 1
+    try:
+        os.replace(src, dest)
+    except OSError:
+        # Sistemas de arquivos diferentes: cópia + remoção
+        shutil.move(src, dest)
+    return dest
+
+
+class PendingDownload:
+    """Download(s) esperado(s) para um item; criado por `DownloadWatcher.expect()`."""
+
+    def __init__(self, watcher: "DownloadWatcher", item_id: str, folder: str, isolated: bool) -> None:
+        self.watcher = watcher
+        self.item_id = item_id
+        self.folder = folder
+        self.isolated = isolated
+        self._before = {} if isolated else _scan(folder)
+
+    def _new_files(self) -> Dict[str, Tuple[int, float]]:
+        files = _scan(self.folder)
+        if self.isolated:
+            return files
+        return {name: info for name, info in files.items() if self._before.get(name) != info}
+
+    def wait(self, timeout: Optional[float] = None, count: int = 1) -> List[str]:
+        """Aguarda `count` arquivo(s) concluído(s) e os move para a pasta do item.
+
+        - Arquivos parciais (.crdownload, .part, ...) são ignorados; um arquivo é dado
+          como concluído quando não há parciais pendentes e seu tamanho não muda
+          entre duas varreduras seguidas.
+        - A varredura começa a cada 50 ms e espaça até `poll_max` (pasta pequena:
+          custo de um scandir por verificação).
+        - Lança DownloadTimeoutError se o prazo acabar antes.
+        """
+        timeout = self.watcher.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        interval = 0.05
+        previous: Dict[str, Tuple[int, float]] = {}
+        while True:
+            files = self._new_files()
+            partial = [name for name in files if _is_partial(name)]
+            done = sorted(
+                name for name, info in files.items()
+                if not _is_partial(name) and previous.get(name) == info
+            )
+            if not partial and len(done) >= count:
+                return [self.watcher.store(os.path.join(self.folder, name), self.item_id) for name in done]
+            if time.monotonic() >= deadline:
+                raise DownloadTimeoutError(
+                    f"Download do item {self.item_id} não concluído em {timeout:.1f}s "
+                    f"(concluídos: {len(done)}, em andamento: {len(partial)})"
+                )
+            previous = files
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(self.watcher.poll_max, interval * 1.3)
+
+
+class DownloadWatcher:
+    """Detecta downloads concluídos e os associa ao item que os disparou.
+
+    - Com CDP (Chrome/Edge), cada `expect()` aponta os downloads do navegador para uma
+      pasta temporária exclusiva (`<download_dir>/.staging/<token>`): o que aparecer lá
+      pertence ao item, mesmo com vários workers baixando ao mesmo tempo.
+    - Sem CDP, compara a pasta de downloads antes/depois do gatilho (funciona com um
+      worker por pasta de download).
+    - Os arquivos concluídos vão para `<items_dir>/<id do item>/` via os.replace (sem cópia
+      no mesmo sistema de arquivos).
+    """
+
+    def __init__(
+        self, base_dir: str, items_dir: Optional[str] = None, timeout: float = 60, poll_max: float = 0.25
+    ) -> None:
+        self.base_dir = base_dir
+        self.items_dir = items_dir or os.path.join(base_dir, "items")
+        self.timeout = timeout
+        self.poll_max = max(0.05, poll_max)
+
+    def _set_browser_folder(self, driver: Any, folder: str) -> bool:
+        try:
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "allow", "downloadPath": folder})
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def expect(self, driver: Any, item_id: Any) -> Iterator[PendingDownload]:
+        """Prepara a captura; dispare o download dentro do bloco e chame `wait()`.
+
+            with watcher.expect(driver, item["id"]) as download:
+                safe_click(driver, "#baixar")
+                paths = download.wait(timeout=120)
+        """
+        staging = os.path.join(self.base_dir, ".staging", uuid.uuid4().hex)
+        os.makedirs(staging, exist_ok=True)
+        isolated = self._set_browser_folder(driver, staging)
+        if not isolated:
+            os.rmdir(staging)
+            os.makedirs(self.base_dir, exist_ok=True)
+        pending = PendingDownload(self, _safe_name(str(item_id)), staging if isolated else self.base_dir, isolated)
+        try:
+            yield pending
+        finally:
+            if isolated:
+                self._set_browser_folder(driver, self.base_dir)
+                # Sobras (ex.: download abandonado no timeout) não são apagadas
+                try:
+                    os.rmdir(staging)
+                except OSError:
+                    log_error(f"Pasta de download temporária não vazia mantida: {staging}")
+
+    def store(self, path: str, item_id: str) -> str:
+        dest = _move(path, os.path.join(self.items_dir, item_id))
+        log_info(f"Download do item {item_id} concluído: {dest}")
+        return dest
+
+
+def get_download_watcher(config: Dict[str, Any]) -> DownloadWatcher:
+    """Watcher configurado pelo config.
+
+    - download_dir: pasta de downloads do navegador (padrão: ./downloads)
+    - download_items_dir: destino por item (padrão: <download_dir>/items)
+    - download_timeout_seconds: prazo padrão de `wait()` (padrão: 60)
+    """
+    base = download_dir(config)
+    items = config.get("download_items_dir")
+    return DownloadWatcher(
+        base,
+        items_dir=os.path.abspath(items) if items else None,
+        timeout=float(config.get("download_timeout_seconds", 60)),
+    )
@@ -0,0 +1,136 @@
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from components.services.browser import driver_rss_mb
+from utils.config import log_error, log_info
+
+
+class DriverLifecycle:
+    """Controla o ciclo de vida do driver de um worker: reciclagem e pré-aquecimento.
+
+    Config (data/config.json), 0 desativa cada critério:
+    - driver_max_items: recicla após N itens processados
+    - driver_max_minutes: recicla após N minutos de uso
+    - driver_max_rss_mb: recicla quando a árvore de processos do navegador passa de N MB
+    - driver_rss_check_seconds: intervalo mínimo entre medições de RSS (padrão: 30)
+
+    Quando um critério é atingido, um driver substituto é criado em segundo plano
+    (pela `factory`, que também faz o login) enquanto o atual continua processando;
+    a troca acontece assim que ele fica pronto.
+    """
+
+    def __init__(self, factory: Callable[[], Any], closer: Callable[[Any], None], config: Dict[str, Any]) -> None:
+        self._factory = factory
+        self._closer = closer
+        self.max_items = int(config.get("driver_max_items", 0) or 0)
+        self.max_seconds = float(config.get("driver_max_minutes", 0) or 0) * 60
+        self.max_rss_mb = float(config.get("driver_max_rss_mb", 0) or 0)
+        self.rss_check_seconds = float(config.get("driver_rss_check_seconds", 30))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-prewarm")
+        self._spare: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._opened_at = time.monotonic()
+        self._items = 0
+        self._last_rss_check = 0.0
+        self._rss_exceeded = False
+
+    def opened(self) -> None:
+        """Registra que um novo driver entrou em uso (zera contadores)."""
+        self._opened_at = time.monotonic()
+        self._items = 0
+        self._last_rss_check = time.monotonic()
+        self._rss_exceeded = False
+
+    def item_done(self) -> None:
+        self._items += 1
+
+    def recycle_reason(self, driver: Any) -> Optional[str]:
+        """Motivo para reciclar o driver atual, ou None se ele ainda pode ser usado."""
+        if self.max_items and self._items >= self.max_items:
+            return f"{self._items} itens processados"
+        age = time.monotonic() - self._opened_at
+        if self.max_seconds and age >= self.max_seconds:
+            return f"{age / 60:.1f} minutos de uso"
+        if self.max_rss_mb:
+            now = time.monotonic()
+            if not self._rss_exceeded and now - self._last_rss_check >= self.rss_check_seconds:
+                self._last_rss_check = now
+                rss = driver_rss_mb(driver)
+                self._rss_exceeded = rss is not None and rss >= self.max_rss_mb
+                if self._rss_exceeded:
+                    log_info(f"Memória do navegador em {rss:.0f} MB (limite {self.max_rss_mb:.0f} MB).")
+            if self._rss_exceeded:
+                return "limite de memória atingido"
+        return None
+
+    def prewarm(self) -> None:
+        """Inicia a criação de um driver substituto em segundo plano (se ainda não iniciada)."""
+        with self._lock:
+            if self._spare is None:
+                self._spare = self._executor.submit(self._factory)
+
+    def take_spare(self) -> Optional[Any]:
+        """Retorna o driver substituto se já estiver pronto (sem bloquear)."""
+        with self._lock:
+            spare = self._spare
+            if spare is None or not spare.done():
+                return None
+            self._spare = None
+        try:
+            return spare.result()
+        except Exception as exc:
+            log_error(f"Falha ao pré-aquecer driver: {exc}")
+            return None
+
+    def maybe_swap(self, driver: Any) -> Any:
+        """Troca o driver atual pelo substituto quando há motivo e ele já está pronto.
+
+        - Não espera o substituto: enquanto ele não fica pronto, o driver atual segue em uso.
+        - Pode medir a memória do navegador (psutil ou /proc): chame fora do loop asyncio.
+        - O driver antigo é fechado em segundo plano.
+        """
+        reason = self.recycle_reason(driver)
+        if not reason:
+            return driver
+        self.prewarm()
+        spare = self.take_spare()
+        if not spare:
+            return driver
+        log_info(f"Reciclando driver ({reason}).")
+        self.opened()
+        self.close_in_background(driver)
+        return spare
+
+    def close_in_background(self, driver: Any) -> threading.Thread:
+        """Fecha o driver em uma thread própria e retorna a thread (para `join` opcional).
+
+        - `quit()` de um navegador travado pode demorar ou nunca retornar; fora do loop
+          asyncio, isso não congela o heartbeat nem os outros workers.
+        """
+        thread = threading.Thread(target=self._close_quietly, args=(driver,), name="driver-close", daemon=True)
+        thread.start()
+        return thread
+
+    def _close_quietly(self, driver: Any) -> None:
+        try:
+            self._closer(driver)
+        except Exception as exc:
+            log_error(f"Falha ao fechar driver: {exc}")
+
+    def shutdown(self) -> None:
+        """Descarta o substituto (se houver) e encerra a thread de pré-aquecimento."""
+        with self._lock:
+            spare, self._spare = self._spare, None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if spare is not None:
+            spare.add_done_callback(self._close_spare)
+
+    def _close_spare(self, future: Future) -> None:
+        try:
+            driver = future.result()
+        except Exception:
+            return
+        if driver:
+            self._closer(driver)
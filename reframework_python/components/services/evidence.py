@@ -0,0 +1,157 @@
+from typing import Any, Dict, Optional
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.config import log_error, log_info
+
+
+class EvidenceCollector:
+    """Captura de evidências de erro fora do loop dos workers.
+
+    - No worker, apenas os dados brutos são lidos do driver (screenshot em memória,
+      HTML e URL), enquanto a página ainda está no estado do erro.
+    - Compactação, gravação em disco e retenção rodam em um pool de threads limitado.
+      Se houver `max_pending` capturas na fila, novas evidências são descartadas
+      (com log) em vez de atrasar o processamento.
+    - Retenção: após cada gravação, remove as evidências mais antigas que passem de
+      `max_age_days` ou que excedam `max_mb` no total da pasta.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        workers: int = 2,
+        max_pending: int = 20,
+        archive: bool = True,
+        max_mb: float = 500,
+        max_age_days: float = 7,
+    ) -> None:
+        self.folder = folder
+        self.archive = archive
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 86400
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="evidence")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._retention_lock = threading.Lock()
+
+    def capture(self, driver: Any, prefix: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> bool:
+        """Coleta os dados do driver e agenda a gravação. Retorna False se a evidência foi descartada."""
+        if not self._slots.acquire(blocking=False):
+            log_error("Evidência descartada: fila de capturas cheia.")
+            return False
+        try:
+            data = {
+                "png": _safe(lambda: driver.get_screenshot_as_png()),
+                "html": _safe(lambda: driver.page_source),
+                "url": _safe(lambda: driver.current_url),
+            }
+            meta = {"url": data["url"], "captured_at": datetime.utcnow().isoformat() + "Z"}
+            meta.update(extra or {})
+            self._executor.submit(self._write, prefix, data, meta)
+        except Exception:
+            self._slots.release()
+            raise
+        return True
+
+    def _write(self, prefix: Optional[str], data: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            base = os.path.join(self.folder, f"{prefix + '_' if prefix else ''}{ts}")
+            if self.archive:
+                import zipfile
+
+                with zipfile.ZipFile(f"{base}.zip", "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                    if data["png"]:
+                        # PNG já é comprimido: armazenado sem nova compressão
+                        zf.writestr("screenshot.png", data["png"], compress_type=zipfile.ZIP_STORED)
+                    if data["html"]:
+                        zf.writestr("page.html", data["html"])
+                    zf.writestr("meta.json", json.dumps(meta, ensure_ascii=False, indent=2))
+            else:
+                if data["png"]:
+                    with open(f"{base}.png", "wb") as f:
+                        f.write(data["png"])
+                if data["html"]:
+                    with open(f"{base}.html", "w", encoding="utf-8") as f:
+                        f.write(data["html"])
+            self.enforce_retention()
+        except Exception as exc:
+            log_error(f"Falha ao gravar evidência: {exc}")
+        finally:
+            self._slots.release()
+
+    def enforce_retention(self) -> None:
+        """Remove evidências antigas ou excedentes (mais antigas primeiro)."""
+        with self._retention_lock:
+            try:
+                entries = [e for e in os.scandir(self.folder) if e.is_file()]
+            except FileNotFoundError:
+                return
+            files = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+            now = time.time()
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for mtime, size, path in files:
+                too_old = self.max_age_seconds > 0 and now - mtime > self.max_age_seconds
+                too_big = self.max_bytes > 0 and total > self.max_bytes
+                if not (too_old or too_big):
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            if removed:
+                log_info(f"Retenção de evidências: {removed} arquivo(s) removido(s).")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def _safe(func):
+    try:
+        return func()
+    except Exception:
+        return None
+
+
+_collectors: Dict[str, EvidenceCollector] = {}
+_collectors_lock = threading.Lock()
+
+
+def get_evidence_collector(config: Dict[str, Any]) -> EvidenceCollector:
+    """Coletor de evidências (único por pasta) configurado em data/config.json.
+
+    - screenshot_folder: pasta das evidências (padrão: logs/screenshots/)
+    - evidence_workers / evidence_max_pending: tamanho do pool e da fila (padrão: 2 / 20)
+    - evidence_archive: grava .zip com screenshot, HTML e metadados (padrão: True)
+    - evidence_max_mb / evidence_max_age_days: orçamento de retenção (padrão: 500 / 7; 0 = sem limite)
+    """
+    folder = config.get("screenshot_folder") or "logs/screenshots/"
+    with _collectors_lock:
+        collector = _collectors.get(folder)
+        if collector is None:
+            collector = _collectors[folder] = EvidenceCollector(
+                folder,
+                workers=int(config.get("evidence_workers", 2)),
+                max_pending=int(config.get("evidence_max_pending", 20)),
+                archive=bool(config.get("evidence_archive", True)),
+                max_mb=float(config.get("evidence_max_mb", 500)),
+                max_age_days=float(config.get("evidence_max_age_days", 7)),
+            )
+        return collector
+
+
+def shutdown_collectors() -> None:
+    """Aguarda as gravações pendentes de todos os coletores (ao encerrar o programa)."""
+    with _collectors_lock:
+        collectors = list(_collectors.values())
+        _collectors.clear()
+    for collector in collectors:
+        collector.shutdown(wait=True)
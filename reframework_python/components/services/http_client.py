@@ -0,0 +1,169 @@
+from typing import Any, Dict, Iterable, Optional
+import threading
+import time
+import weakref
+from urllib.parse import urljoin
+
+from utils.config import log_error, log_info
+
+# Status que disparam nova tentativa automática (com backoff e Retry-After)
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+# Status que indicam sessão expirada: os cookies são relidos do driver uma vez
+_AUTH_STATUS = (401, 403)
+
+
+class PortalHttpClient:
+    """Cliente HTTP do portal que reaproveita a sessão autenticada do navegador.
+
+    - Um `requests.Session` por driver: conexões keep-alive em um pool de
+      `pool_size` conexões, com retentativas (backoff exponencial, Retry-After) em
+      falhas de conexão e nos status 429/5xx.
+    - Os cookies (e o User-Agent) são copiados do driver já logado; passos que só
+      leem/enviam dados podem ir por HTTP, sem renderizar páginas.
+    - Em 401/403 os cookies são relidos do driver e a requisição é repetida uma vez
+      (ex.: o navegador renovou a sessão).
+    - `requests` é importado apenas aqui, na criação do primeiro cliente.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+        verify: bool = True,
+    ) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = verify
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=_RETRY_STATUS,
+            # POST/PATCH não são repetidos automaticamente (podem não ser idempotentes)
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._driver_ref: Optional["weakref.ReferenceType[Any]"] = None
+        self.cookies_synced_at: Optional[float] = None
+
+    def import_cookies(self, cookies: Iterable[Dict[str, Any]]) -> int:
+        """Copia cookies no formato do Selenium (`driver.get_cookies()`) para a sessão."""
+        count = 0
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie.get("value", ""),
+                domain=cookie.get("domain") or "",
+                path=cookie.get("path") or "/",
+                secure=bool(cookie.get("secure", False)),
+                expires=cookie.get("expiry"),
+                rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+            )
+            count += 1
+        self.cookies_synced_at = time.time()
+        return count
+
+    def sync_from_driver(self, driver: Any) -> int:
+        """Relê cookies e User-Agent do driver (após login ou renovação de sessão)."""
+        try:
+            self._driver_ref = weakref.ref(driver)
+        except TypeError:
+            self._driver_ref = None
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent")
+            if user_agent:
+                self.session.headers["User-Agent"] = user_agent
+        except Exception:
+            pass
+        return self.import_cookies(driver.get_cookies())
+
+    def request(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Requisição relativa a `base_url` (URLs absolutas também são aceitas)."""
+        kwargs.setdefault("timeout", self.timeout)
+        url = urljoin(self.base_url, path)
+        response = self.session.request(method, url, **kwargs)
+        driver = self._driver_ref() if self._driver_ref is not None else None
+        if response.status_code in _AUTH_STATUS and driver is not None:
+            response.close()
+            log_info(f"HTTP {response.status_code} em {url}: relendo cookies do driver.")
+            self.sync_from_driver(driver)
+            response = self.session.request(method, url, **kwargs)
+        return response
+
+    def get(self, path: str, **kwargs: Any) -> Any:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> Any:
+        return self.request("POST", path, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# Um cliente por driver (cada worker tem o seu), liberado junto com o driver
+_clients: "weakref.WeakKeyDictionary[Any, PortalHttpClient]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_http_client(driver: Any, config: Dict[str, Any]) -> PortalHttpClient:
+    """Cliente HTTP associado ao driver, criado (e autenticado) no primeiro uso.
+
+    Config (data/config.json):
+    - http_base_url: base das URLs relativas (padrão: `url`)
+    - http_pool_size: conexões keep-alive por host (padrão: 10)
+    - http_retries / http_backoff_seconds: retentativas automáticas (padrão: 3 / 0.5)
+    - http_timeout: timeout por requisição em segundos (padrão: 30)
+    - http_verify_ssl: valida o certificado (padrão: True)
+    """
+    with _clients_lock:
+        client = _clients.get(driver)
+        if client is not None:
+            return client
+    client = PortalHttpClient(
+        config.get("http_base_url") or config.get("url") or "",
+        pool_size=int(config.get("http_pool_size", 10)),
+        retries=int(config.get("http_retries", 3)),
+        backoff=float(config.get("http_backoff_seconds", 0.5)),
+        timeout=float(config.get("http_timeout", 30)),
+        verify=bool(config.get("http_verify_ssl", True)),
+    )
+    try:
+        client.sync_from_driver(driver)
+    except Exception as exc:
+        log_error(f"Falha ao copiar cookies do driver para o cliente HTTP: {exc}")
+    with _clients_lock:
+        _clients[driver] = client
+    return client
+
+
+def refresh_http_client(driver: Any) -> None:
+    """Atualiza os cookies do cliente do driver, se existir (ex.: logo após o login)."""
+    with _clients_lock:
+        client = _clients.get(driver)
+    if client is not None:
+        try:
+            client.sync_from_driver(driver)
+        except Exception as exc:
+            log_error(f"Falha ao atualizar cookies do cliente HTTP: {exc}")
+
+
+def close_http_client(driver: Any) -> None:
+    """Fecha o pool de conexões do driver (ao fechar/reciclar o driver)."""
+    with _clients_lock:
+        client = _clients.pop(driver, None)
+    if client is not None:
+        client.close()
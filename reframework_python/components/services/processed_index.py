@@ -0,0 +1,157 @@
+from typing import Dict
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+
+from utils.config import log_error, log_info
+
+
+def _digest(key: str) -> bytes:
+    """Impressão digital de 16 bytes da chave (compacta e de tamanho fixo)."""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class _BloomFilter:
+    """Filtro de Bloom em um bytearray (k posições por chave via hashing duplo)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1000, capacity)
+        error_rate = min(max(error_rate, 1e-6), 0.5)
+        self.bits = max(8 * 1024, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.data = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, digest: bytes) -> None:
+        for pos in self._positions(digest):
+            self.data[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        for pos in self._positions(digest):
+            if not self.data[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class ProcessedIndex:
+    """Índice persistente de itens já processados (deduplicação entre execuções).
+
+    - Exato: as chaves ficam em uma tabela sqlite (16 bytes por chave, sem rowid), então
+      dezenas de milhões de ids ocupam algumas centenas de MB em disco, não em memória.
+    - Rápido: um filtro de Bloom em memória (~1,2 MB por milhão de ids com 1% de erro)
+      responde "nunca visto" sem tocar o disco; só o "talvez" consulta a tabela.
+    - O filtro é salvo ao fechar (`<path>.bloom`) e reconstruído a partir da tabela
+      quando ausente ou desatualizado (ex.: após uma queda).
+    """
+
+    def __init__(self, path: str, capacity: int = 10_000_000, error_rate: float = 0.01) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS processed (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.count = int(self._conn.execute("SELECT COUNT(*) FROM processed").fetchone()[0])
+        self.capacity = capacity
+        self._bloom = _BloomFilter(capacity, error_rate)
+        self.stats: Dict[str, int] = {"lookups": 0, "hits": 0, "exact_checks": 0}
+        if not self._load_bloom():
+            self._rebuild_bloom()
+
+    def _bloom_path(self) -> str:
+        return f"{self.path}.bloom"
+
+    def _load_bloom(self) -> bool:
+        """Carrega o filtro salvo se ele corresponder ao tamanho e à contagem atuais."""
+        try:
+            with open(self._bloom_path(), "rb") as f:
+                header = f.read(24)
+                bits, hashes, count = (int.from_bytes(header[i:i + 8], "little") for i in (0, 8, 16))
+                if (bits, hashes, count) != (self._bloom.bits, self._bloom.hashes, self.count):
+                    return False
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) != len(self._bloom.data):
+            return False
+        self._bloom.data[:] = data
+        return True
+
+    def _rebuild_bloom(self) -> None:
+        if not self.count:
+            return
+        log_info(f"Reconstruindo filtro do índice de processados ({self.count} chave(s))...")
+        for (digest,) in self._conn.execute("SELECT digest FROM processed"):
+            self._bloom.add(digest)
+
+    def contains(self, key: str) -> bool:
+        digest = _digest(key)
+        with self._lock:
+            self.stats["lookups"] += 1
+            if digest not in self._bloom:
+                return False
+            self.stats["exact_checks"] += 1
+            found = self._conn.execute("SELECT 1 FROM processed WHERE digest = ?", (digest,)).fetchone() is not None
+            if found:
+                self.stats["hits"] += 1
+            return found
+
+    def add(self, key: str) -> None:
+        digest = _digest(key)
+        with self._lock:
+            cur = self._conn.execute("INSERT OR IGNORE INTO processed (digest) VALUES (?)", (digest,))
+            if cur.rowcount:
+                self.count += 1
+                self._bloom.add(digest)
+                if self.count == self.capacity:
+                    log_error(
+                        f"Índice de processados atingiu a capacidade ({self.capacity}); "
+                        "aumente `dedup_capacity` para manter as consultas rápidas."
+                    )
+
+    def status(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, indexed=self.count)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                tmp = f"{self._bloom_path()}.tmp"
+                with open(tmp, "wb") as f:
+                    for value in (self._bloom.bits, self._bloom.hashes, self.count):
+                        f.write(value.to_bytes(8, "little"))
+                    f.write(self._bloom.data)
+                os.replace(tmp, self._bloom_path())
+            except OSError as exc:
+                log_error(f"Falha ao salvar filtro do índice de processados: {exc}")
+            self._conn.close()
+
+
+_indexes: Dict[str, ProcessedIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_processed_index(path: str, capacity: int = 10_000_000, error_rate: float = 0.01) -> ProcessedIndex:
+    """Índice único por arquivo neste processo."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = ProcessedIndex(path, capacity, error_rate)
+        return index
+
+
+def close_processed_indexes() -> None:
+    """Salva os filtros e fecha os índices abertos (ao encerrar o programa)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.close()
@@ -0,0 +1,165 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Estados possíveis de um item na fila persistente
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class SqliteQueueStore:
+    """Fila de trabalho durável sobre sqlite3 (modo WAL).
+
+    - Cada item tem uma chave única (`item_key`) e um estado: pending, in_progress,
+      done ou failed. Reimportar o mesmo CSV não duplica itens; itens failed voltam
+      para pending (ex.: reimportação da dead-letter).
+    - `claim()` retira o próximo item pendente dentro de uma transação, então
+      vários workers podem consumir a mesma fila sem entregar o item duas vezes.
+    - Após uma queda, `recover()` devolve para pending os itens que ficaram
+      in_progress, retomando exatamente de onde a execução anterior parou.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # isolation_level=None: controlamos as transações explicitamente
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_status ON items (status, seq)")
+        self._pending = self._count(PENDING)
+
+    def _count(self, status: str) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM items WHERE status = ?", (status,)).fetchone()
+        return int(row[0])
+
+    def enqueue_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int = 5000) -> int:
+        """Insere itens (chave, payload) em lotes, ignorando chaves já existentes.
+
+        - Chaves em failed voltam para pending (payload novo, tentativas zeradas).
+        - Retorna a quantidade de itens novos ou reativados.
+        """
+        inserted = 0
+        batch = []
+        with self._lock:
+            for key, payload in items:
+                batch.append((key, json.dumps(payload, ensure_ascii=False), _now()))
+                if len(batch) >= batch_size:
+                    inserted += self._insert_batch(batch)
+                    batch = []
+            if batch:
+                inserted += self._insert_batch(batch)
+            self._pending += inserted
+        return inserted
+
+    def _insert_batch(self, batch) -> int:
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                """
+                INSERT INTO items (item_key, payload, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (item_key) DO UPDATE SET
+                    status = 'pending', payload = excluded.payload, attempts = 0, error = NULL,
+                    updated_at = excluded.updated_at
+                WHERE items.status = 'failed'
+                """,
+                batch,
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return self._conn.total_changes - before
+
+    def import_csv(self, path: str, key_func, batch_size: int = 5000, accept=None) -> int:
+        """Importa um CSV (com cabeçalho) em streaming. Retorna a quantidade de itens novos ou reativados.
+
+        - `accept(row)`, se informado, filtra as linhas importadas (ex.: partição do shard).
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = ((key_func(row), row) for row in csv.DictReader(f) if accept is None or accept(row))
+            return self.enqueue_many(rows, batch_size=batch_size)
+
+    def recover(self) -> int:
+        """Devolve para pending os itens que ficaram in_progress (execução interrompida)."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE items SET status = ?, updated_at = ? WHERE status = ?",
+                (PENDING, _now(), IN_PROGRESS),
+            )
+            self._pending += cur.rowcount
+            return cur.rowcount
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Retira o próximo item pendente (marcando-o como in_progress) ou None."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT seq, payload FROM items WHERE status = ? ORDER BY seq LIMIT 1", (PENDING,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    self._pending = 0
+                    return None
+                self._conn.execute(
+                    "UPDATE items SET status = ?, attempts = attempts + 1, updated_at = ? WHERE seq = ?",
+                    (IN_PROGRESS, _now(), row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending = max(0, self._pending - 1)
+            return json.loads(row[1])
+
+    def _set_status(self, key: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE item_key = ?",
+                (status, error, _now(), key),
+            )
+
+    def mark_done(self, key: str) -> None:
+        self._set_status(key, DONE)
+
+    def mark_failed(self, key: str, error: Optional[str] = None) -> None:
+        self._set_status(key, FAILED, error)
+
+    def pending(self) -> int:
+        """Quantidade de itens pendentes (contador mantido em memória, sem COUNT por chamada)."""
+        return self._pending
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall()
+        return {status: int(n) for status, n in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
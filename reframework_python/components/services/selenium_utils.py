@@ -1,31 +1,65 @@
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
 import os
+import time
+import weakref
 from datetime import datetime
 
-# Utilitários genéricos para uso com Selenium
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver  # type: ignore
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Utilitários genéricos para uso com Selenium.
+# O Selenium é importado dentro das funções: carregá-lo custa caro e só é necessário
+# quando há um driver em uso (inicialização mais rápida do robô).
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver  # type: ignore
 
 
-def wait_visible(driver: WebDriver, css_selector: str, timeout: int = 30):
+# Erros do script de espera quando a página navega no meio dela (ex.: envio de formulário)
+_NAVIGATION_ERRORS = (
+    "document unloaded",
+    "execution context was destroyed",
+    "cannot find context",
+    "no such execution context",
+)
+
+
+def _interrupted_by_navigation(exc: Exception) -> bool:
+    # Comparado pelo nome: o Selenium só é importado quando uma espera realmente falha
+    if type(exc).__name__ == "JavascriptException":
+        return True
+    message = str(exc).lower()
+    return any(text in message for text in _NAVIGATION_ERRORS)
+
+
+def _timeout_error(message: str) -> Exception:
+    from selenium.common.exceptions import TimeoutException
+
+    return TimeoutException(message)
+
+
+def wait_visible(driver: "WebDriver", css_selector: str, timeout: int = 30, poll_interval: float = 0.5):
     """Aguarda até que um elemento esteja visível na tela e o retorna.
 
     - Útil para evitar erros de interação antes do carregamento completo.
+    - Para vários elementos de uma vez, prefira wait_for_all() (uma única chamada).
     """
-    wait = WebDriverWait(driver, timeout)
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    wait = WebDriverWait(driver, timeout, poll_frequency=poll_interval)
     return wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, css_selector)))
 
 
-def safe_click(driver: WebDriver, css_selector: str, timeout: int = 30) -> None:
+def safe_click(driver: "WebDriver", css_selector: str, timeout: int = 30, poll_interval: float = 0.5) -> None:
     """Espera o botão/elemento ficar clicável e realiza o clique de forma segura."""
-    wait = WebDriverWait(driver, timeout)
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    wait = WebDriverWait(driver, timeout, poll_frequency=poll_interval)
     el = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, css_selector)))
     el.click()
 
 
-def take_screenshot(driver: WebDriver, folder: str, prefix: Optional[str] = None) -> str:
+def take_screenshot(driver: "WebDriver", folder: str, prefix: Optional[str] = None) -> str:
     """Tira um screenshot e salva na pasta indicada, retornando o caminho do arquivo.
 
     - A pasta é criada automaticamente, se não existir.
@@ -42,3 +76,114 @@ def take_screenshot(driver: WebDriver, folder: str, prefix: Optional[str] = None
     return path
 
 
+# Espera, em uma única chamada ao navegador, até que todos os seletores atendam à condição.
+# O polling acontece dentro da página (setTimeout), sem idas e voltas pelo protocolo WebDriver.
+_WAIT_ALL_JS = """
+var selectors = arguments[0], condition = arguments[1], timeout = arguments[2],
+    poll = arguments[3], done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeout;
+function ready(el) {
+  if (!el) return false;
+  if (condition === 'present') return true;
+  var style = window.getComputedStyle(el), rect = el.getBoundingClientRect();
+  var visible = style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+  if (condition === 'visible') return visible;
+  return visible && !el.disabled;
+}
+function check() {
+  var found = [], missing = [];
+  for (var i = 0; i < selectors.length; i++) {
+    var el = document.querySelector(selectors[i]);
+    if (ready(el)) { found.push(el); } else { found.push(null); missing.push(selectors[i]); }
+  }
+  if (!missing.length) { done({ok: true, elements: found, missing: []}); return; }
+  if (Date.now() >= deadline) { done({ok: false, elements: found, missing: missing}); return; }
+  setTimeout(check, poll);
+}
+check();
+"""
+
+# Preenche vários campos em uma única chamada, usando o setter nativo de `value`
+# e disparando input/change para que frameworks (React, Angular, ...) percebam a mudança.
+_FILL_JS = """
+var values = arguments[0], missing = [];
+for (var selector in values) {
+  var el = document.querySelector(selector);
+  if (!el) { missing.push(selector); continue; }
+  var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+  var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+  el.focus();
+  setter.call(el, values[selector]);
+  el.dispatchEvent(new Event('input', {bubbles: true}));
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
+
+# Último script timeout aplicado a cada driver (evita um comando extra por espera)
+_script_timeouts: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+
+
+def _ensure_script_timeout(driver: "WebDriver", seconds: float) -> None:
+    try:
+        current = _script_timeouts.get(driver, 0)
+    except TypeError:
+        current = 0
+    if current >= seconds:
+        return
+    driver.set_script_timeout(seconds)
+    try:
+        _script_timeouts[driver] = seconds
+    except TypeError:
+        pass
+
+
+def wait_for_all(
+    driver: "WebDriver",
+    selectors: Union[Sequence[str], Dict[str, str]],
+    timeout: float = 30,
+    condition: str = "present",
+    poll_interval: float = 0.1,
+) -> Union[List[Any], Dict[str, Any]]:
+    """Aguarda vários elementos de uma vez e retorna todos juntos.
+
+    - `selectors`: lista de CSS selectors (retorna lista na mesma ordem) ou
+      dicionário nome -> selector (retorna dicionário nome -> elemento).
+    - `condition`: "present" | "visible" | "clickable".
+    - O polling roda na própria página a cada `poll_interval` segundos: uma única
+      chamada WebDriver, em vez de uma espera (e várias consultas) por elemento.
+    - Se a página navegar durante a espera (ex.: logo após um clique em "Entrar"), o
+      script é interrompido com o documento antigo; a espera recomeça no novo
+      documento até o fim do prazo, como faria o WebDriverWait.
+    - Lança TimeoutException indicando os seletores que não ficaram prontos.
+    """
+    names = list(selectors.keys()) if isinstance(selectors, dict) else None
+    css = list(selectors.values()) if isinstance(selectors, dict) else list(selectors)
+    # Margem para o navegador devolver o resultado antes do timeout do próprio Selenium
+    _ensure_script_timeout(driver, timeout + 5)
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = max(0.0, deadline - time.monotonic())
+        try:
+            result = driver.execute_async_script(
+                _WAIT_ALL_JS, css, condition, int(remaining * 1000), int(poll_interval * 1000)
+            )
+            break
+        except Exception as exc:
+            if not _interrupted_by_navigation(exc):
+                raise
+            if time.monotonic() >= deadline:
+                raise _timeout_error(f"Página em navegação até o fim da espera ({condition}): {', '.join(css)}")
+            time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+    if not result or not result.get("ok"):
+        missing = (result or {}).get("missing", css)
+        raise _timeout_error(f"Elementos não ficaram prontos ({condition}): {', '.join(missing)}")
+    elements = result["elements"]
+    return dict(zip(names, elements)) if names is not None else elements
+
+
+def fill_fields(driver: "WebDriver", values: Dict[str, str]) -> None:
+    """Preenche vários campos (CSS selector -> valor) em uma única chamada de script."""
+    missing = driver.execute_script(_FILL_JS, values)
+    if missing:
+        raise _timeout_error(f"Campos não encontrados: {', '.join(missing)}")
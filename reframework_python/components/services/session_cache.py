@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
+import time
+import weakref
+
+# Script que exporta o localStorage da página atual como objeto simples
+_DUMP_LOCAL_STORAGE = (
+    "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+    " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;"
+)
+_LOAD_LOCAL_STORAGE = "var d = arguments[0]; for (var k in d) { localStorage.setItem(k, d[k]); }"
+
+
+class SessionCache:
+    """Sessão autenticada (cookies + localStorage) persistida em disco.
+
+    - `save()` guarda a sessão do driver logo após um login bem-sucedido.
+    - `restore()` injeta a sessão salva em um driver novo, evitando refazer o login.
+    - `expired()` indica que a sessão passou de `max_age_seconds` e deve ser renovada.
+    - Também lembra quais drivers já estão autenticados, para que chamadas
+      repetidas de login não façam nenhuma ida ao navegador.
+
+    Atenção: o arquivo contém cookies de sessão; mantenha-o fora de controle de versão.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 3600) -> None:
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._loaded = False
+        self._authenticated: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if not self._loaded:
+            self._loaded = True
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except Exception:
+                self._data = None
+        return self._data
+
+    def age_seconds(self) -> Optional[float]:
+        """Idade da sessão salva (segundos) ou None se não houver sessão."""
+        with self._lock:
+            data = self._load()
+        if not data:
+            return None
+        return time.time() - float(data.get("saved_at", 0))
+
+    def expired(self) -> bool:
+        age = self.age_seconds()
+        return age is None or (self.max_age_seconds > 0 and age >= self.max_age_seconds)
+
+    def is_authenticated(self, driver: Any) -> bool:
+        """True se este driver já foi autenticado e a sessão ainda não expirou."""
+        try:
+            known = driver in self._authenticated
+        except TypeError:
+            return False
+        return known and not self.expired()
+
+    def mark_authenticated(self, driver: Any) -> None:
+        try:
+            self._authenticated[driver] = time.time()
+        except TypeError:
+            pass
+
+    def forget(self, driver: Any) -> None:
+        try:
+            self._authenticated.pop(driver, None)
+        except TypeError:
+            pass
+
+    def save(self, driver: Any) -> None:
+        """Grava cookies e localStorage do driver (arquivo temporário + rename)."""
+        cookies: List[Dict[str, Any]] = driver.get_cookies()  # type: ignore[attr-defined]
+        try:
+            storage = driver.execute_script(_DUMP_LOCAL_STORAGE) or {}  # type: ignore[attr-defined]
+        except Exception:
+            storage = {}
+        data = {"saved_at": time.time(), "cookies": cookies, "local_storage": storage}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        with self._lock:
+            self._data = data
+            self._loaded = True
+        self.mark_authenticated(driver)
+
+    def restore(self, driver: Any, url: str) -> bool:
+        """Injeta a sessão salva no driver. Retorna False se não houver sessão válida.
+
+        - Abre `url` primeiro: cookies só podem ser definidos no domínio atual.
+        - Recarrega a página no final para que a aplicação leia a sessão.
+        """
+        if self.expired():
+            return False
+        with self._lock:
+            data = self._load() or {}
+        driver.get(url)  # type: ignore[attr-defined]
+        for cookie in data.get("cookies", []):
+            cookie = dict(cookie)
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            try:
+                driver.add_cookie(cookie)  # type: ignore[attr-defined]
+            except Exception:
+                pass
+        storage = data.get("local_storage") or {}
+        if storage:
+            try:
+                driver.execute_script(_LOAD_LOCAL_STORAGE, storage)  # type: ignore[attr-defined]
+            except Exception:
+                pass
+        driver.get(url)  # type: ignore[attr-defined]
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = None
+            self._loaded = True
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+_caches: Dict[str, SessionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_session_cache(path: str, max_age_seconds: float) -> SessionCache:
+    """Retorna o cache de sessão (único por arquivo)."""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = SessionCache(path, max_age_seconds)
+        return cache
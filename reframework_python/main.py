@@ -1,14 +1,25 @@
+import argparse
 import asyncio
+import multiprocessing
 import os
+import re
 import shutil
+import signal
+import time
+from typing import Optional
 from components import hooks
-from utils.config import load_config, log_error, log_info, configure_logging
+from utils.config import config_version, configure_logging, get_config, log_error, log_info, override_config
+from utils.health import HealthReporter
+from utils.metrics import flush_all as flush_metrics
+from utils.scheduler import EMPTY, ERROR, UNAVAILABLE, CycleScheduler
+from utils.sharding import ShardLease, shard_count, shard_index
 
 
 def _clean_bytecode_artifacts() -> None:
     """Remove diretórios __pycache__ e arquivos .pyc do projeto.
 
-    - Mantém o ambiente limpo a cada inicialização, evitando lixo de builds.
+    - Útil apenas para depurar problemas de cache; apaga o bytecode e obriga o Python
+      a recompilar tudo, por isso fica desligado por padrão.
     - Operação segura: ignora erros de remoção.
     """
     # Caminho de base: pasta do arquivo atual (Projetos/)
@@ -31,103 +42,409 @@ def _clean_bytecode_artifacts() -> None:
                     pass
 
 
-# 1) Limpeza de caches/bytecode antes de qualquer coisa (se habilitado em config)
-try:
-    cfg_preview = load_config()
-except Exception:
-    cfg_preview = {}
-if bool(cfg_preview.get("limpar_cache_no_start", True)):
-    _clean_bytecode_artifacts()
+def prepare_bytecode(config) -> None:
+    """Prepara o bytecode do projeto na inicialização (antes dos workers/processos).
 
-# 2) Configura o sistema de log antes de iniciar o fluxo principal.
-#    Se ativado em data/config.json, os logs serão gravados em logs/robo.log.
+    - limpar_cache_no_start (padrão: False): apaga __pycache__/.pyc antes de começar.
+    - precompilar_no_start (padrão: True): compila o que estiver desatualizado, de modo
+      que workers e processos de shard já encontrem o bytecode pronto. Arquivos sem
+      mudança são pulados (só um stat por arquivo).
+    """
+    if bool(config.get("limpar_cache_no_start", False)):
+        _clean_bytecode_artifacts()
+    if bool(config.get("precompilar_no_start", True)):
+        import compileall
+
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        compileall.compile_dir(base_dir, quiet=1, rx=re.compile(r"[\\/](logs|downloads|benchmarks[\\/]results)[\\/]"))
+
+
+# Logs no console desde o import; main() reconfigura conforme data/config.json
+# (ativar_log grava também em logs/robo.log, com rotação e escrita em segundo plano).
 configure_logging()
 
 
-async def wait_next_cycle(config):
-    """Espera o tempo configurado entre ciclos de execução.
+async def wait_next_cycle(config, scheduler: Optional[CycleScheduler] = None, reason: str = EMPTY):
+    """Espera entre ciclos de execução e retorna motivo/duração da espera.
 
     - Este intervalo evita loops constantes quando não há itens a processar
       ou quando o portal/sistema está indisponível.
+    - A duração é decidida pelo agendador (ver utils/scheduler.py): fila vazia acorda
+      quando a fonte da fila muda; indisponibilidade usa backoff exponencial com jitter.
     """
-    wait_time_in_minutes = config.get("wait_time_in_minutes", 2)
-    log_info(f"Aguardando {wait_time_in_minutes} minuto(s) para novo ciclo.")
-    await asyncio.sleep(wait_time_in_minutes * 60)
+    # Aproveita a pausa para gravar métricas ainda pendentes em memória
+    flush_metrics()
+    scheduler = scheduler or CycleScheduler(config)
+    return await scheduler.wait(reason, limit=hooks.next_wakeup(config))
 
 
-async def main():
-    """Loop principal do REFramework.
+def _tag(worker_id: int) -> str:
+    """Prefixo de log que identifica o worker dono da mensagem."""
+    return f"[worker {worker_id}] "
+
+
+async def run_worker(worker_id: int, config, health: Optional[HealthReporter] = None) -> None:
+    """Ciclo completo de um worker com driver próprio.
 
     Fluxo em alto nível:
-    1) Carrega configurações
-    2) Abre/recupera driver
-    3) Valida disponibilidade da plataforma
-    4) Executa login (se necessário)
-    5) Inicializa fila e busca itens
-    6) Processa item
+    1) Abre/recupera driver
+    2) Valida disponibilidade da plataforma
+    3) Executa login (se necessário)
+    4) Inicializa fila (compartilhada entre workers) e busca itens
+    5) Processa o item, ou um lote de itens quando `batch_size` > 1 (se `process_batch`
+       lançar NotImplementedError, o worker passa ao modo item a item)
+    6) Recicla o driver quando atinge os limites de uso (ver services/driver_manager.py)
     7) Aguarda próximo ciclo quando não houver itens ou ocorrer falha recuperável
+
+    Qualquer falha inesperada descarta apenas o driver deste worker; os demais
+    seguem processando normalmente. A etapa atual e a idade do driver são
+    publicadas em `health` (heartbeat em segundo plano).
     """
-    config = load_config()
+    tag = _tag(worker_id)
+    stats = hooks.metrics(config)
+    health = health or HealthReporter(hooks.health_path(config))
+    lifecycle = hooks.driver_lifecycle(config)
+    # Executor dedicado: todas as chamadas bloqueantes ao driver deste worker
+    runner = hooks.HookRunner(config, name=f"worker-{worker_id}")
+    scheduler = CycleScheduler(config, hooks.queue_watch_path(config))
+    seen_version = config_version(config)
+    # Desligado de vez quando o projeto não suporta lotes (ver hooks.process_batch)
+    batch_mode = True
     driver = None
 
+    async def pause(reason: str) -> None:
+        health.set_stage(worker_id, f"waiting:{reason}")
+        waited = await wait_next_cycle(config, scheduler, reason)
+        health.set_wait(worker_id, waited)
+        stats.observe(f"wait_{reason}", waited["seconds"])
+
+    async def fail(item, exc: Exception) -> None:
+        # Qualquer erro durante o processamento do item deve ser tratado aqui
+        # podendo incluir captura de evidências, retentativas, etc.
+        log_error(f"{tag}Erro ao processar item: {exc}")
+        try:
+            await runner.run("fail_item", item, driver, config, exc)
+        except Exception as mark_exc:
+            log_error(f"{tag}Falha ao registrar erro do item: {mark_exc}")
+
+    async def capture_evidence(prefix: str) -> None:
+        try:
+            await runner.run("capture_error_evidence", driver, config, prefix=prefix)
+        except Exception:
+            pass
+
+    async def process_single(item) -> None:
+        try:
+            with stats.timer("process"):
+                await runner.run("process_item", item, driver, config)
+            await runner.run("complete_item", item, driver, config)
+            health.item_done()
+            scheduler.success()
+            lifecycle.item_done()
+        except Exception as exc:
+            await fail(item, exc)
+            if isinstance(exc, TimeoutError):
+                # Driver possivelmente travado: descartado no tratamento do loop
+                raise
+            # Captura de evidência de erro (screenshot)
+            await capture_evidence("process_item")
+
+    async def process_batch(items: list) -> bool:
+        """Processa um lote com resultado por item; False se o projeto não suporta lotes.
+
+        - Cada item é concluído ou falhado (retentativa/dead-letter) individualmente; se o
+          hook lançar exceção, todos os itens do lote falham com ela.
+        - A latência `process` de cada item é a fração do lote, comparável ao modo item a item.
+        """
+        batch_error = None
+        start = time.perf_counter()
+        try:
+            with stats.timer("process_batch"):
+                results = await runner.run("process_batch", items, driver, config)
+            results = list(results or [])
+            if len(results) != len(items):
+                raise ValueError(f"process_batch retornou {len(results)} resultado(s) para {len(items)} item(ns)")
+        except NotImplementedError:
+            return False
+        except Exception as exc:
+            batch_error = exc
+            results = [exc] * len(items)
+        share = (time.perf_counter() - start) / len(items)
+        succeeded = failed = 0
+        for item, error in zip(items, results):
+            stats.observe("process", share)
+            if error is not None and not isinstance(error, Exception):
+                error = RuntimeError(str(error))
+            if error is None:
+                try:
+                    await runner.run("complete_item", item, driver, config)
+                    health.item_done()
+                    lifecycle.item_done()
+                    succeeded += 1
+                    continue
+                except Exception as exc:
+                    error = exc
+            await fail(item, error)
+            failed += 1
+        stats.incr("batches")
+        if succeeded:
+            scheduler.success()
+        if isinstance(batch_error, TimeoutError):
+            raise batch_error
+        if failed:
+            await capture_evidence("process_batch")
+        return True
+
     try:
         while True:
-            # 1) Garante que há um driver aberto
-            if not driver:
-                driver = hooks.open_driver(config)
+            # Recarga a quente do config (um stat no máximo a cada config_check_seconds);
+            # o driver e a sessão atuais seguem em uso
+            version = config_version(config)
+            if version != seen_version:
+                seen_version = version
+                scheduler.configure(config)
+            try:
+                # 1) Garante que há um driver aberto
                 if not driver:
-                    log_error("Falha ao abrir driver. Aguardando próximo ciclo.")
-                    await wait_next_cycle(config)
+                    health.set_stage(worker_id, "open_driver")
+                    with stats.timer("open_driver"):
+                        driver = await runner.run("open_driver", config)
+                    if driver:
+                        lifecycle.opened()
+                        health.driver_opened(worker_id)
+                    else:
+                        log_error(f"{tag}Falha ao abrir driver. Aguardando próximo ciclo.")
+                        await pause(UNAVAILABLE)
+                        continue
+
+                # 2) Verifica se a plataforma/driver está saudável
+                health.set_stage(worker_id, "is_platform_available")
+                if not await runner.run("is_platform_available", driver, config):
+                    await runner.run("close_driver", driver)
+                    driver = None
+                    health.driver_closed(worker_id)
+                    await pause(UNAVAILABLE)
                     continue
 
-            # 2) Verifica se a plataforma/driver está saudável
-            if not hooks.is_platform_available(driver, config):
-                hooks.close_driver(driver)
-                driver = None
-                await wait_next_cycle(config)
-                continue
-
-            # 3) Realiza login (idempotente: deve lidar com sessão já autenticada)
-            if not hooks.login(driver, config):
-                log_error("Falha no login. Aguardando próximo ciclo.")
-                await wait_next_cycle(config)
-                continue
-
-            # 4) Inicializa fila/contexto. Se não houver itens, espera próximo ciclo
-            if not hooks.init_queue(driver, config):
-                log_info("Sem itens para processar.")
-                hooks.cleanup_before_cycle(config)
-                await wait_next_cycle(config)
-                continue
-
-            # 5) Busca um item e, se houver, processa
-            item = hooks.get_next_item(driver, config)
-            if item is None:
-                log_info("Fila vazia.")
-                hooks.cleanup_before_cycle(config)
-                await wait_next_cycle(config)
-                continue
+                # 3) Realiza login (idempotente: deve lidar com sessão já autenticada)
+                health.set_stage(worker_id, "login")
+                with stats.timer("login"):
+                    logged_in = await runner.run("login", driver, config)
+                if not logged_in:
+                    log_error(f"{tag}Falha no login. Aguardando próximo ciclo.")
+                    await pause(UNAVAILABLE)
+                    continue
+
+                # 4) Inicializa fila/contexto. Se não houver itens, espera próximo ciclo
+                health.set_stage(worker_id, "init_queue")
+                if not await runner.run("init_queue", driver, config):
+                    log_info(f"{tag}Sem itens para processar.")
+                    hooks.cleanup_before_cycle(config)
+                    await pause(EMPTY)
+                    continue
+
+                # 5) Busca um item (ou um lote) e, se houver, processa
+                size = hooks.batch_size(config) if batch_mode else 1
+                health.set_stage(worker_id, "fetch")
+                with stats.timer("fetch"):
+                    if size > 1:
+                        items = await runner.run("get_next_batch", driver, config)
+                    else:
+                        item = await runner.run("get_next_item", driver, config)
+                        items = [] if item is None else [item]
+                if not items:
+                    log_info(f"{tag}Fila vazia.")
+                    hooks.cleanup_before_cycle(config)
+                    await pause(EMPTY)
+                    continue
+
+                health.set_stage(worker_id, "process")
+                if size > 1 and not await process_batch(items):
+                    log_info(f"{tag}process_batch não implementado; usando o modo item a item.")
+                    batch_mode = False
+                    size = 1
+                if size == 1:
+                    for position, item in enumerate(items):
+                        try:
+                            await process_single(item)
+                        except Exception:
+                            # Itens restantes do lote já retirados da fila: vão para retentativa
+                            for pending in items[position + 1:]:
+                                await fail(pending, RuntimeError("lote interrompido por falha do driver"))
+                            raise
+
+                # 6) Recicla o driver (itens/tempo/memória) trocando por um já pré-aquecido;
+                # fora do loop, pois a medição de memória percorre a árvore de processos
+                previous = driver
+                driver = await asyncio.to_thread(lifecycle.maybe_swap, driver)
+                if driver is not previous:
+                    health.driver_opened(worker_id)
 
-            try:
-                # Uso de await asyncio.sleep(0) para ceder o loop de eventos
-                await asyncio.sleep(0)
-                hooks.process_item(item, driver, config)
             except Exception as exc:
-                # Qualquer erro durante o processamento do item deve ser tratado aqui
-                # podendo incluir captura de evidências, retentativas, etc.
-                log_error(f"Erro ao processar item: {exc}")
-                # Captura de evidência de erro (screenshot)
-                try:
-                    hooks.capture_error_evidence(driver, config, prefix="process_item")
-                except Exception:
-                    pass
-                await asyncio.sleep(0)
+                # Recuperação por worker: descarta o driver e tenta novamente no próximo ciclo
+                log_error(f"{tag}Falha inesperada: {exc}. Reiniciando driver.")
+                if driver:
+                    # Fora do loop: quit() de um driver travado não congela os demais workers
+                    lifecycle.close_in_background(driver)
+                    driver = None
+                    health.driver_closed(worker_id)
+                await pause(ERROR)
 
     finally:
-        # Fecha o driver ao encerrar o programa (Ctrl+C, exceções, etc.)
+        # Fecha o driver ao encerrar o worker (Ctrl+C, cancelamento, exceções, etc.)
+        lifecycle.shutdown()
         if driver:
-            hooks.close_driver(driver)
+            # Espera limitada (hook_timeouts["close_driver"], padrão: 30s) fora do loop
+            closing = lifecycle.close_in_background(driver)
+            await asyncio.to_thread(closing.join, runner.timeout_for("close_driver") or 30)
+        runner.close()
+
+
+def _health_port(config) -> Optional[int]:
+    """Porta do endpoint de health; com shards, `health_port` + índice do shard."""
+    try:
+        port = int(config.get("health_port") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not port:
+        return None
+    return port + (shard_index(config) or 0)
+
+
+async def main(config=None):
+    """Loop principal do REFramework.
+
+    - Carrega configurações e inicia `workers` (data/config.json, padrão: 1)
+      workers independentes, cada um com seu próprio driver.
+    - O config é recarregado quando o arquivo muda: tempos de espera, seletores,
+      nível de log e retentativas valem sem reiniciar (ver utils/config.py).
+    - Todos os workers consomem a mesma fila (ver actions/queue.py).
+    - Um heartbeat em segundo plano grava health.json a cada `health_interval_seconds`
+      (padrão: 15) e, se `health_port` for informado, serve o mesmo JSON via HTTP local
+      (cada shard na porta `health_port` + índice do shard).
+    - Ao encerrar (Ctrl+C ou erro fatal), cancela os workers e fecha todos os drivers.
+    """
+    config = config if config is not None else get_config()
+    configure_logging(config=config)
+    try:
+        workers = max(1, int(config.get("workers", 1)))
+    except (TypeError, ValueError):
+        workers = 1
+    log_info(f"Iniciando {workers} worker(s).")
+
+    health = HealthReporter(
+        hooks.health_path(config),
+        interval=float(config.get("health_interval_seconds", 15)),
+        port=_health_port(config),
+        queue_status=lambda: hooks.health_status(config),
+    )
+    heartbeat = asyncio.create_task(health.run())
+    tasks = [asyncio.create_task(run_worker(i + 1, config, health)) for i in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+        await asyncio.to_thread(hooks.shutdown, config)
+        flush_metrics()
+
+
+def _lease_dir(config) -> str:
+    return config.get("shard_lease_dir") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "shards")
+
+
+async def _run_leased(config, lease: ShardLease) -> None:
+    """Roda main() enquanto o lease do shard for renovado; perde o lease -> encerra."""
+    task = asyncio.create_task(main(config))
+    while not task.done():
+        await asyncio.wait({task}, timeout=lease.renew_interval)
+        if not task.done() and not await asyncio.to_thread(lease.renew):
+            log_error(f"Lease do shard {lease.index} perdido. Encerrando o processo.")
+            task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_shard_process(config) -> None:
+    """Processo de um shard: reserva um shard livre e processa apenas os itens dele.
+
+    - O shard é escolhido via lease em `shard_lease_dir` (padrão: logs/shards), que pode
+      ficar em uma pasta compartilhada para dividir a fila entre várias máquinas.
+    - State, métricas, health, fila SQLite e dead-letter ganham o sufixo `.shard<i>`.
+    - Esse estado é local (`logs/`): um shard assumido por outra máquina recomeça do
+      zero e pode reprocessar itens (ver ShardLease em utils/sharding.py).
+    """
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    count = shard_count(config)
+    lease = ShardLease(_lease_dir(config), count, ttl=float(config.get("shard_lease_seconds", 60)))
+    index = lease.acquire()
+    if index is None:
+        log_info(f"Nenhum dos {count} shard(s) está livre. Encerrando o processo.")
+        return
+    try:
+        asyncio.run(_run_leased(override_config(config, shard_index=index, shard_count=count), lease))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        lease.release()
+
+
+def launch(config, processes: int) -> None:
+    """Modo launcher: inicia `processes` processos, cada um com seu shard e seus workers.
+
+    - `shard_count` (padrão: `processes`) é o total de shards entre todas as máquinas;
+      cada máquina pode rodar o launcher com menos processos que shards.
+    - Os itens são divididos por hash estável da chave (`id`), então cada item
+      pertence a exatamente um shard.
+    - A cada `health_interval_seconds` os arquivos dos shards são consolidados em
+      metrics.json/health.json (visão global); `python main.py --merge` faz o mesmo avulso.
+    """
+    config = override_config(config, processes=processes, shard_count=shard_count(dict(config, processes=processes)))
+    log_info(f"Iniciando {processes} processo(s) para {config['shard_count']} shard(s).")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=run_shard_process, args=(config,), name=f"shard-{i}") for i in range(processes)]
+    for proc in procs:
+        proc.start()
+    interval = float(config.get("health_interval_seconds", 15))
+    try:
+        while any(proc.is_alive() for proc in procs):
+            for proc in procs:
+                proc.join(timeout=interval / len(procs))
+            hooks.merge_shards(config)
+    except KeyboardInterrupt:
+        log_info("Encerrando processos dos shards...")
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in procs:
+            proc.join(timeout=30)
+    finally:
+        hooks.merge_shards(config)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="REFramework (Python)")
+    parser.add_argument("--processes", type=int, help="inicia N processos com shards da fila (modo launcher)")
+    parser.add_argument("--merge", action="store_true", help="apenas consolida metrics/health dos shards")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = _parse_args()
+    # O config é lido uma única vez e repassado a main()/launch()
+    cfg = get_config()
+    configure_logging(config=cfg)
+    prepare_bytecode(cfg)
+    processes = args.processes or int(cfg.get("processes", 1) or 1)
+    if args.merge:
+        hooks.merge_shards(override_config(cfg, processes=processes))
+    elif processes > 1:
+        launch(cfg, processes)
+    else:
+        asyncio.run(main(cfg))
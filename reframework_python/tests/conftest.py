@@ -0,0 +1,71 @@
+"""Fixtures dos testes de comportamento (offline: FakeWebDriver e arquivos temporários).
+
+Rodar a partir da pasta reframework_python:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.actions import queue  # noqa: E402
+from components.services.processed_index import close_processed_indexes  # noqa: E402
+
+
+def _reset_queue_state() -> None:
+    """Zera o estado em memória da fila (o módulo guarda a fila do processo)."""
+    for store in queue._stores.values():
+        store.close()
+    queue._stores.clear()
+    queue._store = None
+    queue._queue_source = None
+    queue._queue_loaded = False
+    queue._queue_signature = None
+    queue._retry_heap.clear()
+    queue._attempts.clear()
+    close_processed_indexes()
+
+
+def write_csv(path, ids, header: str = "id,nome", mode: str = "w") -> None:
+    with open(path, mode, newline="", encoding="utf-8") as f:
+        if mode == "w":
+            f.write(f"{header}\n")
+        for item_id in ids:
+            f.write(f"{item_id},nome_{item_id}\n")
+
+
+def drain(config) -> list:
+    """Inicializa a fila e retira todos os itens disponíveis (ids na ordem de entrega)."""
+    ids = []
+    if queue.initialize_queue(None, config):
+        while True:
+            item = queue.fetch_next_item(None, config)
+            if item is None:
+                break
+            ids.append(item["id"])
+    return ids
+
+
+@pytest.fixture
+def queue_config(tmp_path):
+    """Config com todos os arquivos da fila em uma pasta temporária e retentativa imediata."""
+    _reset_queue_state()
+    config = {
+        "csv_queue_path": str(tmp_path / "queue.csv"),
+        "queue_backend": "csv",
+        "queue_db_path": str(tmp_path / "queue.db"),
+        "state_path": str(tmp_path / "state.json"),
+        "metrics_path": str(tmp_path / "metrics.json"),
+        "health_path": str(tmp_path / "health.json"),
+        "dead_letter_path": str(tmp_path / "dead_letter.csv"),
+        "dedup_index_path": str(tmp_path / "processed.db"),
+        "screenshot_folder": str(tmp_path / "evidence"),
+        "session_cache_path": str(tmp_path / "session.json"),
+        "retry_max_attempts": 2,
+        "retry_backoff_seconds": 0,
+        "retry_backoff_max_seconds": 0,
+    }
+    yield config
+    _reset_queue_state()
@@ -0,0 +1,37 @@
+import asyncio
+import csv
+import os
+import re
+
+from benchmarks import run_main
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _path_keys() -> set:
+    """Chaves de caminho lidas pelo robô (`config.get("..._path" / "_dir" / "_folder")`)."""
+    keys = set()
+    for folder in ("components", "utils"):
+        for base, _, files in os.walk(os.path.join(_ROOT, folder)):
+            for name in files:
+                if name.endswith(".py"):
+                    with open(os.path.join(base, name), encoding="utf-8") as f:
+                        keys.update(re.findall(r'config\.get\("(\w+_(?:path|dir|folder))"', f.read()))
+    return keys
+
+
+def test_benchmark_writes_only_to_its_temp_folder(tmp_path):
+    args = run_main._parse_args(["--items", "5"])
+    config = run_main._bench_config(5, args, str(tmp_path))
+    for key in _path_keys():
+        assert key in config, key
+        assert config[key] == "" or config[key].startswith(str(tmp_path)), key
+
+
+def test_failed_benchmark_items_go_to_temp_dead_letter(tmp_path, queue_config):
+    args = run_main._parse_args(["--items", "5", "--failure-rate", "1", "--latency-ms", "0", "--jitter-ms", "0"])
+    result = asyncio.run(run_main._run_once(5, args, str(tmp_path)))
+    assert result["dead_letter"] == 5
+
+    with open(tmp_path / "dead_letter_5.csv", newline="", encoding="utf-8") as f:
+        assert sorted(row["id"] for row in csv.DictReader(f)) == ["0", "1", "2", "3", "4"]
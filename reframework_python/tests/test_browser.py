@@ -0,0 +1,49 @@
+from components.services.browser import _blocked_url_patterns, _build_options, driver_profile
+
+
+class _Options:
+    """Substituto das Options do Chromium: só registra o que foi configurado."""
+
+    def __init__(self) -> None:
+        self.arguments = []
+        self.experimental = {}
+        self.page_load_strategy = None
+
+    def add_argument(self, arg: str) -> None:
+        self.arguments.append(arg)
+
+    def add_experimental_option(self, name: str, value) -> None:
+        self.experimental[name] = value
+
+
+def test_default_profile_keeps_original_behaviour(tmp_path):
+    config = {"download_dir": str(tmp_path / "downloads")}
+    profile = driver_profile(config)
+    options = _build_options(_Options(), config, profile, None)
+    assert options.page_load_strategy == "normal"
+    assert "--disable-extensions" not in options.arguments
+    assert "profile.managed_default_content_settings.images" not in options.experimental["prefs"]
+    assert _blocked_url_patterns(profile) == []
+
+
+def test_lean_profile_blocks_resources_and_loads_eagerly(tmp_path):
+    config = {"download_dir": str(tmp_path / "downloads"), "driver_profile": "lean"}
+    profile = driver_profile(config)
+    options = _build_options(_Options(), config, profile, str(tmp_path / "cache" / "slot-0"))
+    assert options.page_load_strategy == "eager"
+    assert "--disable-background-networking" in options.arguments
+    assert any(arg.startswith("--disk-cache-dir=") for arg in options.arguments)
+    assert options.experimental["prefs"]["profile.managed_default_content_settings.images"] == 2
+    patterns = _blocked_url_patterns(profile)
+    assert "*.woff2" in patterns and "*.mp4" in patterns
+
+
+def test_explicit_keys_override_the_profile():
+    profile = driver_profile({
+        "driver_profile": "lean",
+        "page_load_strategy": "none",
+        "block_resource_types": ["stylesheet"],
+        "block_url_patterns": ["*analytics*"],
+    })
+    assert profile["page_load_strategy"] == "none"
+    assert _blocked_url_patterns(profile) == ["*.css", "*analytics*"]
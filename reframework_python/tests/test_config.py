@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from utils.config import LiveConfig, config_version, validate_config
+
+
+def _write(path, data) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = str(tmp_path / "config.json")
+    _write(path, {"workers": 2, "wait_time_in_minutes": 1, "config_check_seconds": 0})
+    return path
+
+
+def test_validate_config_converts_and_reports():
+    values, errors = validate_config({"workers": "3", "headless": "false", "browser": "safari"})
+    assert values["workers"] == 3
+    assert values["headless"] is False
+    assert len(errors) == 1 and "browser" in errors[0]
+
+
+def test_hot_key_is_applied_and_version_bumps(config_file):
+    config = LiveConfig(config_file)
+    assert config_version(config) == 0
+    _write(config_file, {"workers": 2, "wait_time_in_minutes": 0.5, "config_check_seconds": 0})
+    assert config_version(config) == 1
+    assert config["wait_time_in_minutes"] == 0.5
+
+
+def test_cold_key_waits_for_restart(config_file):
+    config = LiveConfig(config_file)
+    _write(config_file, {"workers": 8, "wait_time_in_minutes": 1, "config_check_seconds": 0})
+    assert config_version(config) == 0
+    assert config["workers"] == 2
+    assert config.restart_required == {"workers"}
+
+
+def test_invalid_file_keeps_current_config(config_file):
+    config = LiveConfig(config_file)
+    with open(config_file, "w", encoding="utf-8") as f:
+        f.write("{ inválido")
+    st = os.stat(config_file)
+    os.utime(config_file, (st.st_atime, st.st_mtime + 2))
+    assert config_version(config) == 0
+    assert config["wait_time_in_minutes"] == 1
+
+
+def test_config_is_immutable(config_file):
+    config = LiveConfig(config_file)
+    with pytest.raises(TypeError):
+        config.snapshot["workers"] = 4  # type: ignore[index]
@@ -0,0 +1,44 @@
+import os
+
+from components.actions import queue
+from components.services.processed_index import ProcessedIndex
+from tests.conftest import _reset_queue_state, drain, write_csv
+
+
+def test_index_answers_exactly_and_survives_reopen(tmp_path):
+    path = str(tmp_path / "processed.db")
+    index = ProcessedIndex(path, capacity=1000)
+    for key in ("a", "b", "c"):
+        index.add(key)
+    index.add("a")
+    assert index.contains("b") and not index.contains("z")
+    assert index.status()["indexed"] == 3
+    index.close()
+    assert os.path.exists(f"{path}.bloom")
+
+    reopened = ProcessedIndex(path, capacity=1000)
+    assert all(reopened.contains(key) for key in ("a", "b", "c"))
+    reopened.close()
+
+    # Filtro perdido (ex.: queda antes do close): reconstruído a partir da tabela
+    os.remove(f"{path}.bloom")
+    rebuilt = ProcessedIndex(path, capacity=1000)
+    assert rebuilt.contains("c")
+    rebuilt.close()
+
+
+def test_items_done_in_a_previous_run_are_skipped(queue_config):
+    config = dict(queue_config, dedup_enabled=True)
+    write_csv(config["csv_queue_path"], ["1", "2"])
+    queue.initialize_queue(None, config)
+    for _ in range(2):
+        queue.mark_item_done(queue.fetch_next_item(None, config), config)
+    before = queue.queue_metrics(config).snapshot().get("duplicates_skipped", 0)
+
+    # Nova execução com um arquivo que repete os itens já concluídos
+    _reset_queue_state()
+    if os.path.exists(config["state_path"]):
+        os.remove(config["state_path"])
+    write_csv(config["csv_queue_path"], ["1", "2", "3", "4"])
+    assert drain(config) == ["3", "4"]
+    assert queue.queue_metrics(config).snapshot()["duplicates_skipped"] - before == 2
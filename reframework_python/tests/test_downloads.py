@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_driver import FakeWebDriver
+from components.services.downloads import DownloadTimeoutError, DownloadWatcher
+
+
+class CdpDriver:
+    """Driver que aceita `Browser.setDownloadBehavior` e registra a pasta atual."""
+
+    def __init__(self) -> None:
+        self.download_path = None
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        self.download_path = params["downloadPath"]
+        return {}
+
+
+def _download_later(folder: str, name: str, delay: float = 0.1) -> threading.Thread:
+    """Simula o navegador: grava o parcial (.crdownload) e renomeia ao concluir."""
+
+    def run() -> None:
+        partial = os.path.join(folder, f"{name}.crdownload")
+        with open(partial, "wb") as f:
+            f.write(b"x" * 1024)
+        time.sleep(delay)
+        os.replace(partial, os.path.join(folder, name))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_concurrent_items_get_their_own_files(tmp_path):
+    watcher = DownloadWatcher(str(tmp_path / "downloads"), timeout=5)
+    results = {}
+
+    def item(item_id: str) -> None:
+        driver = CdpDriver()
+        with watcher.expect(driver, item_id) as download:
+            _download_later(driver.download_path, "relatorio.pdf").join()
+            results[item_id] = download.wait()
+
+    threads = [threading.Thread(target=item, args=(item_id,)) for item_id in ("1", "2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for item_id in ("1", "2"):
+        assert results[item_id] == [str(tmp_path / "downloads" / "items" / item_id / "relatorio.pdf")]
+    # Pastas temporárias removidas ao sair do bloco
+    assert os.listdir(tmp_path / "downloads" / ".staging") == []
+
+
+def test_without_cdp_only_new_files_are_taken(tmp_path):
+    base = tmp_path / "downloads"
+    base.mkdir()
+    (base / "antigo.csv").write_text("já estava aqui")
+    watcher = DownloadWatcher(str(base), timeout=5)
+
+    with watcher.expect(FakeWebDriver(), "42") as download:
+        trigger = _download_later(str(base), "novo.csv", delay=0.05)
+        paths = download.wait()
+    trigger.join()
+
+    assert paths == [str(base / "items" / "42" / "novo.csv")]
+    assert (base / "antigo.csv").exists()
+
+
+def test_unfinished_download_times_out(tmp_path):
+    watcher = DownloadWatcher(str(tmp_path / "downloads"), timeout=0.2)
+    driver = CdpDriver()
+    with watcher.expect(driver, "7") as download:
+        with open(os.path.join(driver.download_path, "lento.zip.crdownload"), "wb") as f:
+            f.write(b"parcial")
+        with pytest.raises(DownloadTimeoutError):
+            download.wait()
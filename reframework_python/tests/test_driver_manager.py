@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+from benchmarks.fake_driver import FakeWebDriver
+from components import hooks
+from components.services import driver_manager
+from tests.conftest import write_csv
+from tests.test_main_loop import _loop_config, _run_until
+
+
+def _wait_spare(lifecycle, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if lifecycle._spare is not None and lifecycle._spare.done():
+            return
+        time.sleep(0.005)
+    raise AssertionError("substituto não ficou pronto")
+
+
+def test_spare_is_logged_in_before_the_swap(queue_config, monkeypatch):
+    calls = []
+
+    def open_driver(cfg):
+        driver = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0, startup_ms=50)
+        calls.append(("open", driver))
+        return driver
+
+    def login(driver, cfg):
+        calls.append(("login", driver))
+        return True
+
+    monkeypatch.setattr(hooks, "open_driver", open_driver)
+    monkeypatch.setattr(hooks, "login", login)
+    lifecycle = hooks.driver_lifecycle(dict(queue_config, driver_max_items=2))
+    current = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+    lifecycle.opened()
+
+    lifecycle.item_done()
+    assert lifecycle.maybe_swap(current) is current
+    lifecycle.item_done()
+    # Limite atingido: o substituto começa a ser preparado, o atual segue em uso
+    assert lifecycle.maybe_swap(current) is current
+    _wait_spare(lifecycle)
+    spare = lifecycle.maybe_swap(current)
+
+    assert calls == [("open", spare), ("login", spare)]
+    lifecycle.shutdown()
+    for _ in range(100):
+        if current.closed:
+            break
+        time.sleep(0.01)
+    assert current.closed and not spare.closed
+
+
+def test_spare_that_fails_login_is_closed_and_not_used(queue_config, monkeypatch):
+    opened = []
+
+    def open_driver(cfg):
+        opened.append(FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0))
+        return opened[-1]
+
+    monkeypatch.setattr(hooks, "open_driver", open_driver)
+    monkeypatch.setattr(hooks, "login", lambda driver, cfg: False)
+    lifecycle = hooks.driver_lifecycle(dict(queue_config, driver_max_items=1))
+    current = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+    lifecycle.item_done()
+    lifecycle.prewarm()
+    _wait_spare(lifecycle)
+    assert lifecycle.maybe_swap(current) is current
+    assert opened[0].closed
+    lifecycle.shutdown()
+
+
+def test_recycle_check_runs_off_the_event_loop(queue_config, monkeypatch):
+    config = _loop_config(queue_config, workers=1, driver_max_rss_mb=10_000, driver_rss_check_seconds=0)
+    write_csv(config["csv_queue_path"], [str(i) for i in range(5)])
+    threads = []
+
+    def driver_rss_mb(driver):
+        threads.append(threading.current_thread())
+        return 1.0
+
+    monkeypatch.setattr(driver_manager, "driver_rss_mb", driver_rss_mb)
+    monkeypatch.setattr(hooks, "open_driver", lambda cfg: FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0))
+    asyncio.run(_run_until(config, 5))
+
+    assert threads
+    assert threading.main_thread() not in threads
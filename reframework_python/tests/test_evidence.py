@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+import zipfile
+
+from benchmarks.fake_driver import FakeWebDriver
+from components.services.evidence import EvidenceCollector
+
+
+def test_capture_writes_archive_in_background(tmp_path):
+    folder = str(tmp_path / "evidence")
+    collector = EvidenceCollector(folder)
+    driver = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+    driver.get("https://portal.invalid/item/1")
+    assert collector.capture(driver, prefix="process_item")
+    collector.shutdown()
+
+    (name,) = os.listdir(folder)
+    assert name.startswith("process_item_") and name.endswith(".zip")
+    with zipfile.ZipFile(os.path.join(folder, name)) as zf:
+        assert set(zf.namelist()) == {"screenshot.png", "page.html", "meta.json"}
+        assert b"portal.invalid/item/1" in zf.read("meta.json")
+
+
+def test_retention_removes_oldest_files_first(tmp_path):
+    folder = tmp_path / "evidence"
+    folder.mkdir()
+    now = time.time()
+    for i, age_days in enumerate([10, 3, 2, 1]):
+        path = folder / f"old_{i}.zip"
+        path.write_bytes(b"x" * 400 * 1024)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+
+    collector = EvidenceCollector(str(folder), max_mb=1, max_age_days=7)
+    collector.enforce_retention()
+    collector.shutdown()
+    # old_0 passou da idade; old_1 sai para caber em 1 MB
+    assert sorted(os.listdir(folder)) == ["old_2.zip", "old_3.zip"]
+
+
+def test_capture_is_dropped_when_queue_is_full(tmp_path):
+    collector = EvidenceCollector(str(tmp_path / "evidence"), workers=1, max_pending=1)
+    release = threading.Event()
+    original_write = collector._write
+
+    def slow_write(*args):
+        release.wait(5)
+        original_write(*args)
+
+    collector._write = slow_write
+    driver = FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+    assert collector.capture(driver)
+    # Worker não espera: a segunda captura é descartada
+    assert not collector.capture(driver)
+    release.set()
+    collector.shutdown()
+    assert len(os.listdir(tmp_path / "evidence")) == 1
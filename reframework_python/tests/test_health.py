@@ -0,0 +1,52 @@
+import asyncio
+import json
+import os
+import socket
+
+from utils.health import HealthReporter
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_worker_updates_stay_in_memory_until_heartbeat(tmp_path):
+    path = str(tmp_path / "health.json")
+    health = HealthReporter(path, queue_status=lambda: {"remaining_items": 3})
+    health.set_stage(1, "process")
+    health.driver_opened(1)
+    health.item_done()
+    assert not os.path.exists(path)
+
+    snapshot = health.snapshot()
+    assert snapshot["workers"]["1"]["stage"] == "process"
+    assert snapshot["remaining_items"] == 3
+    assert snapshot["items_per_min"] > 0
+
+
+def test_heartbeat_writes_file_and_serves_http(tmp_path):
+    path = str(tmp_path / "health.json")
+    port = _free_port()
+    health = HealthReporter(path, interval=0.05, port=port)
+    health.set_stage(2, "fetch")
+
+    async def scenario():
+        task = asyncio.create_task(health.run())
+        await asyncio.sleep(0.1)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return response
+
+    response = asyncio.run(scenario())
+    status, _, body = response.partition(b"\r\n\r\n")
+    assert status.startswith(b"HTTP/1.1 200")
+    assert json.loads(body)["workers"]["2"]["stage"] == "fetch"
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["workers"]["2"]["stage"] == "fetch"
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_driver import FakeWebDriver
+from components import hooks
+
+
+def _runner(**config):
+    return hooks.HookRunner(config, name="teste")
+
+
+def test_blocking_hook_runs_off_the_event_loop(monkeypatch):
+    seen = []
+    monkeypatch.setattr(hooks, "cleanup_before_cycle", lambda cfg: seen.append(threading.current_thread()))
+    runner = _runner()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        monkeypatch.setattr(hooks, "is_platform_available", lambda driver, cfg: time.sleep(0.2) or True)
+        assert await runner.run("is_platform_available", None, {})
+        await runner.run("cleanup_before_cycle", {})
+        task.cancel()
+        return ticks
+
+    # O loop seguiu atendendo outras tarefas durante os 200 ms do hook
+    assert asyncio.run(scenario()) >= 10
+    assert seen[0] is not threading.main_thread()
+    runner.close()
+
+
+def test_timeout_abandons_thread_and_next_call_uses_new_executor(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(hooks, "is_platform_available", lambda driver, cfg: release.wait(5))
+    runner = _runner(hook_timeouts={"is_platform_available": 0.05})
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await runner.run("is_platform_available", None, {})
+        # Sem limite para este hook: roda em outro executor, sem esperar a thread presa
+        monkeypatch.setattr(hooks, "is_platform_available", lambda driver, cfg: True)
+        return await runner.run("is_platform_available", None, {})
+
+    assert asyncio.run(scenario()) is True
+    release.set()
+    runner.close()
+
+
+def test_driver_opened_after_timeout_is_closed(monkeypatch):
+    opened = []
+
+    def slow_open(cfg):
+        time.sleep(0.2)
+        opened.append(FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0))
+        return opened[-1]
+
+    monkeypatch.setattr(hooks, "open_driver", slow_open)
+    runner = _runner(hook_timeouts={"open_driver": 0.05})
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await runner.run("open_driver", {})
+
+    asyncio.run(scenario())
+    for _ in range(100):
+        if opened and opened[0].closed:
+            break
+        time.sleep(0.01)
+    assert opened and opened[0].closed
+    runner.close()
+
+
+def test_batch_timeout_defaults_to_item_timeout_times_batch_size():
+    runner = _runner(hook_timeouts={"process_item": 10})
+    assert runner.timeout_for("process_batch", ([{"id": "1"}] * 5, None, {})) == 50
+    runner.close()
+
+    runner = _runner(hook_timeouts={"process_item": 10, "process_batch": 30})
+    assert runner.timeout_for("process_batch", ([{"id": "1"}] * 5, None, {})) == 30
+    runner.close()
+
+    runner = _runner()
+    assert runner.timeout_for("process_batch", ([{"id": "1"}] * 5, None, {})) is None
+    runner.close()
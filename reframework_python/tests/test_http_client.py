@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from benchmarks.fake_driver import FakeWebDriver  # noqa: E402
+from benchmarks.fake_portal import FakePortal  # noqa: E402
+from components import hooks  # noqa: E402
+from components.services.http_client import _clients  # noqa: E402
+
+
+@pytest.fixture
+def portal():
+    with FakePortal(flaky_failures=2) as server:
+        yield server
+
+
+def _driver() -> FakeWebDriver:
+    return FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0)
+
+
+def test_client_uses_driver_cookies(portal):
+    driver = _driver()
+    driver.add_cookie(portal.session_cookie())
+    client = hooks.http_client(driver, {"url": portal.url})
+    response = client.get("api/items/42")
+    assert response.status_code == 200
+    assert response.json()["id"] == "42"
+    assert hooks.http_client(driver, {"url": portal.url}) is client
+    hooks.close_driver(driver)
+    assert driver not in _clients
+
+
+def test_unauthorized_resyncs_cookies_once(portal):
+    driver = _driver()
+    client = hooks.http_client(driver, {"url": portal.url})
+    assert client.get("api/items/1").status_code == 401
+
+    # O navegador renovou a sessão: o 401 faz o cliente reler os cookies do driver
+    driver.add_cookie(portal.session_cookie())
+    assert client.get("api/items/1").status_code == 200
+    hooks.close_driver(driver)
+
+
+def test_transient_errors_are_retried_on_one_connection(portal):
+    driver = _driver()
+    client = hooks.http_client(driver, {"url": portal.url, "http_backoff_seconds": 0})
+    response = client.get("flaky")
+    assert response.status_code == 200
+    assert portal.flaky_calls == 3
+    for i in range(5):
+        client.get(f"api/items/{i}")
+    assert len(portal.connections) == 1
+    hooks.close_driver(driver)
@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import threading
+
+from utils.log import log_context, setup_logging, stop_logging
+
+
+def _emit_and_stop(*messages: str) -> None:
+    try:
+        for message in messages:
+            logging.getLogger().info(message)
+    finally:
+        stop_logging()
+
+
+def test_json_lines_carry_the_log_context(tmp_path):
+    path = str(tmp_path / "logs" / "robo.jsonl")
+    setup_logging(file_path=path, json_lines=True)
+    try:
+        with log_context(worker="worker-1", stage="process_item", item_id="42"):
+            logging.getLogger().info("item %s processado", "42")
+        try:
+            raise ValueError("falha")
+        except ValueError:
+            logging.getLogger().exception("erro fora do contexto")
+    finally:
+        stop_logging()
+
+    with open(path, encoding="utf-8") as f:
+        first, second = [json.loads(line) for line in f]
+    assert first["msg"] == "item 42 processado"
+    assert (first["worker"], first["stage"], first["item_id"]) == ("worker-1", "process_item", "42")
+    assert second["level"] == "ERROR" and "worker" not in second
+    assert "ValueError: falha" in second["msg"]
+
+
+def test_file_is_rotated_by_size(tmp_path):
+    path = str(tmp_path / "robo.log")
+    setup_logging(file_path=path, max_bytes=200, backup_count=2)
+    _emit_and_stop(*(f"linha {i:03d} " + "x" * 40 for i in range(30)))
+
+    assert sorted(os.listdir(tmp_path)) == ["robo.log", "robo.log.1", "robo.log.2"]
+    with open(path, encoding="utf-8") as f:
+        assert "linha 029" in f.read()
+
+
+def test_concurrent_setup_keeps_a_single_running_pipeline(tmp_path):
+    path = str(tmp_path / "robo.log")
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def setup() -> None:
+        barrier.wait()
+        try:
+            setup_logging(file_path=path)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=setup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    _emit_and_stop("depois da corrida")
+
+    assert errors == []
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("depois da corrida") == 1
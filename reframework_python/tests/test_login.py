@@ -0,0 +1,140 @@
+from typing import Any, List
+
+from components import hooks
+from components.actions.login import _session_cache, perform_login
+
+
+class _Element:
+    def __init__(self, log: List[tuple], selector: str) -> None:
+        self.log = log
+        self.selector = selector
+
+    def clear(self) -> None:
+        self.log.append(("clear", self.selector))
+
+    def send_keys(self, value: str) -> None:
+        self.log.append(("send_keys", self.selector))
+
+    def click(self) -> None:
+        self.log.append(("click", self.selector))
+
+
+class JavascriptException(Exception):
+    """Mesmo nome da exceção do Selenium para "document unloaded while waiting for result"."""
+
+
+class ScriptedDriver:
+    """Driver que registra as chamadas; `wait_for_all` sempre encontra os elementos.
+
+    - `clickable=False`: o botão de envio nunca fica clicável.
+    - `unload_after_click`: a primeira espera após o clique roda no documento antigo,
+      que é descarregado pela navegação do formulário.
+    """
+
+    def __init__(self, clickable: bool = True, unload_after_click: bool = False) -> None:
+        self.log: List[tuple] = []
+        self.clickable = clickable
+        self.unload_after_click = unload_after_click
+
+    def get(self, url: str) -> None:
+        self.log.append(("get", url))
+
+    def set_script_timeout(self, seconds: float) -> None:
+        pass
+
+    def execute_async_script(self, script: str, selectors: List[str], condition: str, *args: Any) -> Any:
+        self.log.append(("wait", tuple(selectors), condition))
+        if self.unload_after_click and self.log[-2][0] == "click":
+            raise JavascriptException("javascript error: document unloaded while waiting for result")
+        if condition == "clickable" and not self.clickable:
+            return {"ok": False, "missing": selectors}
+        return {"ok": True, "elements": [_Element(self.log, s) for s in selectors]}
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self.log.append(("script",))
+        return []
+
+    def get_cookies(self) -> list:
+        self.log.append(("get_cookies",))
+        return [{"name": "SESSION", "value": "abc"}]
+
+    def add_cookie(self, cookie: dict) -> None:
+        self.log.append(("add_cookie",))
+
+
+def _config(queue_config, **extra):
+    return dict(
+        queue_config,
+        url="https://portal.invalid/login",
+        username="robo",
+        password="segredo",
+        success_check_selector="#home",
+        **extra,
+    )
+
+
+def test_form_login_types_then_waits_for_clickable_submit(queue_config):
+    driver = ScriptedDriver()
+    assert perform_login(driver, _config(queue_config, session_cache_enabled=False))
+
+    actions = [entry[0] for entry in driver.log]
+    assert actions[:2] == ["get", "wait"]
+    assert driver.log[1][2] == "present" and 'button[type="submit"]' not in driver.log[1][1]
+    # Digitação é o padrão; o botão só é aguardado (clicável) depois do preenchimento
+    assert actions.index("send_keys") < actions.index("wait", 2)
+    assert ("wait", ('button[type="submit"]',), "clickable") in driver.log
+    assert actions.index("click") > actions.index("send_keys")
+
+
+def test_disabled_submit_fails_login(queue_config):
+    driver = ScriptedDriver(clickable=False)
+    assert not perform_login(driver, _config(queue_config, session_cache_enabled=False, login_timeout=0.1))
+    assert "click" not in [entry[0] for entry in driver.log]
+
+
+def test_success_wait_survives_page_unload_after_submit(queue_config):
+    driver = ScriptedDriver(unload_after_click=True)
+    assert perform_login(driver, _config(queue_config, session_cache_enabled=False, wait_poll_interval=0.01))
+    # Primeira espera interrompida pela navegação; a segunda roda na página nova
+    waits_after_click = driver.log[[entry[0] for entry in driver.log].index("click") + 1:]
+    assert waits_after_click == [("wait", ("#home",), "present")] * 2
+
+
+def test_saved_session_is_restored_in_a_new_driver(queue_config):
+    config = _config(queue_config)
+    assert perform_login(ScriptedDriver(), config)
+
+    driver = ScriptedDriver()
+    assert perform_login(driver, config)
+    actions = [entry[0] for entry in driver.log]
+    # Cookies injetados e sessão validada: o formulário não é preenchido
+    assert "add_cookie" in actions and "send_keys" not in actions and "click" not in actions
+
+
+def test_authenticated_driver_skips_browser_until_an_item_fails(queue_config):
+    config = _config(queue_config)
+    driver = ScriptedDriver()
+    _session_cache(config).save(driver)
+    driver.log.clear()
+
+    assert perform_login(driver, config)
+    assert driver.log == []
+
+    hooks.fail_item({"id": "1"}, driver, config, RuntimeError("sessão expirada"))
+    assert perform_login(driver, config)
+    # Sessão conferida de novo: restaurada do cache e validada no navegador
+    assert ("get", config["url"]) in driver.log
+
+
+def test_on_login_runs_only_when_the_session_changes(queue_config):
+    config = _config(queue_config)
+    logins = []
+    driver = ScriptedDriver()
+    assert perform_login(driver, config, on_login=logins.append)
+    # Já autenticado: retorno imediato, sem avisar o cliente HTTP
+    assert perform_login(driver, config, on_login=logins.append)
+    assert logins == [driver]
+
+    restored = ScriptedDriver()
+    assert perform_login(restored, config, on_login=logins.append)
+    assert logins == [driver, restored]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import main
+from benchmarks.fake_driver import FakeWebDriver
+from components import hooks
+from tests.conftest import write_csv
+
+
+def _loop_config(queue_config, **extra):
+    """Config do loop com esperas curtas (fila vazia, backoff) para o teste terminar rápido."""
+    config = dict(
+        queue_config,
+        workers=3,
+        wait_time_in_minutes=0.001,
+        min_wait_seconds=0.01,
+        queue_watch_interval_seconds=0.05,
+        backoff_base_seconds=0.01,
+        backoff_max_seconds=0.05,
+        health_interval_seconds=60,
+        session_cache_enabled=False,
+        ativar_log=False,
+    )
+    config.update(extra)
+    return config
+
+
+def _finished(config) -> int:
+    snapshot = hooks.metrics(config).snapshot()
+    return snapshot.get("processed_success", 0) + snapshot.get("dead_letter", 0)
+
+
+async def _run_until(config, rows: int, timeout: float = 10.0) -> None:
+    """Roda main.main() até `rows` itens chegarem a um estado final e então cancela."""
+    task = asyncio.create_task(main.main(config))
+    deadline = time.monotonic() + timeout
+    try:
+        while _finished(config) < rows and not task.done() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_pool_survives_worker_crash_and_quits_every_driver(queue_config, monkeypatch):
+    config = _loop_config(queue_config)
+    rows = 30
+    write_csv(config["csv_queue_path"], [str(i) for i in range(rows)])
+    drivers = []
+    processed_by = {}
+    crashed = []
+
+    def open_driver(cfg):
+        driver = FakeWebDriver(page_latency_ms=5, jitter_ms=0, roundtrip_ms=0)
+        drivers.append(driver)
+        return driver
+
+    def process_item(item, driver, cfg):
+        driver.get(f"https://portal.invalid/item/{item['id']}")
+        if item["id"] == "7" and not crashed:
+            # Driver travado: o worker descarta o driver e segue no próximo ciclo
+            crashed.append(driver)
+            raise TimeoutError("driver travado")
+        processed_by[item["id"]] = driver
+
+    monkeypatch.setattr(hooks, "open_driver", open_driver)
+    monkeypatch.setattr(hooks, "process_item", process_item)
+    asyncio.run(_run_until(config, rows))
+
+    snapshot = hooks.metrics(config).snapshot()
+    assert snapshot["processed_success"] == rows
+    assert sorted(processed_by, key=int) == [str(i) for i in range(rows)]
+    # Os três workers processaram itens; o que caiu abriu um driver novo
+    assert len({id(d) for d in processed_by.values()}) >= 3
+    assert len(drivers) == 4 and processed_by["7"] is not crashed[0]
+    # Cancelamento: nenhum navegador fica aberto (inclusive o descartado após a falha)
+    for _ in range(100):
+        if all(d.closed for d in drivers):
+            break
+        time.sleep(0.01)
+    assert all(d.closed for d in drivers)
+
+
+def test_default_batch_runs_the_project_process_item(queue_config, monkeypatch):
+    config = _loop_config(queue_config, workers=1, batch_size=4)
+    rows = 10
+    write_csv(config["csv_queue_path"], [str(i) for i in range(rows)])
+    processed = []
+
+    def process_item(item, driver, cfg):
+        if item["id"] == "3" and "3" not in processed:
+            processed.append("3")
+            raise ValueError("falha do item")
+        processed.append(item["id"])
+
+    monkeypatch.setattr(hooks, "open_driver", lambda cfg: FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0))
+    monkeypatch.setattr(hooks, "process_item", process_item)
+    asyncio.run(_run_until(config, rows))
+
+    snapshot = hooks.metrics(config).snapshot()
+    assert snapshot["processed_success"] == rows
+    assert snapshot["batches"] >= 3
+    # O item que falhou no lote voltou sozinho pela retentativa
+    assert processed.count("3") == 2 and snapshot["attempts_failed"] == 1
+
+
+def test_batch_falls_back_to_single_items_when_not_implemented(queue_config, monkeypatch):
+    config = _loop_config(queue_config, workers=1, batch_size=3)
+    rows = 7
+    write_csv(config["csv_queue_path"], [str(i) for i in range(rows)])
+    batch_calls = []
+    processed = []
+
+    def process_batch(items, driver, cfg):
+        batch_calls.append([item["id"] for item in items])
+        raise NotImplementedError
+
+    monkeypatch.setattr(hooks, "open_driver", lambda cfg: FakeWebDriver(page_latency_ms=0, jitter_ms=0, roundtrip_ms=0))
+    monkeypatch.setattr(hooks, "process_batch", process_batch)
+    monkeypatch.setattr(hooks, "process_item", lambda item, driver, cfg: processed.append(item["id"]))
+    asyncio.run(_run_until(config, rows))
+
+    # Um único lote tentado; o próprio lote e o resto da fila seguem item a item
+    assert batch_calls == [["0", "1", "2"]]
+    assert processed == [str(i) for i in range(rows)]
+    assert hooks.metrics(config).snapshot()["processed_success"] == rows
@@ -0,0 +1,49 @@
+import json
+import os
+
+from utils.metrics import MetricsAggregator, merge_snapshots
+
+
+def test_counters_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    metrics = MetricsAggregator(path, flush_items=5, flush_seconds=3600)
+    for _ in range(4):
+        metrics.incr("processed_success")
+    # Abaixo do lote: nada foi gravado ainda
+    assert not os.path.exists(path)
+
+    metrics.incr("processed_success")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["processed_success"] == 5
+
+
+def test_counters_continue_from_previous_run(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    first = MetricsAggregator(path, flush_items=1)
+    first.incr("processed_total", 3)
+    assert MetricsAggregator(path).snapshot()["processed_total"] == 3
+
+
+def test_latency_percentiles_come_from_histogram(tmp_path):
+    metrics = MetricsAggregator(str(tmp_path / "metrics.json"), flush_items=10_000)
+    for ms in range(1, 101):
+        metrics.observe("process", ms / 1000)
+    summary = metrics.snapshot()["latency_ms"]["process"]
+    assert summary["count"] == 100
+    assert summary["max"] == 100
+    # Buckets geométricos (fator 1.2): erro de até ~20% sobre o valor exato
+    assert 50 <= summary["p50"] <= 60
+    assert 95 <= summary["p95"] <= 100
+
+
+def test_merge_sums_counters_and_histograms(tmp_path):
+    a = MetricsAggregator(str(tmp_path / "a.json"))
+    b = MetricsAggregator(str(tmp_path / "b.json"))
+    a.incr("processed_success", 2)
+    b.incr("processed_success", 3)
+    a.observe("process", 0.010)
+    b.observe("process", 0.200)
+    merged = merge_snapshots([a.snapshot(), b.snapshot()])
+    assert merged["processed_success"] == 5
+    assert merged["latency_ms"]["process"]["count"] == 2
+    assert merged["latency_ms"]["process"]["max"] == 200
@@ -0,0 +1,227 @@
+import csv
+import json
+import os
+
+from components.actions import queue
+from tests.conftest import _reset_queue_state, drain, write_csv
+
+
+def test_csv_source_reads_lazily_in_order(tmp_path):
+    path = str(tmp_path / "queue.csv")
+    write_csv(path, [str(i) for i in range(1000)])
+    source = queue._CsvQueueSource(path, read_ahead=8)
+
+    # Só o buffer de leitura antecipada fica em memória
+    assert len(source._buffer) == 8
+    assert source.remaining() == 1000
+    assert [source.pop()["id"] for _ in range(3)] == ["0", "1", "2"]
+    assert len(source._buffer) <= 8
+    assert source.remaining() == 997
+
+    rest = []
+    while (item := source.pop()) is not None:
+        rest.append(item["id"])
+    assert rest == [str(i) for i in range(3, 1000)]
+    assert source.remaining() == 0
+
+
+def test_count_rows_skips_header_and_handles_missing_newline(tmp_path):
+    path = tmp_path / "queue.csv"
+    path.write_bytes(b"id,nome\n1,a\n2,b")
+    assert queue._count_rows(str(path)) == 2
+    assert queue._count_rows(str(path), chunk_size=3) == 2
+
+
+def test_queue_is_loaded_once_and_reports_remaining(queue_config):
+    write_csv(queue_config["csv_queue_path"], ["1", "2", "3"])
+    assert queue.initialize_queue(None, queue_config)
+    assert queue.fetch_next_item(None, queue_config)["id"] == "1"
+    # Fila ainda com itens: initialize_queue não relê o arquivo
+    assert queue.initialize_queue(None, queue_config)
+    assert queue.queue_status(queue_config)["remaining_items"] == 2
+    assert drain(queue_config) == ["2", "3"]
+
+
+def _bump_mtime(path: str) -> None:
+    # Garante assinatura (tamanho, mtime) diferente mesmo em sistemas com mtime grosso
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+
+
+def test_sqlite_resumes_items_interrupted_by_a_crash(queue_config):
+    config = dict(queue_config, queue_backend="sqlite")
+    write_csv(config["csv_queue_path"], ["1", "2", "3"])
+    assert queue.initialize_queue(None, config)
+    first = queue.fetch_next_item(None, config)
+    queue.mark_item_done(first, config)
+    assert queue.fetch_next_item(None, config)["id"] == "2"
+
+    # Queda com o item 2 em andamento: o novo processo o devolve à fila
+    _reset_queue_state()
+    assert queue.initialize_queue(None, config)
+    assert drain(config) == ["2", "3"]
+
+
+def test_sqlite_skips_import_when_csv_is_unchanged(queue_config):
+    config = dict(queue_config, queue_backend="sqlite")
+    write_csv(config["csv_queue_path"], ["1"])
+    assert drain(config) == ["1"]
+    queue.mark_item_done({"id": "1"}, config)
+    with open(config["state_path"], encoding="utf-8") as f:
+        checkpoint = json.load(f)["source"]
+    assert checkpoint["size"] == os.path.getsize(config["csv_queue_path"])
+
+    _reset_queue_state()
+    # Checkpoint igual ao arquivo: nada é reimportado
+    assert not queue.initialize_queue(None, config)
+
+
+def test_sqlite_reimport_keeps_done_items(queue_config):
+    config = dict(queue_config, queue_backend="sqlite")
+    write_csv(config["csv_queue_path"], ["1"])
+    assert drain(config) == ["1"]
+    queue.mark_item_done({"id": "1"}, config)
+
+    write_csv(config["csv_queue_path"], ["1", "2"])
+    _bump_mtime(config["csv_queue_path"])
+    assert drain(config) == ["2"]
+
+
+def test_sqlite_store_follows_db_path(queue_config, tmp_path):
+    config = dict(queue_config, queue_backend="sqlite")
+    write_csv(config["csv_queue_path"], ["1"])
+    assert drain(config) == ["1"]
+
+    other = dict(config, queue_db_path=str(tmp_path / "other.db"), state_path=str(tmp_path / "other.json"))
+    assert drain(other) == ["1"]
+    assert queue._store.path == other["queue_db_path"]
+
+
+def test_csv_resumes_after_append_without_redelivering(queue_config):
+    path = queue_config["csv_queue_path"]
+    write_csv(path, ["1", "2"])
+    assert drain(queue_config) == ["1", "2"]
+
+    write_csv(path, ["3"], mode="a")
+    _bump_mtime(path)
+    assert drain(queue_config) == ["3"]
+    # Sem mudança no arquivo, nada é entregue de novo
+    assert drain(queue_config) == []
+
+
+def test_csv_resume_waits_for_incomplete_last_line(queue_config):
+    path = queue_config["csv_queue_path"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("id,nome\n1,a\n2,partial")
+    # A linha 2 ainda está sendo gravada pelo exportador
+    assert drain(queue_config) == ["1"]
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        f.write("_name\n3,c\n")
+    _bump_mtime(path)
+    assert queue.initialize_queue(None, queue_config)
+    rows = [queue.fetch_next_item(None, queue_config) for _ in range(2)]
+    assert rows == [{"id": "2", "nome": "partial_name"}, {"id": "3", "nome": "c"}]
+
+
+def test_csv_resume_handles_quoted_multiline_fields(queue_config):
+    path = queue_config["csv_queue_path"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write('id,nome\n1,"linha\nquebrada"\n')
+    assert drain(queue_config) == ["1"]
+    write_csv(path, ["2"], mode="a")
+    _bump_mtime(path)
+    assert drain(queue_config) == ["2"]
+
+
+def test_csv_replaced_file_is_read_from_start(queue_config):
+    path = queue_config["csv_queue_path"]
+    write_csv(path, ["1", "2"])
+    assert drain(queue_config) == ["1", "2"]
+
+    write_csv(path, ["7", "8", "9"])
+    _bump_mtime(path)
+    assert drain(queue_config) == ["7", "8", "9"]
+
+
+def test_csv_truncated_file_is_read_from_start(queue_config):
+    path = queue_config["csv_queue_path"]
+    write_csv(path, ["10", "11", "12"])
+    assert drain(queue_config) == ["10", "11", "12"]
+
+    write_csv(path, ["5"])
+    _bump_mtime(path)
+    assert drain(queue_config) == ["5"]
+
+
+def test_retry_then_dead_letter(queue_config):
+    write_csv(queue_config["csv_queue_path"], ["1"])
+    assert queue.initialize_queue(None, queue_config)
+
+    item = queue.fetch_next_item(None, queue_config)
+    queue.mark_item_failed(item, queue_config, "primeira falha")
+    # retry_backoff_seconds = 0: a retentativa já está pronta
+    assert queue.initialize_queue(None, queue_config)
+    retried = queue.fetch_next_item(None, queue_config)
+    assert retried["id"] == "1"
+    queue.mark_item_failed(retried, queue_config, "segunda falha")
+
+    assert queue.fetch_next_item(None, queue_config) is None
+    with open(queue_config["dead_letter_path"], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["id"], r["dl_attempts"], r["dl_error"]) for r in rows] == [("1", "2", "segunda falha")]
+
+    snapshot = queue.queue_metrics(queue_config).snapshot()
+    # Um item, duas tentativas: processed_* contam o item uma vez, no resultado final
+    assert snapshot["attempts_failed"] == 2
+    assert snapshot["retry_scheduled"] == 1
+    assert snapshot["dead_letter"] == 1
+    assert snapshot["processed_total"] == 1
+    assert snapshot["processed_error"] == 1
+    assert snapshot["processed_success"] == 0
+
+
+def test_success_after_retry_counts_only_success(queue_config):
+    write_csv(queue_config["csv_queue_path"], ["1", "2"])
+    queue.initialize_queue(None, queue_config)
+    item = queue.fetch_next_item(None, queue_config)
+    queue.mark_item_failed(item, queue_config, "falha")
+    retried = queue.fetch_next_item(None, queue_config)
+    assert retried["id"] == "1"
+    queue.mark_item_done(retried, queue_config)
+    queue.mark_item_done(queue.fetch_next_item(None, queue_config), queue_config)
+
+    assert queue._attempts == {}
+    snapshot = queue.queue_metrics(queue_config).snapshot()
+    # Contado pelo framework, mesmo sem passar pelo process_item de exemplo
+    assert snapshot["processed_total"] == 2
+    assert snapshot["processed_success"] == 2
+    assert snapshot["processed_error"] == 0
+    assert snapshot["attempts_failed"] == 1
+    assert not os.path.exists(queue_config["dead_letter_path"])
+
+
+def test_sqlite_reimports_dead_letter(queue_config):
+    config = dict(queue_config, queue_backend="sqlite", retry_max_attempts=1)
+    write_csv(config["csv_queue_path"], ["1", "2"])
+    assert queue.initialize_queue(None, config)
+    first = queue.fetch_next_item(None, config)
+    queue.mark_item_failed(first, config, "falha")
+    second = queue.fetch_next_item(None, config)
+    queue.mark_item_done(second, config)
+    assert queue._store.counts() == {"done": 1, "failed": 1}
+
+    config["csv_queue_path"] = config["dead_letter_path"]
+    assert queue.initialize_queue(None, config)
+    assert queue._store.counts() == {"done": 1, "pending": 1}
+    assert queue.fetch_next_item(None, config)["id"] == first["id"]
+
+
+def test_fetch_next_batch_respects_size(queue_config):
+    write_csv(queue_config["csv_queue_path"], [str(i) for i in range(5)])
+    queue.initialize_queue(None, queue_config)
+    batch = queue.fetch_next_batch(None, queue_config, size=3)
+    assert [item["id"] for item in batch] == ["0", "1", "2"]
+    assert [item["id"] for item in queue.fetch_next_batch(None, queue_config, size=3)] == ["3", "4"]
+    # Fila vazia: retorna na hora, sem esperar max_wait
+    assert queue.fetch_next_batch(None, queue_config, size=3, max_wait=5) == []
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+from utils.scheduler import EMPTY, ERROR, CycleScheduler
+
+
+def _config(**extra):
+    config = {
+        "wait_time_in_minutes": 0.05,
+        "min_wait_seconds": 0.01,
+        "queue_watch_interval_seconds": 0.02,
+        "backoff_base_seconds": 0.01,
+        "backoff_max_seconds": 0.04,
+    }
+    config.update(extra)
+    return config
+
+
+def test_empty_wait_wakes_up_when_queue_file_changes(tmp_path):
+    path = tmp_path / "queue.csv"
+    path.write_text("id\n1\n")
+    scheduler = CycleScheduler(_config(), str(path))
+
+    def append_later():
+        time.sleep(0.1)
+        with open(path, "a") as f:
+            f.write("2\n")
+
+    threading.Thread(target=append_later).start()
+    waited = asyncio.run(scheduler.wait(EMPTY))
+    # Teto de 3s (0.05 min): acordou pela mudança muito antes
+    assert waited["woke_by_change"]
+    assert waited["seconds"] < 1.5
+
+
+def test_empty_wait_is_capped_by_scheduled_work(tmp_path):
+    scheduler = CycleScheduler(_config(), str(tmp_path / "queue.csv"))
+    waited = asyncio.run(scheduler.wait(EMPTY, limit=0.05))
+    assert not waited["woke_by_change"]
+    assert waited["seconds"] < 1.0
+
+
+def test_error_backoff_grows_and_resets_on_success():
+    scheduler = CycleScheduler(_config(backoff_base_seconds=1, backoff_max_seconds=100))
+    first = scheduler.backoff_delay()
+    scheduler._failures = 4
+    assert scheduler.backoff_delay() > first
+    scheduler.success()
+    assert scheduler.backoff_delay() <= 1
+    waited = asyncio.run(CycleScheduler(_config()).wait(ERROR))
+    assert waited["reason"] == ERROR and waited["seconds"] <= 0.5
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+import main
+from components.services import browser
+from utils import tracing
+from utils.sharding import ShardLease, shard_of, shard_path
+
+
+def _expire(lease: ShardLease, index: int = 0) -> None:
+    past = time.time() - 10 * lease.ttl
+    os.utime(lease._path(index), (past, past))
+
+
+def test_live_lease_is_not_taken(tmp_path):
+    owner = ShardLease(str(tmp_path), 1, ttl=30)
+    assert owner.acquire() == 0
+    assert ShardLease(str(tmp_path), 1, ttl=30).acquire() is None
+    assert owner.renew()
+
+
+def test_stale_lease_is_taken_over_and_old_owner_loses_it(tmp_path):
+    owner = ShardLease(str(tmp_path), 1, ttl=1)
+    owner.acquire()
+    _expire(owner)
+
+    successor = ShardLease(str(tmp_path), 1, ttl=1)
+    assert successor.acquire() == 0
+    assert successor.renew()
+    assert not owner.renew()
+    assert os.listdir(tmp_path) == ["shard-0.lease"]
+
+
+def test_concurrent_takeover_has_single_winner(tmp_path):
+    for trial in range(20):
+        folder = str(tmp_path / str(trial))
+        owner = ShardLease(folder, 1, ttl=1)
+        owner.acquire()
+        _expire(owner)
+
+        barrier = threading.Barrier(6)
+        winners = []
+
+        def contend() -> None:
+            lease = ShardLease(folder, 1, ttl=1)
+            barrier.wait()
+            if lease.acquire() == 0:
+                winners.append(lease)
+
+        threads = [threading.Thread(target=contend) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len([lease for lease in winners if lease.renew()]) == 1
+        assert os.listdir(folder) == ["shard-0.lease"]
+
+
+def test_release_frees_the_shard(tmp_path):
+    owner = ShardLease(str(tmp_path), 2, ttl=30)
+    assert owner.acquire() == 0
+    assert ShardLease(str(tmp_path), 2, ttl=30).acquire() == 1
+    owner.release()
+    assert ShardLease(str(tmp_path), 2, ttl=30).acquire() == 0
+
+
+def test_shard_of_is_stable_and_paths_are_suffixed():
+    assert shard_of("item-42", 4) == shard_of("item-42", 4)
+    assert {shard_of(str(i), 4) for i in range(100)} == {0, 1, 2, 3}
+    config = {"shard_index": 2, "shard_count": 4}
+    assert shard_path("logs/metrics.json", config) == "logs/metrics.shard2.json"
+    assert shard_path("logs/metrics.json", {}) == "logs/metrics.json"
+    assert shard_path("logs/traces/", config) == "logs/traces.shard2"
+
+
+def test_shards_get_separate_cache_slots_traces_and_health_ports(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    shards = [{"shard_index": i, "shard_count": 2, "health_port": 8080} for i in range(2)]
+
+    slots = [browser._reserve_cache_slot({"browser_cache_dir": cache_dir}, config) for config in shards]
+    try:
+        # Cada processo começa no slot-0, mas em pastas base diferentes
+        assert [os.path.basename(slot) for slot in slots] == ["slot-0", "slot-0"]
+        assert len(set(slots)) == 2
+    finally:
+        browser._cache_slots_in_use.difference_update(slots)
+
+    folders = []
+    for config in shards:
+        monkeypatch.setattr(tracing, "_tracer", None)
+        folders.append(tracing.get_tracer(dict(config, trace_enabled=True, trace_dir=str(tmp_path / "traces"))).folder)
+    monkeypatch.setattr(tracing, "_tracer", None)
+    assert folders == [str(tmp_path / "traces.shard0"), str(tmp_path / "traces.shard1")]
+
+    assert [main._health_port(config) for config in shards] == [8080, 8081]
+    assert main._health_port({"health_port": 8080}) == 8080
+    assert main._health_port({}) is None
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import time
+
+from components import hooks
+from utils import tracing
+from utils.tracing import Tracer
+
+
+def _read_spans(folder: str) -> list:
+    with open(os.path.join(folder, "spans.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spans_are_flushed_in_batches_and_exported(tmp_path):
+    folder = str(tmp_path / "traces")
+    tracer = Tracer(folder, flush_every=2)
+    with tracer.span("login", "worker-1"):
+        pass
+    assert not os.path.exists(os.path.join(folder, "spans.jsonl"))
+    try:
+        with tracer.span("process_item", "worker-1", {"item_id": "7"}):
+            raise ValueError("falha")
+    except ValueError:
+        pass
+
+    spans = _read_spans(folder)
+    assert [s["name"] for s in spans] == ["login", "process_item"]
+    assert spans[1]["args"] == {"item_id": "7", "error": "ValueError"}
+
+    tracer.close()
+    with open(os.path.join(folder, "trace.json"), encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert [e["tid"] for e in events] == ["worker-1", "worker-1"]
+
+
+def test_slow_sampled_item_gets_a_profile(tmp_path):
+    tracer = Tracer(str(tmp_path / "traces"), profile_sample_rate=1.0, slow_ms=10)
+    assert tracer.should_profile("process_item") and not tracer.should_profile("login")
+    args = {}
+    tracer.profiled(lambda: time.sleep(0.02), args)()
+    assert os.path.exists(args["profile_path"])
+    assert args["profile_top"]
+
+
+def test_hook_runner_records_one_span_per_hook(tmp_path, monkeypatch):
+    folder = str(tmp_path / "traces")
+    monkeypatch.setattr(tracing, "_tracer", None)
+    config = {"trace_enabled": True, "trace_dir": folder}
+    monkeypatch.setattr(hooks, "process_item", lambda item, driver, cfg: None)
+    runner = hooks.HookRunner(config, name="worker-1")
+    asyncio.run(runner.run("process_item", {"id": "42"}, None, config))
+    runner.close()
+    tracing.shutdown_tracer()
+
+    (span,) = _read_spans(folder)
+    assert span["name"] == "process_item"
+    assert span["worker"] == "worker-1"
+    assert span["args"] == {"item_id": "42"}
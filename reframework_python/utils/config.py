@@ -1,10 +1,15 @@
 import json
 import logging
 import os
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from utils.log import setup_logging
 
 
 _LOGGER_CONFIGURED = False
+_logger_lock = threading.Lock()
 
 
 def _project_root() -> str:
@@ -15,13 +20,37 @@ def _default_config_path() -> str:
     return os.path.join(os.path.dirname(_project_root()), "data", "config.json")
 
 
-def configure_logging(level: int = logging.INFO) -> None:
+def configure_logging(level: int = logging.INFO, config: Optional[Mapping[str, Any]] = None) -> None:
+    """Configura os logs (escrita em segundo plano, ver utils/log.py).
+
+    - Sem `config`: apenas console, uma única vez (chamadas seguintes não fazem nada).
+    - Com `config` (refaz a configuração):
+      - ativar_log: grava também em `log_path` (padrão: logs/robo.log; um arquivo por shard)
+      - nivel_log: DEBUG | INFO | WARNING | ERROR (padrão: INFO)
+      - log_format: "text" ou "json" (uma linha JSON com worker, etapa e id do item)
+      - log_max_mb / log_backup_count: rotação por tamanho (padrão: 10 MB, 5 cópias)
+    """
     global _LOGGER_CONFIGURED
-    if _LOGGER_CONFIGURED:
+    if config is None:
+        # Primeiro log vindo de várias threads: só uma monta o console
+        with _logger_lock:
+            if not _LOGGER_CONFIGURED:
+                setup_logging(level)
+                _LOGGER_CONFIGURED = True
         return
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s [%(levelname)s] %(message)s",
+    file_path = None
+    level = getattr(logging, str(config.get("nivel_log") or "INFO").upper(), logging.INFO)
+    if config.get("ativar_log", True):
+        from utils.sharding import shard_path
+
+        path = config.get("log_path") or os.path.join(os.path.dirname(_project_root()), "logs", "robo.log")
+        file_path = shard_path(path, config)
+    setup_logging(
+        level,
+        file_path=file_path,
+        json_lines=str(config.get("log_format", "text")).lower() == "json",
+        max_bytes=int(float(config.get("log_max_mb", 10)) * 1024 * 1024),
+        backup_count=int(config.get("log_backup_count", 5)),
     )
     _LOGGER_CONFIGURED = True
 
@@ -38,12 +67,17 @@ def log_error(message: str) -> None:
     logging.error(message)
 
 
-def load_config(path: str | None = None) -> Dict[str, Any]:
+def _resolve_config_path(path: str | None = None) -> str:
     config_path = path or _default_config_path()
     if not os.path.isabs(config_path):
         # Resolve relative to project root
         base = os.path.dirname(_project_root())
         config_path = os.path.join(base, config_path)
+    return config_path
+
+
+def load_config(path: str | None = None) -> Dict[str, Any]:
+    config_path = _resolve_config_path(path)
     try:
         with open(config_path, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -55,3 +89,263 @@ def load_config(path: str | None = None) -> Dict[str, Any]:
         return {}
 
 
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("1", "true", "yes", "sim"):
+            return True
+        if lowered in ("0", "false", "no", "nao", "não", ""):
+            return False
+        raise ValueError(f"valor booleano inválido: {value!r}")
+    return bool(value)
+
+
+def _choice(*options: str) -> Callable[[Any], str]:
+    def convert(value: Any) -> str:
+        text = str(value).strip()
+        if text.lower() not in options and text.upper() not in options:
+            raise ValueError(f"use um de {', '.join(options)}")
+        return text.upper() if text.upper() in options else text.lower()
+    return convert
+
+
+def _float_map(value: Any) -> Dict[str, float]:
+    if not isinstance(value, dict):
+        raise ValueError("esperado um objeto nome -> número")
+    return {str(k): float(v) for k, v in value.items()}
+
+
+_BOOL_KEYS = (
+    "ativar_log", "headless", "limpar_cache_no_start", "precompilar_no_start",
+    "session_cache_enabled", "evidence_archive", "trace_enabled", "trace_tracemalloc", "dedup_enabled",
+    "http_verify_ssl",
+)
+_INT_KEYS = (
+    "workers", "processes", "shard_count", "metrics_flush_items", "health_port", "driver_max_items",
+    "evidence_workers", "evidence_max_pending", "retry_max_attempts", "queue_read_ahead",
+    "log_backup_count", "dedup_capacity", "http_pool_size", "http_retries", "batch_size",
+)
+_FLOAT_KEYS = (
+    "wait_time_in_minutes", "min_wait_seconds", "queue_watch_interval_seconds", "backoff_base_seconds",
+    "backoff_max_seconds", "metrics_flush_seconds", "health_interval_seconds", "driver_max_minutes",
+    "driver_max_rss_mb", "driver_rss_check_seconds", "session_max_age_minutes", "session_probe_timeout",
+    "evidence_max_mb", "evidence_max_age_days", "hook_timeout_seconds", "trace_profile_sample_rate",
+    "trace_slow_ms", "login_timeout", "wait_poll_interval", "retry_backoff_seconds",
+    "retry_backoff_max_seconds", "shard_lease_seconds", "config_check_seconds", "log_max_mb",
+    "dedup_error_rate", "download_timeout_seconds", "http_backoff_seconds", "http_timeout",
+    "batch_max_wait_seconds",
+)
+
+# Conversores por chave: o valor é validado e convertido uma única vez, na leitura do
+# arquivo. Chaves fora do esquema (específicas do projeto) passam sem conversão.
+_SCHEMA: Dict[str, Callable[[Any], Any]] = {
+    **{key: _to_bool for key in _BOOL_KEYS},
+    **{key: int for key in _INT_KEYS},
+    **{key: float for key in _FLOAT_KEYS},
+    "browser": _choice("chrome", "edge"),
+    "queue_backend": _choice("csv", "sqlite"),
+    "driver_profile": _choice("default", "lean"),
+    "login_fill_mode": _choice("script", "keys"),
+    "nivel_log": _choice("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"),
+    "log_format": _choice("text", "json"),
+    "dedup_key": _choice("id", "row"),
+    "hook_timeouts": _float_map,
+}
+
+# Chaves aplicadas sem reiniciar (lidas a cada uso ou reaplicadas pelo worker).
+# Qualquer outra mudança só vale após reiniciar o robô.
+HOT_RELOAD_KEYS: Set[str] = {
+    "wait_time_in_minutes", "min_wait_seconds", "queue_watch_interval_seconds",
+    "backoff_base_seconds", "backoff_max_seconds", "login_timeout", "wait_poll_interval",
+    "download_timeout_seconds", "session_probe_timeout", "login_fill_mode", "nivel_log", "retry_max_attempts",
+    "retry_backoff_seconds", "retry_backoff_max_seconds", "hook_timeout_seconds", "hook_timeouts",
+    "batch_size", "batch_max_wait_seconds",
+}
+
+
+def _hot_reloadable(key: str) -> bool:
+    return key in HOT_RELOAD_KEYS or key.endswith("_selector")
+
+
+def validate_config(raw: Mapping[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Converte os valores conhecidos para o tipo esperado. Retorna (valores, erros)."""
+    values: Dict[str, Any] = {}
+    errors: List[str] = []
+    for key, value in raw.items():
+        convert = _SCHEMA.get(key)
+        if convert is None or value is None:
+            values[key] = value
+            continue
+        try:
+            values[key] = convert(value)
+        except (TypeError, ValueError) as exc:
+            errors.append(f"{key}={value!r}: {exc}")
+    return values, errors
+
+
+class Config(Mapping):
+    """Configuração imutável: leitura como dicionário (`config.get(...)`), sem escrita.
+
+    - Objetos aninhados (ex.: hook_timeouts) também viram Config.
+    - `dict(config, chave=valor)` continua funcionando para derivar cópias.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None) -> None:
+        frozen = {k: Config(v) if isinstance(v, Mapping) else v for k, v in (data or {}).items()}
+        object.__setattr__(self, "_data", frozen)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Config é imutável")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Config({self._data!r})"
+
+    def __reduce__(self):
+        return (Config, (dict(self._data),))
+
+
+def apply_log_level(config: Mapping[str, Any]) -> None:
+    """Aplica `nivel_log` (DEBUG, INFO, ...) ao logger raiz."""
+    level = config.get("nivel_log")
+    if level:
+        logging.getLogger().setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+
+class LiveConfig(Mapping):
+    """Configuração do arquivo, lida uma vez e recarregada quando o arquivo muda.
+
+    - Cada leitura produz um `Config` imutável; a troca do snapshot é atômica.
+    - `maybe_reload()` custa um `os.stat` no máximo a cada `config_check_seconds`
+      (padrão: 5) e só relê o JSON se tamanho/mtime mudaram.
+    - Apenas as chaves de `HOT_RELOAD_KEYS` (e seletores `*_selector`) são aplicadas
+      sem reiniciar; mudanças nas demais são registradas em `restart_required` e
+      ignoradas até o próximo início. Um arquivo inválido mantém a configuração atual.
+    - `version` aumenta a cada recarga aplicada (workers reaplicam o que guardam em cache).
+    - `overrides` (ex.: shard do processo) são sobrepostos a cada snapshot.
+    """
+
+    def __init__(self, path: Optional[str] = None, overrides: Optional[Mapping[str, Any]] = None) -> None:
+        self.path = _resolve_config_path(path)
+        self.overrides = dict(overrides or {})
+        self.version = 0
+        self.restart_required: Set[str] = set()
+        self._lock = threading.Lock()
+        self._signature = self._stat()
+        self._raw, errors = validate_config(load_config(self.path))
+        for error in errors:
+            log_error(f"Config inválida (valor ignorado, usando o padrão): {error}")
+        self._snapshot = Config({**self._raw, **self.overrides})
+        self._check_interval = float(self._snapshot.get("config_check_seconds", 5))
+        self._next_check = time.monotonic() + self._check_interval
+
+    def _stat(self) -> Optional[Tuple[int, float]]:
+        try:
+            st = os.stat(self.path)
+            return (st.st_size, st.st_mtime)
+        except OSError:
+            return None
+
+    @property
+    def snapshot(self) -> Config:
+        return self._snapshot
+
+    def with_overrides(self, **values: Any) -> "LiveConfig":
+        """Nova LiveConfig do mesmo arquivo com valores fixos sobrepostos."""
+        return LiveConfig(self.path, {**self.overrides, **values})
+
+    def __getitem__(self, key: str) -> Any:
+        return self._snapshot[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __reduce__(self):
+        # Em outro processo (ex.: shards), o arquivo é lido novamente lá
+        return (LiveConfig, (self.path, self.overrides))
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Recarrega se o arquivo mudou. Retorna True se alguma chave foi aplicada."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        with self._lock:
+            self._next_check = now + self._check_interval
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except Exception as exc:
+                log_error(f"Config não recarregada ({self.path}): {exc}")
+                return False
+            new, errors = validate_config(raw)
+            if errors:
+                log_error(f"Config não recarregada, valores inválidos: {'; '.join(errors)}")
+                return False
+            return self._apply(new)
+
+    def _apply(self, new: Dict[str, Any]) -> bool:
+        changed = {k for k in set(self._raw) | set(new) if self._raw.get(k) != new.get(k)}
+        hot = {k for k in changed if _hot_reloadable(k)}
+        cold = changed - hot
+        # Chaves que exigem reinício mantêm o valor em uso; as demais são aplicadas
+        merged = {k: v for k, v in self._raw.items() if k not in hot}
+        merged.update({k: new[k] for k in hot if k in new})
+        self.restart_required = {k for k in cold | self.restart_required if new.get(k) != self._raw.get(k)}
+        if cold:
+            log_error(f"Config alterada em chaves que exigem reinício (ignoradas até lá): {', '.join(sorted(cold))}")
+        if not hot:
+            return False
+        self._raw = merged
+        self._snapshot = Config({**merged, **self.overrides})
+        self.version += 1
+        if "nivel_log" in hot:
+            apply_log_level(self._snapshot)
+        log_info(f"Config recarregada (versão {self.version}): {', '.join(sorted(hot))}")
+        return True
+
+
+_live_configs: Dict[str, LiveConfig] = {}
+_live_configs_lock = threading.Lock()
+
+
+def get_config(path: str | None = None) -> LiveConfig:
+    """Configuração validada e em cache do processo (lida uma única vez por arquivo)."""
+    config_path = _resolve_config_path(path)
+    with _live_configs_lock:
+        config = _live_configs.get(config_path)
+        if config is None:
+            config = _live_configs[config_path] = LiveConfig(config_path)
+            apply_log_level(config)
+        return config
+
+
+def override_config(config: Mapping[str, Any], **values: Any) -> Mapping[str, Any]:
+    """Cópia da configuração com valores fixos (mantém a recarga se for LiveConfig)."""
+    if isinstance(config, LiveConfig):
+        return config.with_overrides(**values)
+    return dict(config, **values)
+
+
+def config_version(config: Mapping[str, Any]) -> int:
+    """Verifica mudanças no arquivo (barato) e retorna a versão atual da configuração."""
+    if isinstance(config, LiveConfig):
+        config.maybe_reload()
+        return config.version
+    return 0
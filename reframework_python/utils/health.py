@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+from utils.config import log_error, log_info
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.utcfromtimestamp(ts).isoformat() + "Z"
+
+
+class HealthReporter:
+    """Estado de saúde do robô, mantido em memória e publicado em segundo plano.
+
+    - Os workers apenas atualizam campos em memória (etapa atual, driver, itens);
+      nada é gravado em disco no caminho de processamento.
+    - `run()` grava health.json periodicamente de forma atômica (temporário + rename)
+      e, se `port` for informado, serve o mesmo JSON em http://127.0.0.1:<port>/health.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = 15.0,
+        port: Optional[int] = None,
+        queue_status: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> None:
+        self.path = path
+        self.interval = max(0.1, interval)
+        self.port = port
+        self._queue_status = queue_status or (lambda: {})
+        self._lock = threading.Lock()
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        self._completed: Deque[float] = deque()
+        self._started = time.time()
+
+    def set_stage(self, worker_id: int, stage: str) -> None:
+        with self._lock:
+            self._workers.setdefault(worker_id, {})["stage"] = stage
+
+    def set_wait(self, worker_id: int, wait: Dict[str, Any]) -> None:
+        """Registra motivo e duração da última espera entre ciclos do worker."""
+        with self._lock:
+            self._workers.setdefault(worker_id, {})["last_wait"] = wait
+
+    def driver_opened(self, worker_id: int) -> None:
+        with self._lock:
+            self._workers.setdefault(worker_id, {})["driver_started"] = time.time()
+
+    def driver_closed(self, worker_id: int) -> None:
+        with self._lock:
+            self._workers.setdefault(worker_id, {})["driver_started"] = None
+
+    def item_done(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._completed.append(now)
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._completed and now - self._completed[0] > 60:
+            self._completed.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            workers = {}
+            for worker_id, info in sorted(self._workers.items()):
+                started = info.get("driver_started")
+                workers[str(worker_id)] = {
+                    "stage": info.get("stage"),
+                    "driver_age_seconds": round(now - started, 1) if started else None,
+                    "last_wait": info.get("last_wait"),
+                }
+            items_per_min = len(self._completed) * 60.0 / max(1.0, min(60.0, now - self._started))
+        data: Dict[str, Any] = {
+            "updated_at": _iso(now),
+            "uptime_seconds": round(now - self._started, 1),
+            "items_per_min": round(items_per_min, 2),
+            "workers": workers,
+        }
+        try:
+            data.update(self._queue_status())
+        except Exception:
+            pass
+        return data
+
+    def write(self) -> None:
+        data = self.snapshot()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except Exception as exc:
+            log_error(f"Falha ao gravar health: {exc}")
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Descarta os cabeçalhos da requisição
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            target = parts[1] if len(parts) > 1 else "/"
+            if target.split("?")[0] in ("/", "/health"):
+                status, body = "200 OK", json.dumps(self.snapshot(), ensure_ascii=False).encode("utf-8")
+            else:
+                status, body = "404 Not Found", b'{"error": "not found"}'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        """Loop de heartbeat: grava health.json a cada `interval` segundos até ser cancelado."""
+        server = None
+        if self.port:
+            try:
+                server = await asyncio.start_server(self._handle_http, "127.0.0.1", self.port)
+                log_info(f"Health disponível em http://127.0.0.1:{self.port}/health")
+            except OSError as exc:
+                log_error(f"Falha ao abrir endpoint de health na porta {self.port}: {exc}")
+        try:
+            while True:
+                await asyncio.to_thread(self.write)
+                await asyncio.sleep(self.interval)
+        finally:
+            if server is not None:
+                server.close()
+            self.write()
@@ -0,0 +1,140 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Contexto do registro atual (worker, etapa/hook, item), anexado a cada linha de log
+_log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("reframework_log_context", default={})
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["_FastQueueHandler"] = None
+# Montagem/encerramento do pipeline (o primeiro log pode vir de várias threads ao mesmo tempo)
+_pipeline_lock = threading.RLock()
+
+
+@contextmanager
+def log_context(**values: Any) -> Iterator[None]:
+    """Anexa valores (ex.: worker, stage, item_id) aos logs emitidos dentro do bloco.
+
+    - Vale para a tarefa asyncio atual e para chamadas feitas com `contextvars.copy_context()`.
+    """
+    token = _log_context.set({**_log_context.get(), **{k: v for k, v in values.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Copia o contexto atual para o registro (roda na thread que emitiu o log)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context:
+            record.context = context
+        return True
+
+
+class _FastQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que só resolve a mensagem (sem copiar o registro nem formatar a linha).
+
+    - Timestamp, nível e layout são formatados depois, na thread do listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.msg = f"{record.msg}\n{record.exc_text}"
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro: ts, level, msg e o contexto (worker, stage, item_id)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        data.update(getattr(record, "context", None) or {})
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def stop_logging() -> None:
+    """Esvazia a fila de logs e encerra a thread de escrita (chamado também no atexit)."""
+    global _listener, _queue_handler
+    with _pipeline_lock:
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    file_path: Optional[str] = None,
+    json_lines: bool = False,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+) -> None:
+    """Monta o pipeline de logs: QueueHandler no logger raiz + QueueListener em segundo plano.
+
+    - Quem chama `log_info`/`log_error` apenas enfileira o registro; formatação e escrita
+      (console e arquivo) acontecem na thread do listener.
+    - `file_path`: arquivo com rotação por tamanho (`max_bytes`, `backup_count` cópias).
+    - `json_lines`: o arquivo recebe uma linha JSON por registro (o console segue em texto).
+    - Pode ser chamada de novo para trocar a configuração (a fila anterior é esvaziada),
+      inclusive de threads diferentes ao mesmo tempo.
+    """
+    with _pipeline_lock:
+        _setup_pipeline(level, file_path, json_lines, max_bytes, backup_count)
+
+
+def _setup_pipeline(level: int, file_path: Optional[str], json_lines: bool, max_bytes: int, backup_count: int) -> None:
+    global _listener, _queue_handler
+    stop_logging()
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers: List[logging.Handler] = [console]
+    if file_path:
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            file_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    # Fila sem limite: emitir um log nunca bloqueia o worker
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = _FastQueueHandler(records)
+    _queue_handler.addFilter(_ContextFilter())
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(stop_logging)
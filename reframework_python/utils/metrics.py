@@ -0,0 +1,213 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.config import log_error
+
+# Limites superiores (ms) dos buckets do histograma: progressão geométrica (fator 1.2)
+# de 0.1ms a ~10min, o que mantém o erro de cada percentil em torno de 10%.
+_BUCKETS_MS: List[float] = [round(0.1 * 1.2 ** i, 3) for i in range(88)]
+
+
+class _Histogram:
+    """Histograma de latência com buckets fixos (memória e custo constantes por registro)."""
+
+    __slots__ = ("counts", "total", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p: float) -> float:
+        """Estimativa do percentil p (0-100) pelo limite superior do bucket correspondente."""
+        if not self.total:
+            return 0.0
+        target = self.total * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return round(min(_BUCKETS_MS[i], self.max_ms) if i < len(_BUCKETS_MS) else self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def export(self) -> Dict[str, Any]:
+        """Estado bruto (buckets não vazios) para consolidar histogramas de vários processos."""
+        return {
+            "buckets": {str(i): n for i, n in enumerate(self.counts) if n},
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        for i, n in (data.get("buckets") or {}).items():
+            self.counts[int(i)] += int(n)
+            self.total += int(n)
+        self.sum_ms += float(data.get("sum_ms") or 0)
+        self.max_ms = max(self.max_ms, float(data.get("max_ms") or 0))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.total,
+            "avg": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": round(self.max_ms, 3),
+        }
+
+
+class MetricsAggregator:
+    """Agrega contadores e latências por etapa em memória e grava em lote.
+
+    - Registrar uma métrica custa apenas um lock e algumas operações em memória.
+    - O arquivo é regravado de forma atômica (temporário + rename) a cada
+      `flush_items` registros ou `flush_seconds` segundos, o que vier primeiro.
+    - O formato mantém os contadores na raiz (processed_total, processed_success,
+      processed_error), como antes; as latências ficam em "latency_ms".
+    - processed_* contam itens (resultado final: concluído ou dead-letter); falhas de
+      tentativas com retentativa ficam em `attempts_failed`/`retry_scheduled`.
+    """
+
+    def __init__(self, path: str, flush_items: int = 50, flush_seconds: float = 10.0) -> None:
+        self.path = path
+        self.flush_items = max(1, flush_items)
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        # Serializa as gravações para que um snapshot antigo nunca sobrescreva um mais novo
+        self._flush_lock = threading.Lock()
+        self._counters: Dict[str, int] = {"processed_total": 0, "processed_success": 0, "processed_error": 0}
+        self._histograms: Dict[str, _Histogram] = {}
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        self._load()
+
+    def _load(self) -> None:
+        """Continua a partir dos contadores já gravados (execuções anteriores)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return
+        for key, value in data.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._counters[key] = int(value)
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            self._dirty += 1
+        self._maybe_flush()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = _Histogram()
+            hist.observe(seconds * 1000.0)
+            self._dirty += 1
+        self._maybe_flush()
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Mede a duração do bloco e registra no histograma da etapa."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def _maybe_flush(self) -> None:
+        if self._dirty >= self.flush_items or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._counters)
+            data["latency_ms"] = {stage: h.summary() for stage, h in self._histograms.items()}
+            data["latency_hist"] = {stage: h.export() for stage, h in self._histograms.items()}
+        data["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return data
+
+    def flush(self) -> None:
+        """Grava o estado atual em disco (atômico). Seguro para chamar a qualquer momento."""
+        with self._flush_lock:
+            with self._lock:
+                self._last_flush = time.monotonic()
+                if not self._dirty:
+                    return
+                self._dirty = 0
+            data = self.snapshot()
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.path)
+            except Exception as exc:
+                log_error(f"Falha ao gravar métricas: {exc}")
+
+
+_aggregators: Dict[str, MetricsAggregator] = {}
+_aggregators_lock = threading.Lock()
+
+
+def get_metrics(path: str, config: Optional[Dict[str, Any]] = None) -> MetricsAggregator:
+    """Retorna o agregador (único por arquivo) para o caminho de métricas informado.
+
+    - metrics_flush_items: registros entre gravações (padrão: 50)
+    - metrics_flush_seconds: intervalo máximo entre gravações (padrão: 10)
+    """
+    config = config or {}
+    with _aggregators_lock:
+        agg = _aggregators.get(path)
+        if agg is None:
+            agg = _aggregators[path] = MetricsAggregator(
+                path,
+                flush_items=int(config.get("metrics_flush_items", 50)),
+                flush_seconds=float(config.get("metrics_flush_seconds", 10)),
+            )
+        return agg
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Consolida snapshots de vários processos: soma contadores e histogramas.
+
+    - Os percentis são recalculados a partir dos buckets (`latency_hist`), não
+      aproximados a partir dos percentis de cada processo.
+    """
+    counters: Dict[str, int] = {}
+    histograms: Dict[str, _Histogram] = {}
+    for data in snapshots:
+        for key, value in data.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                counters[key] = counters.get(key, 0) + int(value)
+        for stage, raw in (data.get("latency_hist") or {}).items():
+            histograms.setdefault(stage, _Histogram()).merge(raw)
+    merged: Dict[str, Any] = dict(counters)
+    merged["latency_ms"] = {stage: h.summary() for stage, h in histograms.items()}
+    merged["latency_hist"] = {stage: h.export() for stage, h in histograms.items()}
+    merged["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return merged
+
+
+def flush_all() -> None:
+    """Grava todos os agregadores pendentes (ex.: ao encerrar o programa)."""
+    with _aggregators_lock:
+        aggs = list(_aggregators.values())
+    for agg in aggs:
+        agg.flush()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from utils.config import log_info
+
+# Motivos de espera entre ciclos
+EMPTY = "empty"
+UNAVAILABLE = "unavailable"
+ERROR = "error"
+
+
+class CycleScheduler:
+    """Decide quanto esperar entre ciclos de um worker.
+
+    - Fila vazia: espera até `wait_time_in_minutes`, mas acorda assim que a fonte da
+      fila (`watch_path`) muda (tamanho/mtime verificados a cada `queue_watch_interval_seconds`).
+      Enquanto novos itens continuam chegando, o teto dessa espera cai pela metade a cada
+      despertar por mudança (mínimo `min_wait_seconds`) e volta a subir quando nada muda.
+    - Plataforma indisponível / erro: backoff exponencial com jitter, de
+      `backoff_base_seconds` até `backoff_max_seconds` (padrão: wait_time_in_minutes).
+    - `last_wait` expõe o motivo e a duração da última espera (log, health e métricas).
+    """
+
+    def __init__(self, config: Dict[str, Any], watch_path: Optional[str] = None) -> None:
+        self.configure(config)
+        self.watch_path = watch_path
+        self._idle_wait = self.max_wait
+        self._failures = 0
+        self._signature = self._stat()
+        self.last_wait: Dict[str, Any] = {}
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """(Re)lê os tempos de espera do config (também após recarga a quente)."""
+        self.max_wait = float(config.get("wait_time_in_minutes", 2)) * 60
+        self.min_wait = float(config.get("min_wait_seconds", 1))
+        self.watch_interval = max(0.05, float(config.get("queue_watch_interval_seconds", 2)))
+        self.backoff_base = float(config.get("backoff_base_seconds", 5))
+        self.backoff_max = float(config.get("backoff_max_seconds", self.max_wait))
+        if hasattr(self, "_idle_wait"):
+            self._idle_wait = min(max(self._idle_wait, self.min_wait), self.max_wait)
+
+    def _stat(self) -> Optional[Tuple[int, float]]:
+        if not self.watch_path:
+            return None
+        try:
+            st = os.stat(self.watch_path)
+            return (st.st_size, st.st_mtime)
+        except OSError:
+            return None
+
+    def success(self) -> None:
+        """Zera o backoff após um ciclo bem-sucedido."""
+        self._failures = 0
+
+    def backoff_delay(self) -> float:
+        """Próximo atraso de backoff: base * 2^(falhas) com jitter ("full jitter" sobre metade)."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self._failures))
+        return min(self.backoff_max, delay / 2 + random.uniform(0, delay / 2))
+
+    async def wait(self, reason: str, limit: Optional[float] = None) -> Dict[str, Any]:
+        """Espera conforme o motivo e retorna {"reason", "seconds", "woke_by_change"}.
+
+        - `limit` encurta a espera de fila vazia (ex.: próxima retentativa agendada).
+        """
+        start = time.monotonic()
+        woke = False
+        if reason == EMPTY:
+            planned = self._idle_wait if limit is None else max(0.0, min(self._idle_wait, limit))
+            woke = await self._watch(planned)
+            if woke:
+                self._idle_wait = max(self.min_wait, self._idle_wait / 2)
+            else:
+                self._idle_wait = min(self.max_wait, self._idle_wait * 2)
+        else:
+            planned = self.backoff_delay()
+            self._failures += 1
+            log_info(f"Aguardando {planned:.1f}s ({reason}, tentativa {self._failures}).")
+            await asyncio.sleep(planned)
+        self.last_wait = {
+            "reason": reason,
+            "planned_seconds": round(planned, 3),
+            "seconds": round(time.monotonic() - start, 3),
+            "woke_by_change": woke,
+        }
+        return self.last_wait
+
+    async def _watch(self, timeout: float) -> bool:
+        """Dorme até `timeout` segundos; retorna True se a fonte da fila mudar antes disso."""
+        if not self.watch_path:
+            await asyncio.sleep(timeout)
+            return False
+        log_info(f"Aguardando até {timeout:.0f}s por novos itens em {self.watch_path}.")
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self.watch_interval, remaining))
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                return True
@@ -0,0 +1,250 @@
+import json
+import os
+import socket
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from utils.config import log_error, log_info
+from utils.metrics import merge_snapshots
+
+
+def shard_count(config: Dict[str, Any]) -> int:
+    """Total de shards em que a fila é dividida (entre todos os processos e máquinas)."""
+    try:
+        return max(1, int(config.get("shard_count") or config.get("processes") or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def shard_index(config: Dict[str, Any]) -> Optional[int]:
+    """Shard deste processo, ou None quando a execução não é particionada."""
+    index = config.get("shard_index")
+    if index is None or shard_count(config) <= 1:
+        return None
+    return int(index)
+
+
+def shard_of(key: str, count: int) -> int:
+    """Shard de um item pela chave (CRC32: estável entre processos, ao contrário de hash())."""
+    return zlib.crc32(key.encode("utf-8")) % count
+
+
+def shard_path(path: str, config: Dict[str, Any], index: Optional[int] = None) -> str:
+    """Caminho exclusivo do shard: logs/metrics.json -> logs/metrics.shard2.json.
+
+    - Também para pastas: logs/traces/ -> logs/traces.shard2.
+    """
+    index = shard_index(config) if index is None else index
+    if index is None:
+        return path
+    root, ext = os.path.splitext(path.rstrip("/\\") or path)
+    return f"{root}.shard{index}{ext}"
+
+
+class ShardLease:
+    """Reserva exclusiva de um shard via arquivos em uma pasta compartilhada.
+
+    - Cada shard tem um arquivo `shard-<i>.lease`, criado com O_EXCL (atômico também em
+      compartilhamentos de rede), contendo host, pid e um token do dono.
+    - O dono renova o lease tocando o arquivo (mtime); um lease sem renovação há mais de
+      `ttl` segundos é considerado abandonado e pode ser assumido por outro processo.
+    - Assim várias máquinas podem dividir a mesma fila sem processar o mesmo item duas vezes.
+    - Limitação: o estado de cada shard (fila SQLite, checkpoint, índice de processados,
+      dead-letter) fica na máquina que o processou (`logs/`; SQLite em modo WAL não
+      funciona em pastas de rede). Um shard assumido por outra máquina começa com estado
+      vazio e reprocessa os itens dele; só a posse do shard é exclusiva entre máquinas.
+    """
+
+    def __init__(self, folder: str, count: int, ttl: float = 60.0) -> None:
+        self.folder = folder
+        self.count = max(1, count)
+        self.ttl = max(1.0, ttl)
+        self.token = uuid.uuid4().hex
+        self.index: Optional[int] = None
+        os.makedirs(folder, exist_ok=True)
+
+    @property
+    def renew_interval(self) -> float:
+        return self.ttl / 3
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.folder, f"shard-{index}.lease")
+
+    def _owner(self) -> Dict[str, Any]:
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "token": self.token,
+            "acquired_at": datetime.utcnow().isoformat() + "Z",
+        }
+
+    def _read_token(self, index: int) -> Optional[str]:
+        try:
+            with open(self._path(index), "r", encoding="utf-8") as f:
+                return json.load(f).get("token")
+        except Exception:
+            return None
+
+    def _try_create(self, index: int) -> bool:
+        try:
+            fd = os.open(self._path(index), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._owner(), f)
+        return True
+
+    def _try_take_over(self, index: int) -> bool:
+        """Assume um lease abandonado de forma atômica.
+
+        - O arquivo vencido é renomeado para um nome exclusivo: entre processos que tentam
+          ao mesmo tempo, só um rename encontra o arquivo. Depois, o novo lease é criado
+          com O_EXCL, como em `_try_create`.
+        - Se o arquivo renomeado não era o vencido (outro processo acabou de assumir e
+          criar um lease novo), ele é devolvido ao lugar e a tentativa é abandonada.
+        """
+        path = self._path(index)
+        try:
+            if time.time() - os.stat(path).st_mtime <= self.ttl:
+                return False
+            with open(path, "r", encoding="utf-8") as f:
+                stale = json.load(f)
+        except FileNotFoundError:
+            return self._try_create(index)
+        except (OSError, ValueError):
+            stale = {}
+        claimed = f"{path}.{self.token}.stale"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            # Outro processo renomeou primeiro; compete apenas pela criação
+            return self._try_create(index)
+        try:
+            with open(claimed, "r", encoding="utf-8") as f:
+                token = json.load(f).get("token")
+        except (OSError, ValueError):
+            token = None
+        if token != stale.get("token") or time.time() - os.stat(claimed).st_mtime <= self.ttl:
+            self._put_back(claimed, path)
+            return False
+        os.remove(claimed)
+        if not self._try_create(index):
+            return False
+        if stale.get("host") and stale.get("host") != socket.gethostname():
+            log_error(
+                f"Shard {index} assumido de {stale.get('host')}: o estado do shard fica na máquina "
+                "anterior, então os itens dele podem ser reprocessados."
+            )
+        return True
+
+    def _put_back(self, claimed: str, path: str) -> None:
+        """Devolve um lease ativo renomeado por engano (sem sobrescrever um lease novo)."""
+        try:
+            os.link(claimed, path)
+        except FileExistsError:
+            pass
+        except OSError:
+            # Sistemas sem hard link: rename (a janela para sobrescrever é mínima)
+            if not os.path.exists(path):
+                os.rename(claimed, path)
+                return
+        try:
+            os.remove(claimed)
+        except OSError:
+            pass
+
+    def acquire(self) -> Optional[int]:
+        """Reserva o primeiro shard livre (ou abandonado). Retorna o índice ou None."""
+        for index in range(self.count):
+            if self._try_create(index) or self._try_take_over(index):
+                self.index = index
+                log_info(f"Shard {index}/{self.count} reservado ({self._path(index)}).")
+                return index
+        return None
+
+    def renew(self) -> bool:
+        """Renova o lease; retorna False se ele foi perdido para outro processo."""
+        if self.index is None or self._read_token(self.index) != self.token:
+            return False
+        try:
+            os.utime(self._path(self.index))
+            return True
+        except OSError as exc:
+            log_error(f"Falha ao renovar lease do shard {self.index}: {exc}")
+            return False
+
+    def release(self) -> None:
+        if self.index is None:
+            return
+        if self._read_token(self.index) == self.token:
+            try:
+                os.remove(self._path(self.index))
+            except OSError:
+                pass
+        self.index = None
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def merge_health(snapshots: Dict[int, Dict[str, Any]], stale_seconds: float) -> Dict[str, Any]:
+    """Visão global do health: totais somados e o detalhe de cada shard."""
+    now = time.time()
+    shards: Dict[str, Any] = {}
+    for index, data in sorted(snapshots.items()):
+        updated = data.get("updated_at")
+        try:
+            age = now - datetime.fromisoformat(updated.rstrip("Z")).replace(tzinfo=timezone.utc).timestamp()
+        except (AttributeError, ValueError):
+            age = None
+        shards[str(index)] = dict(data, stale=age is None or age > stale_seconds)
+    return {
+        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "shards_reporting": len(shards),
+        "items_per_min": round(sum(float(d.get("items_per_min") or 0) for d in snapshots.values()), 2),
+        "remaining_items": sum(int(d.get("remaining_items") or 0) for d in snapshots.values()),
+        "retry_pending": sum(int(d.get("retry_pending") or 0) for d in snapshots.values()),
+        "shards": shards,
+    }
+
+
+def merge_shard_files(config: Dict[str, Any], metrics_path: str, health_path: str) -> None:
+    """Junta metrics/health de todos os shards nos arquivos globais (sem sufixo).
+
+    - Shards sem arquivo (ainda não iniciados ou em outra máquina sem pasta
+      compartilhada) são ignorados.
+    """
+    count = shard_count(config)
+    metrics: List[Dict[str, Any]] = []
+    health: Dict[int, Dict[str, Any]] = {}
+    for index in range(count):
+        data = _read_json(shard_path(metrics_path, config, index))
+        if data:
+            metrics.append(data)
+        data = _read_json(shard_path(health_path, config, index))
+        if data:
+            health[index] = data
+    try:
+        if metrics:
+            _write_json_atomic(metrics_path, dict(merge_snapshots(metrics), shards_reporting=len(metrics)))
+        if health:
+            stale = 3 * float(config.get("health_interval_seconds", 15))
+            _write_json_atomic(health_path, merge_health(health, stale))
+    except Exception as exc:
+        log_error(f"Falha ao consolidar arquivos dos shards: {exc}")
@@ -0,0 +1,200 @@
+import io
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from utils.config import log_error, log_info
+from utils.sharding import shard_path
+
+
+class Tracer:
+    """Spans por etapa (hook) exportados em JSONL e no formato Chrome trace-event.
+
+    - Cada span registra nome do hook, worker, item (se houver), início e duração.
+    - JSONL: uma linha por span em `trace_dir/spans.jsonl`, gravada em lotes.
+    - Chrome: `trace_dir/trace.json` gerado ao encerrar (abra em chrome://tracing
+      ou https://ui.perfetto.dev). Mantém apenas os últimos `max_events` spans.
+    - Amostragem: uma fração `profile_sample_rate` das chamadas de `process_item`
+      roda sob cProfile; se a chamada passar de `slow_ms`, o perfil (.prof) é salvo e
+      o resumo anexado ao span, junto com o topo do tracemalloc se `use_tracemalloc`.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        profile_sample_rate: float = 0.0,
+        slow_ms: float = 5000,
+        use_tracemalloc: bool = False,
+        max_events: int = 100_000,
+        flush_every: int = 100,
+    ) -> None:
+        self.folder = folder
+        self.profile_sample_rate = profile_sample_rate
+        self.slow_ms = slow_ms
+        self.use_tracemalloc = use_tracemalloc
+        self.flush_every = max(1, flush_every)
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._wall_origin = time.time()
+        os.makedirs(folder, exist_ok=True)
+        if use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, worker: str, args: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Mede o bloco como um span; `args` pode ser enriquecido dentro do bloco."""
+        args = dict(args or {})
+        start = time.perf_counter_ns()
+        error = None
+        try:
+            yield args
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            if error:
+                args["error"] = error
+            self._record(name, worker, start, end, args)
+
+    def _record(self, name: str, worker: str, start: int, end: int, args: Dict[str, Any]) -> None:
+        event = {
+            "name": name,
+            "worker": worker,
+            "start": round(self._wall_origin + (start - self._origin_ns) / 1e9, 6),
+            "duration_ms": round((end - start) / 1e6, 3),
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._pending.append(json.dumps(event, ensure_ascii=False, default=str))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def should_profile(self, name: str) -> bool:
+        return name == "process_item" and self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+
+    def profiled(self, func: Callable[..., Any], args_out: Dict[str, Any]) -> Callable[..., Any]:
+        """Envolve `func` para rodar sob cProfile na própria thread que a executa."""
+
+        # Importado só quando há amostragem (não pesa na inicialização)
+        import cProfile
+
+        def wrapper(*a: Any, **kw: Any) -> Any:
+            profiler = cProfile.Profile()
+            before = tracemalloc.take_snapshot() if self.use_tracemalloc and tracemalloc.is_tracing() else None
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                return func(*a, **kw)
+            finally:
+                profiler.disable()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if elapsed_ms >= self.slow_ms:
+                    self._attach_profile(profiler, before, args_out)
+
+        return wrapper
+
+    def _attach_profile(self, profiler: Any, before: Any, args_out: Dict[str, Any]) -> None:
+        import pstats
+
+        try:
+            path = os.path.join(self.folder, f"slow_{time.strftime('%Y%m%d_%H%M%S')}_{time.time_ns() % 10**9:09d}.prof")
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(10)
+            args_out["profile_path"] = path
+            args_out["profile_top"] = out.getvalue().splitlines()[-14:]
+            if before is not None:
+                diff = tracemalloc.take_snapshot().compare_to(before, "lineno")[:10]
+                args_out["tracemalloc_top"] = [str(stat) for stat in diff]
+        except Exception as exc:
+            log_error(f"Falha ao salvar perfil de item lento: {exc}")
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines:
+            return
+        try:
+            with open(os.path.join(self.folder, "spans.jsonl"), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except Exception as exc:
+            log_error(f"Falha ao gravar spans: {exc}")
+
+    def export_chrome(self) -> str:
+        """Grava os spans em memória no formato Chrome trace-event e retorna o caminho."""
+        with self._lock:
+            events = list(self._events)
+        trace = {
+            "traceEvents": [
+                {
+                    "name": e["name"],
+                    "ph": "X",
+                    "ts": int(e["start"] * 1e6),
+                    "dur": int(e["duration_ms"] * 1000),
+                    "pid": os.getpid(),
+                    "tid": e["worker"],
+                    "args": e["args"],
+                }
+                for e in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        path = os.path.join(self.folder, "trace.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, default=str)
+        return path
+
+    def close(self) -> None:
+        self.flush()
+        try:
+            log_info(f"Trace exportado em {self.export_chrome()}")
+        except Exception as exc:
+            log_error(f"Falha ao exportar trace: {exc}")
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer(config: Dict[str, Any]) -> Optional[Tracer]:
+    """Tracer do processo, ou None quando `trace_enabled` é falso (custo zero).
+
+    - trace_dir: pasta de saída (padrão: logs/traces; com shards, logs/traces.shard<i>,
+      já que cada processo grava seu spans.jsonl e exporta seu trace.json ao encerrar)
+    - trace_profile_sample_rate: fração de process_item sob cProfile (padrão: 0)
+    - trace_slow_ms: a partir de quanto um item é considerado lento (padrão: 5000)
+    - trace_tracemalloc: anexa diferença de alocações aos itens lentos (padrão: False)
+    """
+    global _tracer
+    if not config.get("trace_enabled", False):
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            _tracer = Tracer(
+                shard_path(config.get("trace_dir") or os.path.join(root, "logs", "traces"), config),
+                profile_sample_rate=float(config.get("trace_profile_sample_rate", 0)),
+                slow_ms=float(config.get("trace_slow_ms", 5000)),
+                use_tracemalloc=bool(config.get("trace_tracemalloc", False)),
+            )
+        return _tracer
+
+
+def shutdown_tracer() -> None:
+    """Grava spans pendentes e exporta o trace Chrome (ao encerrar o programa)."""
+    global _tracer
+    with _tracer_lock:
+        tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()